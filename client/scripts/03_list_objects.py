@@ -9,11 +9,14 @@ This script demonstrates how to:
 """
 
 import sys
+import argparse
 import logging
 from tabulate import tabulate
 from datetime import datetime
 from minio import Minio
 from minio.error import S3Error
+from minio_listing import list_objects_parallel
+from minio_report import BucketReport
 
 # Add parent directory to path to import the wrapper
 sys.path.append('..')
@@ -25,8 +28,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def list_objects():
-    """List all objects in a MinIO bucket"""
+def list_objects(workers=1, prefix="", report=None):
+    """
+    List all objects in a MinIO bucket
+    
+    Args:
+        workers (int): Concurrent listing requests; 1 uses a single sequential listing
+        prefix (str): Only list objects whose names start with this prefix
+        report (dict, optional): Print a single-pass summary instead of one row per
+            object; keys 'depth', 'top' and 'format' ('table', 'json' or 'csv')
+    """
     try:
         # Read config from the config file
         import configparser
@@ -53,8 +64,22 @@ def list_objects():
             logger.error(f"Bucket '{bucket_name}' does not exist")
             return False
         
+        # Streaming report: aggregates only, constant memory
+        if report is not None:
+            if workers > 1:
+                objects = list_objects_parallel(client, bucket_name, prefix, workers=workers)
+            else:
+                objects = client.list_objects(bucket_name, prefix=prefix, recursive=True)
+            summary = BucketReport(report['depth'], report['top']).consume(objects)
+            print(summary.render(report['format']))
+            logger.info(f"Summarised {summary.count} objects in bucket '{bucket_name}'")
+            return True
+        
         # List all objects
-        objects = list(client.list_objects(bucket_name, recursive=True))
+        if workers > 1:
+            objects = list(list_objects_parallel(client, bucket_name, prefix, workers=workers, sort=True))
+        else:
+            objects = list(client.list_objects(bucket_name, prefix=prefix, recursive=True))
         
         if not objects:
             logger.info(f"Bucket '{bucket_name}' is empty")
@@ -116,8 +141,30 @@ if __name__ == "__main__":
     #     subprocess.check_call([sys.executable, "-m", "pip", "install", "tabulate"])
     #     import tabulate
     
+    parser = argparse.ArgumentParser(description='List objects in a MinIO bucket')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Concurrent listing requests for large buckets (default: 1)')
+    parser.add_argument('--prefix', default='', help='Only list objects under this prefix')
+    parser.add_argument('--report', action='store_true',
+                        help='Print per-prefix totals, size/age histograms and the largest objects instead')
+    parser.add_argument('--depth', type=int, default=1, help='Report: prefix depth to aggregate at (default: 1)')
+    parser.add_argument('--top', type=int, default=10, help='Report: number of largest objects (default: 10)')
+    parser.add_argument('--format', choices=['table', 'json', 'csv'], default='table',
+                        help='Report: output format (default: table)')
+    args = parser.parse_args()
+    if args.format != 'table' and not args.report:
+        # The plain listing is always a grid; only the report has other formats
+        parser.error("--format json/csv requires --report")
+    
+    report = {'depth': args.depth, 'top': args.top, 'format': args.format} if args.report else None
+    if args.format != 'table':
+        # Keep machine-readable output clean
+        logging.disable(logging.INFO)
+        success = list_objects(args.workers, args.prefix, report)
+        sys.exit(0 if success else 1)
+    
     print("=== MinIO Demo: Listing Objects ===")
-    success = list_objects()
+    success = list_objects(args.workers, args.prefix, report)
     print("=" * 40)
     if success:
         print("✅ Object listing completed successfully")
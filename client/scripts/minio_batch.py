@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Bulk transfers driven by a manifest.
+
+A manifest lists operations, one per line, either as CSV with a header row
+
+    op,file,object,server
+    upload,/data/a.csv,reports/a.csv,
+    download,/tmp/b.csv,reports/b.csv,NG
+    delete,,reports/old.csv,
+
+or as JSON lines
+
+    {"op": "upload", "file": "/data/a.csv", "object": "reports/a.csv"}
+
+`server` is optional: uploads and deletes go to every server, downloads
+come from the first server that has the object. All items run through one
+set of clients and a bounded worker pool, and each finished item is
+appended to a JSON-lines result log. The result log is itself a valid
+manifest, so failed items can be fed straight back in with failed_items().
+A line that cannot be parsed does not stop the batch; it is logged as a
+failed item with the parse error.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+
+OPERATIONS = ('upload', 'download', 'delete')
+
+
+def normalize_item(item, line):
+    """
+    Validate one operation and fill in defaults (object name from the file name and vice versa).
+
+    Raises:
+        ValueError: If the operation is unknown or misses a required field
+    """
+    op = (item.get('op') or item.get('action') or '').strip().lower()
+    if op not in OPERATIONS:
+        raise ValueError(f"Manifest line {line}: unknown operation '{op}'")
+    normalized = {
+        'line': line,
+        'op': op,
+        'file': (item.get('file') or '').strip() or None,
+        'object': (item.get('object') or '').strip() or None,
+        'server': (item.get('server') or '').strip() or None,
+    }
+    if op == 'upload' and not normalized['file']:
+        raise ValueError(f"Manifest line {line}: upload needs a file")
+    if op in ('download', 'delete') and not normalized['object']:
+        raise ValueError(f"Manifest line {line}: {op} needs an object")
+    if op == 'upload' and not normalized['object']:
+        normalized['object'] = os.path.basename(normalized['file'])
+    if op == 'download' and not normalized['file']:
+        normalized['file'] = normalized['object']
+    return normalized
+
+
+def _invalid_item(line, error):
+    """Placeholder for a manifest line that could not be parsed; execute_item fails it."""
+    return {'line': line, 'op': None, 'file': None, 'object': None, 'server': None, 'invalid': str(error)}
+
+
+def _parse_item(item, line):
+    try:
+        if isinstance(item, str):
+            item = json.loads(item)
+        if not isinstance(item, dict):
+            raise ValueError(f"Manifest line {line}: expected a JSON object")
+        return normalize_item(item, line)
+    except ValueError as e:
+        return _invalid_item(line, e)
+
+
+def read_manifest(source):
+    """
+    Read manifest items lazily from a path or an open stream.
+
+    The format is detected from the first non-empty line: '{' means JSON
+    lines, anything else CSV with a header row.
+
+    Args:
+        source (str or file): Manifest path, '-' for stdin, or a text stream
+
+    Yields:
+        dict: Items with 'line', 'op', 'file', 'object' and 'server'; lines that
+            cannot be parsed are yielded with an 'invalid' error message instead
+    """
+    stream = sys.stdin if source == '-' else (open(source, 'r', newline='') if isinstance(source, str) else source)
+    try:
+        first = ''
+        for first in stream:
+            if first.strip():
+                break
+        if not first.strip():
+            return
+        if first.lstrip().startswith('{'):
+            line = 1
+            yield _parse_item(first, line)
+            for text in stream:
+                line += 1
+                if text.strip():
+                    yield _parse_item(text, line)
+        else:
+            header = next(csv.reader([first]))
+            for line, row in enumerate(csv.DictReader(stream, fieldnames=[h.strip() for h in header]), start=2):
+                if any((value or '').strip() for value in row.values()):
+                    yield _parse_item(row, line)
+    finally:
+        if stream is not sys.stdin and isinstance(source, str):
+            stream.close()
+
+
+def failed_items(result_log):
+    """
+    Items whose latest result in a log is a failure.
+
+    The log is read completely before anything is returned, so it is safe
+    to keep appending to it afterwards. Logs are append-only and may cover
+    several runs; only the last result of each item counts, so items that
+    failed once and succeeded later are not retried.
+
+    Args:
+        result_log (str): Path of a result log written by run_batch
+
+    Returns:
+        list: Items ready to pass to run_batch again, in log order
+    """
+    latest = {}
+    with open(result_log, 'r') as f:
+        for number, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                result = json.loads(text)
+            except ValueError as e:
+                latest[('invalid', number)] = (False, _invalid_item(number, f"Result log line {number}: {e}"))
+                continue
+            if result.get('invalid'):
+                item = _invalid_item(result.get('line', 0), result['invalid'])
+                key = ('invalid', result.get('line', 0))
+            else:
+                item = _parse_item(result, result.get('line', 0))
+                key = (item['op'], item['file'], item['object'], item['server'])
+            # Re-inserting moves the item behind the ones that were logged earlier
+            latest.pop(key, None)
+            latest[key] = (bool(result.get('ok')), item)
+    return [item for ok, item in latest.values() if not ok]
+
+
+def _targets(clients, item):
+    if item['server']:
+        if item['server'] not in clients:
+            raise KeyError(f"Unknown server {item['server']}")
+        return [item['server']]
+    return list(clients)
+
+
+def execute_item(clients, item):
+    """
+    Run one manifest item.
+
+    Returns:
+        dict: The item with 'ok', 'servers' (per-server result), 'error' and 'seconds' added
+    """
+    started = time.monotonic()
+    result = dict(item)
+    if item.get('invalid'):
+        result.update(ok=False, servers={}, error=item['invalid'], seconds=0.0)
+        return result
+    try:
+        targets = _targets(clients, item)
+        if item['op'] == 'upload':
+            servers = {name: clients[name].upload_file(item['file'], item['object']) for name in targets}
+            ok = all(servers.values())
+        elif item['op'] == 'delete':
+            servers = {name: clients[name].delete_object(item['object']) for name in targets}
+            ok = all(servers.values())
+        else:
+            servers = {}
+            for name in targets:
+                servers[name] = clients[name].download_file(item['object'], item['file'])
+                if servers[name]:
+                    break
+            ok = any(servers.values())
+        result.update(ok=ok, servers=servers, error=None if ok else "failed on " + ", ".join(
+            name for name, success in servers.items() if not success))
+    except Exception as e:
+        result.update(ok=False, servers={}, error=str(e))
+    result['seconds'] = round(time.monotonic() - started, 4)
+    return result
+
+
+def run_batch(clients, items, workers=8, result_log=None, on_result=None):
+    """
+    Run manifest items concurrently.
+
+    At most 2 * workers items are in flight, so manifests with millions of
+    lines stream through in constant memory.
+
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        items (iterable): Manifest items (see read_manifest)
+        workers (int): Concurrent items
+        result_log (str, optional): Path of the JSON-lines result log (appended to)
+        on_result (callable, optional): Called with each result dict
+
+    Returns:
+        dict: Counts of 'total', 'succeeded' and 'failed' items
+    """
+    stats = {'total': 0, 'succeeded': 0, 'failed': 0}
+    log = open(result_log, 'a') if result_log else None
+    def finish(future):
+        result = future.result()
+        stats['total'] += 1
+        stats['succeeded' if result['ok'] else 'failed'] += 1
+        if log:
+            log.write(json.dumps(result) + "\n")
+        if on_result:
+            on_result(result)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            try:
+                for item in items:
+                    if len(in_flight) >= 2 * workers:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finish(future)
+                    in_flight.add(pool.submit(execute_item, clients, item))
+            finally:
+                # Even if reading the manifest fails, log what already ran
+                for future in as_completed(in_flight):
+                    finish(future)
+    finally:
+        if log:
+            log.close()
+    return stats
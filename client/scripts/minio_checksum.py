@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Single-pass checksums for uploads and downloads.
+
+Uploads are read once, one part at a time. Each part is hashed on a worker
+thread and then sent with a Content-MD5 header, so the server rejects any
+part that was damaged on the way. After the upload completes, the ETag the
+server returns is compared with the one computed locally. For a single PUT
+that is the MD5 of the body; for a multipart upload it is the MD5 of the
+part MD5s, suffixed with -N. Small objects that fit in one part also get
+the configured algorithm's digest: it is sent as an x-amz-checksum-* header
+(sha256 or crc32c) and stored in the object's metadata.
+
+Downloads hash the stored bytes as they stream, before any decompression,
+and compare the result with the recorded checksum or the ETag before the
+file is moved into place. Nothing is read twice.
+
+crc32c needs the optional `crc32c` package; md5 and sha256 are always
+available.
+"""
+
+import base64
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from minio.datatypes import Part
+from minio.helpers import genheaders
+
+from minio_retry import CALL_ERRORS, ChecksumMismatch
+
+try:
+    import crc32c as _crc32c
+except ImportError:
+    _crc32c = None
+
+ALGORITHMS = ('md5', 'sha256', 'crc32c')
+
+# User metadata keys (stored as x-amz-meta-*)
+META_CHECKSUM = "Checksum"
+META_PART_SIZE = "Checksum-Part-Size"
+
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+
+# S3 allows at most this many parts per upload
+MAX_PARTS = 10000
+
+# Minimum part size of a multipart upload (except the last part)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+def available(algorithm):
+    """True if the algorithm can be used in this environment."""
+    return algorithm in ('md5', 'sha256') or (algorithm == 'crc32c' and _crc32c is not None)
+
+
+class _CRC32C:
+    """hashlib-style wrapper around the crc32c package."""
+
+    def __init__(self):
+        self._value = 0
+
+    def update(self, data):
+        self._value = _crc32c.crc32c(data, self._value)
+
+    def digest(self):
+        return self._value.to_bytes(4, 'big')
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+
+def new_hash(algorithm):
+    """
+    Create a hash object with update(), digest() and hexdigest().
+
+    Raises:
+        ValueError: If the algorithm is unknown or not available here
+    """
+    if algorithm == 'md5':
+        return hashlib.md5()
+    if algorithm == 'sha256':
+        return hashlib.sha256()
+    if algorithm == 'crc32c':
+        if _crc32c is None:
+            raise ValueError("crc32c checksums need the crc32c package")
+        return _CRC32C()
+    raise ValueError(f"Unknown checksum algorithm {algorithm}; expected one of {ALGORITHMS}")
+
+
+def digest(algorithm, data):
+    """Digest of one buffer."""
+    h = new_hash(algorithm)
+    h.update(data)
+    return h.digest()
+
+
+def composite_etag(md5_digests, multipart=True):
+    """
+    ETag S3 assigns to an object uploaded with these part MD5 digests.
+
+    Returns:
+        str: Hex MD5 of a single PUT, or hex MD5 of the concatenated digests plus '-N'
+    """
+    if not multipart:
+        return md5_digests[0].hex()
+    return f"{hashlib.md5(b''.join(md5_digests)).hexdigest()}-{len(md5_digests)}"
+
+
+class ChecksumPolicy:
+    """Which checksum uploads record and downloads verify, and the pool that computes them."""
+
+    def __init__(self, algorithm='md5', workers=4, part_size=DEFAULT_PART_SIZE, verify_downloads=True):
+        """
+        Args:
+            algorithm (str): 'md5', 'sha256' or 'crc32c'; falls back to md5 if crc32c is not installed
+            workers (int): Threads hashing (and sending) parts concurrently; also bounds how
+                many parts are held in memory
+            part_size (int): Bytes per part (at least 5 MiB)
+            verify_downloads (bool): Check downloads against the recorded checksum or ETag
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown checksum algorithm {algorithm}; expected one of {ALGORITHMS}")
+        self.algorithm = algorithm if available(algorithm) else 'md5'
+        self.workers = max(1, workers)
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.verify_downloads = verify_downloads
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        """Shared thread pool for hashing; hashlib releases the GIL on large buffers."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def close(self):
+        """Shut down the thread pool, if one was started."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def _read_part(source, size):
+    """Read up to `size` bytes, looping over short reads (pipes, compressors)."""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = source.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def put_verified(client, source, object_name, policy, size=None, content_type="application/octet-stream",
+                 metadata=None, progress=None):
+    """
+    Upload a stream with per-part Content-MD5 and an end-to-end ETag check.
+
+    The source is read exactly once. Parts are hashed and sent on the
+    policy's pool, with at most policy.workers parts in memory. Each part
+    is retried on its own, so even a non-replayable stream survives
+    transient errors.
+
+    Args:
+        client (MinioWrapper): Target server
+        source (file): Binary file-like object to upload
+        object_name (str): Name of the object in MinIO
+        policy (ChecksumPolicy): Algorithm, part size and hashing pool
+        size (int, optional): Total size, if known; only used to keep within MAX_PARTS
+        content_type (str, optional): Content type of the object
+        metadata (dict, optional): User metadata to store with the object
+        progress (optional): Progress object to update as parts complete
+
+    Returns:
+        ObjectWriteResult: Result of the PUT or the completed multipart upload
+
+    Raises:
+        ChecksumMismatch: If the server's ETag disagrees with the local digests
+            (the object is removed again)
+    """
+    part_size = policy.part_size
+    if size:
+        part_size = max(part_size, -(-size // MAX_PARTS))
+    algorithm = policy.algorithm
+    pool = policy.executor()
+    metadata = dict(metadata or {})
+
+    first = _read_part(source, part_size)
+    second = _read_part(source, part_size) if len(first) == part_size else b""
+
+    if not second:
+        # Everything fits in one PUT: the full digest can go into the request itself
+        md5 = pool.submit(digest, 'md5', first)
+        value = pool.submit(digest, algorithm, first) if algorithm != 'md5' else md5
+        metadata[META_CHECKSUM] = f"{algorithm}:{value.result().hex()}"
+        headers = genheaders(metadata, None, None, None, None)
+        headers["Content-Type"] = content_type
+        headers["Content-MD5"] = base64.b64encode(md5.result()).decode('ascii')
+        if algorithm != 'md5':
+            headers[f"x-amz-checksum-{algorithm}"] = base64.b64encode(value.result()).decode('ascii')
+        if client.rate_limiter is not None:
+            client.rate_limiter.throttle_bytes(len(first))
+        result = client._call(client.client._put_object, client.bucket_name, object_name, first, headers)
+        if progress is not None:
+            progress.update(len(first))
+        _check_etag(client, object_name, result, [md5.result()], multipart=False, headers=headers)
+        return result
+
+    metadata[META_PART_SIZE] = str(part_size)
+    headers = genheaders(metadata, None, None, None, None)
+    headers["Content-Type"] = content_type
+    upload_id = client._call(client.client._create_multipart_upload, client.bucket_name, object_name, headers)
+
+    def send(part_number, data):
+        md5 = digest('md5', data)
+        if client.rate_limiter is not None:
+            client.rate_limiter.throttle_bytes(len(data))
+        etag = client._call(client.client._upload_part, client.bucket_name, object_name, data,
+                            {"Content-MD5": base64.b64encode(md5).decode('ascii')}, upload_id, part_number)
+        if progress is not None:
+            progress.update(len(data))
+        return Part(part_number, etag), md5
+
+    try:
+        in_flight = deque()
+        done = []
+        part_number = 0
+        pending = [first, second]
+        while True:
+            data = pending.pop(0) if pending else _read_part(source, part_size)
+            if not data:
+                break
+            part_number += 1
+            in_flight.append(pool.submit(send, part_number, data))
+            del data
+            if len(in_flight) >= policy.workers:
+                done.append(in_flight.popleft().result())
+        done.extend(future.result() for future in in_flight)
+
+        result = client._call(client.client._complete_multipart_upload, client.bucket_name, object_name,
+                              upload_id, [part for part, _ in done])
+    except BaseException:
+        try:
+            client._call(client.client._abort_multipart_upload, client.bucket_name, object_name, upload_id)
+        except CALL_ERRORS:
+            pass
+        raise
+    _check_etag(client, object_name, result, [md5 for _, md5 in done], headers=headers)
+    return result
+
+
+def _encrypted(headers):
+    """True if request or response headers show server-side encryption of any kind."""
+    return any(key.lower().startswith('x-amz-server-side-encryption') for key in (headers or {}))
+
+
+def _check_etag(client, object_name, result, md5_digests, multipart=True, headers=None):
+    """
+    Compare the server's ETag with the local digests; remove the object if they differ.
+
+    Encrypted objects (SSE-S3, SSE-KMS or SSE-C, requested in `headers` or
+    reported by the server) carry ETags unrelated to their content and are
+    not checked.
+    """
+    etag = (getattr(result, 'etag', None) or '').strip('"')
+    if _encrypted(headers) or _encrypted(getattr(result, 'http_headers', None)):
+        return
+    expected = composite_etag(md5_digests, multipart)
+    if not etag or len(etag.split('-')[0]) != 32 or etag == expected:
+        return
+    try:
+        client._call(client.client.remove_object, client.bucket_name, object_name)
+    except CALL_ERRORS:
+        pass
+    raise ChecksumMismatch(object_name, expected, etag)
+
+
+class Verifier:
+    """Hashes the stored bytes of a download as they stream and checks them at the end."""
+
+    def __init__(self, object_name, algorithm, expected, part_size=None):
+        """
+        Args:
+            object_name (str): Name of the object, for error messages
+            algorithm (str): Algorithm of the expected value
+            expected (str): Expected hex digest, or composite ETag ending in -N
+            part_size (int, optional): Part size for a composite ETag
+        """
+        self.object_name = object_name
+        self.algorithm = algorithm
+        self.expected = expected
+        self.part_size = part_size
+        self._hash = new_hash(algorithm)
+        self._part_digests = []
+        self._part_bytes = 0
+
+    def update(self, chunk):
+        if not self.part_size:
+            self._hash.update(chunk)
+            return
+        view = memoryview(chunk)
+        while view:
+            take = min(len(view), self.part_size - self._part_bytes)
+            self._hash.update(view[:take])
+            self._part_bytes += take
+            view = view[take:]
+            if self._part_bytes == self.part_size:
+                self._part_digests.append(self._hash.digest())
+                self._hash = new_hash(self.algorithm)
+                self._part_bytes = 0
+
+    def verify(self):
+        """
+        Raises:
+            ChecksumMismatch: If the bytes seen do not match the expected value
+        """
+        if self.part_size:
+            digests = self._part_digests + ([self._hash.digest()] if self._part_bytes else [])
+            actual = composite_etag(digests)
+        else:
+            actual = self._hash.hexdigest()
+        if actual != self.expected:
+            raise ChecksumMismatch(self.object_name, self.expected, actual)
+
+
+def verifier_for(object_name, headers):
+    """
+    Build a Verifier from GET/HEAD response headers.
+
+    Uses the checksum recorded at upload if there is one, otherwise the
+    ETag when it is a plain MD5, or a multipart ETag whose part size was
+    recorded.
+
+    Returns:
+        Verifier or None: None if the object cannot be verified (e.g. encrypted)
+    """
+    lowered = {key.lower(): value for key, value in headers.items()}
+    if lowered.get('x-amz-server-side-encryption') == 'aws:kms' or \
+            'x-amz-server-side-encryption-customer-algorithm' in lowered:
+        return None
+
+    recorded = lowered.get(f"x-amz-meta-{META_CHECKSUM.lower()}")
+    if recorded and ':' in recorded:
+        algorithm, expected = recorded.split(':', 1)
+        if available(algorithm):
+            return Verifier(object_name, algorithm, expected)
+
+    etag = (lowered.get('etag') or '').strip('"')
+    if _encrypted(lowered):
+        return None
+    if len(etag) == 32 and '-' not in etag:
+        return Verifier(object_name, 'md5', etag)
+    part_size = lowered.get(f"x-amz-meta-{META_PART_SIZE.lower()}")
+    if '-' in etag and part_size and part_size.isdigit():
+        return Verifier(object_name, 'md5', etag, int(part_size))
+    return None
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+One command-line entry point for the single-server operations of scripts 01-09.
+
+    python3 minio_cli.py mb
+    python3 minio_cli.py put report.csv reports/2024.csv
+    python3 minio_cli.py ls reports/ --long
+    python3 minio_cli.py get reports/2024.csv /tmp/2024.csv
+    python3 minio_cli.py stat reports/2024.csv
+    python3 minio_cli.py meta reports/2024.csv --set owner=finance
+    python3 minio_cli.py recover reports/2024.csv report.csv
+    python3 minio_cli.py rm reports/2024.csv
+
+Startup stays cheap: only the standard library is imported at module level.
+The MinIO client (and MinioWrapper's modules) is imported when the first
+command that talks to the server runs, tabulate only when `ls --long` prints
+a table. The config file is read once and the client is shared by every
+command of a run.
+
+`--script FILE` (or `-` for stdin) runs one command per line in the same
+process, so a sequence of operations pays for startup and the connection
+pool once:
+
+    printf 'put a.csv\\nput b.csv\\nls\\n' | python3 minio_cli.py --script -
+"""
+
+import os
+import sys
+import shlex
+import argparse
+import configparser
+
+DEFAULT_CONFIG = os.environ.get('MINIO_CONFIG', '../minio_config.ini')
+
+
+class Session:
+    """Config and client shared by every command of one run."""
+
+    def __init__(self, config_file=DEFAULT_CONFIG, section='minio'):
+        """
+        Args:
+            config_file (str): Path to the configuration file
+            section (str): Section of the config file describing the server
+        """
+        self.config_file = config_file
+        self.section = section
+        self._settings = None
+        self._client = None
+
+    @property
+    def settings(self):
+        """The server's config section, read on first use."""
+        if self._settings is None:
+            config = configparser.ConfigParser()
+            if not config.read(self.config_file):
+                raise CommandError(f"Config file {self.config_file} not found")
+            if self.section not in config:
+                raise CommandError(f"No [{self.section}] section in {self.config_file}")
+            self._settings = config[self.section]
+        return self._settings
+
+    @property
+    def client(self):
+        """MinioWrapper for the configured server, created on first use."""
+        if self._client is None:
+            import contextlib
+            from minio_wrapper import MinioWrapper
+            from minio_retry import CALL_ERRORS
+            from minio_events import TransferEvents, ConsoleListener
+
+            settings = self.settings
+            # Keep the wrapper's bucket check message out of stdout, which may be piped
+            try:
+                with contextlib.redirect_stdout(sys.stderr):
+                    self._client = MinioWrapper(
+                        endpoint=settings['endpoint'],
+                        access_key=settings['access_key'],
+                        secret_key=settings['secret_key'],
+                        secure=settings.getboolean('secure', fallback=False),
+                        bucket_name=settings['bucket_name'],
+                        connect_timeout=settings.getfloat('connect_timeout', fallback=5.0),
+                        read_timeout=settings.getfloat('read_timeout', fallback=60.0),
+                        # Transfer errors are only reported through events; say why a put/get failed
+                        events=TransferEvents([ConsoleListener(sys.stderr)]),
+                    )
+            except CALL_ERRORS as e:
+                raise CommandError(f"Cannot connect to {settings['endpoint']}: {e}")
+        return self._client
+
+
+class CommandError(Exception):
+    """A command could not be carried out; the message is shown to the user."""
+
+
+def _stat(client, object_name):
+    from minio_retry import CALL_ERRORS
+    try:
+        return client._call(client.client.stat_object, client.bucket_name, object_name)
+    except CALL_ERRORS as e:
+        raise CommandError(f"Cannot stat {object_name}: {e}")
+
+
+def _user_metadata(stat):
+    """User metadata of a stat result, without the x-amz-meta- prefix."""
+    prefix = "x-amz-meta-"
+    return {key[len(prefix):]: value for key, value in (stat.metadata or {}).items()
+            if key.lower().startswith(prefix)}
+
+
+# Commands
+
+def cmd_mb(session, args):
+    # Creating the wrapper ensures the bucket exists
+    client = session.client
+    print(f"Bucket '{client.bucket_name}' is ready on {client.endpoint}")
+
+
+def cmd_put(session, args):
+    object_name = args.object or os.path.basename(args.file)
+    compress = args.compress if args.compress else None
+    if not session.client.upload_file(args.file, object_name, compress=compress):
+        raise CommandError(f"Upload of {args.file} failed")
+    print(f"{args.file} -> {object_name}")
+
+
+def cmd_get(session, args):
+    file_path = args.file or os.path.basename(args.object)
+    if not session.client.download_file(args.object, file_path):
+        raise CommandError(f"Download of {args.object} failed")
+    print(f"{args.object} -> {file_path}")
+
+
+def cmd_ls(session, args):
+    from minio_retry import CALL_ERRORS
+    client = session.client
+    try:
+        # The listing bypasses the breaker, so a server known to be down fails fast here
+        client.breaker.check()
+        objects = list(client.scan_objects(args.prefix, workers=args.workers, sort=True))
+    except CALL_ERRORS as e:
+        raise CommandError(f"Cannot list {client.bucket_name}: {e}")
+
+    if not args.long:
+        for obj in objects:
+            print(obj.object_name)
+        return
+
+    from tabulate import tabulate
+    from minio_report import format_size
+    rows = [[obj.object_name, format_size(obj.size or 0),
+             obj.last_modified.strftime("%Y-%m-%d %H:%M:%S") if obj.last_modified else "Unknown",
+             (obj.etag or '').strip('"')]
+            for obj in objects]
+    print(tabulate(rows, headers=["Object Name", "Size", "Last Modified", "ETag"], tablefmt="grid"))
+
+
+def cmd_rm(session, args):
+    failed = [name for name in args.objects if not session.client.delete_object(name)]
+    for name in args.objects:
+        if name not in failed:
+            print(f"Deleted {name}")
+    if failed:
+        raise CommandError(f"Could not delete {', '.join(failed)}")
+
+
+def cmd_stat(session, args):
+    stat = _stat(session.client, args.object)
+    print(f"Object: {args.object}")
+    print(f"Size: {stat.size} bytes")
+    print(f"Last modified: {stat.last_modified}")
+    etag = (stat.etag or '').strip('"')
+    print(f"ETag: {etag}")
+    print(f"Content type: {stat.content_type}")
+
+
+def cmd_meta(session, args):
+    client = session.client
+    stat = _stat(client, args.object)
+    metadata = _user_metadata(stat)
+    if args.set or args.unset:
+        from minio.commonconfig import CopySource, REPLACE
+        from minio_retry import CALL_ERRORS
+
+        for pair in args.set:
+            key, sep, value = pair.partition('=')
+            if not sep or not key:
+                raise CommandError(f"Expected KEY=VALUE, got '{pair}'")
+            metadata[key] = value
+        for key in args.unset:
+            metadata = {k: v for k, v in metadata.items() if k.lower() != key.lower()}
+        # S3 has no metadata update; the object is copied onto itself with new metadata
+        metadata['Content-Type'] = stat.content_type or "application/octet-stream"
+        try:
+            client._call(client.client.copy_object, client.bucket_name, args.object,
+                         CopySource(client.bucket_name, args.object), metadata=metadata,
+                         metadata_directive=REPLACE)
+        except CALL_ERRORS as e:
+            raise CommandError(f"Cannot update metadata of {args.object}: {e}")
+        metadata = _user_metadata(_stat(client, args.object))
+    for key, value in sorted(metadata.items()):
+        print(f"{key}: {value}")
+
+
+def cmd_recover(session, args):
+    from minio_compression import META_SIZE
+
+    client = session.client
+    file_path = args.file or os.path.basename(args.object)
+    stat = _stat(client, args.object)
+    # Compressed objects record their original size
+    metadata = {k.lower(): v for k, v in _user_metadata(stat).items()}
+    size = int(metadata.get(META_SIZE.lower(), stat.size))
+    if os.path.exists(file_path) and os.path.getsize(file_path) == size and not args.force:
+        print(f"{file_path} is intact ({size} bytes); nothing to recover")
+        return
+    if not client.download_file(args.object, file_path):
+        raise CommandError(f"Could not recover {file_path} from {args.object}")
+    print(f"Recovered {file_path} from {args.object} ({size} bytes)")
+
+
+COMMANDS = {
+    'mb': cmd_mb,
+    'put': cmd_put,
+    'ls': cmd_ls,
+    'get': cmd_get,
+    'rm': cmd_rm,
+    'stat': cmd_stat,
+    'meta': cmd_meta,
+    'recover': cmd_recover,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='MinIO command-line client')
+    parser.add_argument('--config', '-c', default=DEFAULT_CONFIG,
+                        help=f'Path to the config file (default: {DEFAULT_CONFIG}, or $MINIO_CONFIG)')
+    parser.add_argument('--section', default='minio', help='Config section of the server (default: minio)')
+    parser.add_argument('--script', metavar='FILE',
+                        help="Run the commands in FILE, one per line ('-' for stdin), in this process")
+    parser.add_argument('--keep-going', action='store_true',
+                        help='Script: continue after a failing command instead of stopping')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    sub = commands.add_parser('mb', help='Create the configured bucket if it does not exist')
+
+    sub = commands.add_parser('put', help='Upload a file')
+    sub.add_argument('file')
+    sub.add_argument('object', nargs='?', help='Object name (default: the file name)')
+    sub.add_argument('--compress', choices=['gzip', 'zstd'], help='Store compressed with this codec')
+
+    sub = commands.add_parser('ls', help='List objects')
+    sub.add_argument('prefix', nargs='?', default='')
+    sub.add_argument('--long', '-l', action='store_true', help='Show size, last modified and ETag as a table')
+    sub.add_argument('--workers', '-w', type=int, default=1,
+                     help='Concurrent listing requests for large buckets (default: 1)')
+
+    sub = commands.add_parser('get', help='Download an object')
+    sub.add_argument('object')
+    sub.add_argument('file', nargs='?', help='Local path (default: the object\'s base name)')
+
+    sub = commands.add_parser('rm', help='Delete objects')
+    sub.add_argument('objects', nargs='+')
+
+    sub = commands.add_parser('stat', help='Show size, ETag and content type of an object')
+    sub.add_argument('object')
+
+    sub = commands.add_parser('meta', help='Show or change the user metadata of an object')
+    sub.add_argument('object')
+    sub.add_argument('--set', action='append', default=[], metavar='KEY=VALUE', help='Set a key (repeatable)')
+    sub.add_argument('--unset', action='append', default=[], metavar='KEY', help='Remove a key (repeatable)')
+
+    sub = commands.add_parser('recover', help='Restore a lost or damaged local file from its object')
+    sub.add_argument('object')
+    sub.add_argument('file', nargs='?', help='Local path (default: the object\'s base name)')
+    sub.add_argument('--force', action='store_true', help='Download even if the local file looks intact')
+    return parser
+
+
+def run_command(session, args):
+    """
+    Run one parsed command.
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        COMMANDS[args.command](session, args)
+        return True
+    except CommandError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+
+
+def run_script(session, parser, lines, keep_going=False):
+    """
+    Run one command per line; blank lines and lines starting with '#' are skipped.
+
+    Returns:
+        int: Number of failed commands
+    """
+    failed = 0
+    for number, line in enumerate(lines, start=1):
+        words = shlex.split(line, comments=True)
+        if not words:
+            continue
+        try:
+            args = parser.parse_args(words)
+        except SystemExit:
+            # argparse already printed the usage error
+            args = None
+        if args is None or args.command is None or args.script:
+            ok = False
+            if args is not None:
+                print(f"Error: line {number}: expected a command", file=sys.stderr)
+        else:
+            ok = run_command(session, args)
+        if not ok:
+            failed += 1
+            if not keep_going:
+                print(f"Stopping at line {number}", file=sys.stderr)
+                break
+    return failed
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    session = Session(args.config, args.section)
+
+    if args.script:
+        if args.script == '-':
+            failed = run_script(session, parser, sys.stdin, args.keep_going)
+        else:
+            with open(args.script) as f:
+                failed = run_script(session, parser, f, args.keep_going)
+        sys.exit(1 if failed else 0)
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(2)
+    sys.exit(0 if run_command(session, args) else 1)
+
+
+if __name__ == "__main__":
+    main()
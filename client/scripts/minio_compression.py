@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Transparent streaming compression for MinIO objects.
+
+Uploads are compressed on the fly as a sequence of independent frames
+(gzip members or zstd frames); concatenated frames form a valid stream for
+both formats, so large inputs can be compressed in parallel on a process
+pool without changing the on-wire format. The codec is recorded in the
+object's user metadata, and downloads decompress transparently while
+streaming.
+
+zstd needs the optional `zstandard` package; gzip is always available.
+"""
+
+import os
+import zlib
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Errors the codecs raise on corrupt input
+DECODE_ERRORS = (zlib.error, zstandard.ZstdError) if zstandard is not None else (zlib.error,)
+
+# User metadata keys (stored as x-amz-meta-*)
+META_CODEC = "Compression"
+META_SIZE = "Uncompressed-Size"
+
+CODECS = ('gzip', 'zstd')
+
+# Content types that typically compress well
+COMPRESSIBLE_TYPES = {
+    'text/csv', 'text/plain', 'text/html', 'text/xml', 'text/tab-separated-values',
+    'application/json', 'application/x-ndjson', 'application/xml', 'application/javascript',
+}
+
+COMPRESSIBLE_EXTENSIONS = {'.csv', '.tsv', '.txt', '.json', '.jsonl', '.ndjson', '.xml', '.log', '.html'}
+
+FRAME_SIZE = 8 * 1024 * 1024
+
+
+def available(codec):
+    """True if the codec can be used in this environment."""
+    return codec == 'gzip' or (codec == 'zstd' and zstandard is not None)
+
+
+def compress_frame(codec, level, data):
+    """
+    Compress one self-contained frame. Module-level so it can run in a worker process.
+
+    Args:
+        codec (str): 'gzip' or 'zstd'
+        level (int or None): Compression level, None for the codec default
+        data (bytes): Uncompressed frame
+
+    Returns:
+        bytes: Compressed frame
+    """
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level if level is not None else 3).compress(data)
+    compressor = zlib.compressobj(level if level is not None else 6, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class CompressionPolicy:
+    """Decides whether and how an object is compressed on upload."""
+
+    def __init__(self, codec='gzip', level=None, min_size=1024, content_types=None, extensions=None,
+                 workers=0, frame_size=FRAME_SIZE):
+        """
+        Args:
+            codec (str): Codec for matching objects ('gzip' or 'zstd'); falls back to gzip
+                if zstandard is not installed
+            level (int, optional): Compression level
+            min_size (int): Objects smaller than this are stored uncompressed
+            content_types (set, optional): Content types to compress (default: COMPRESSIBLE_TYPES)
+            extensions (set, optional): File extensions to compress (default: COMPRESSIBLE_EXTENSIONS)
+            workers (int): Worker processes for parallel frame compression; 0 compresses inline
+            frame_size (int): Uncompressed bytes per frame
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec}; expected one of {CODECS}")
+        self.codec = codec if available(codec) else 'gzip'
+        self.level = level
+        self.min_size = min_size
+        self.content_types = COMPRESSIBLE_TYPES if content_types is None else set(content_types)
+        self.extensions = COMPRESSIBLE_EXTENSIONS if extensions is None else set(extensions)
+        self.workers = workers
+        self.frame_size = frame_size
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def choose(self, object_name, content_type=None, size=None):
+        """
+        Pick a codec for an object.
+
+        Returns:
+            str or None: Codec name, or None to store the object as is
+        """
+        if size is not None and size < self.min_size:
+            return None
+        if content_type and content_type.split(';')[0].strip() in self.content_types:
+            return self.codec
+        if os.path.splitext(object_name)[1].lower() in self.extensions:
+            return self.codec
+        return None
+
+    def executor(self):
+        """Shared process pool for frame compression, or None when workers == 0."""
+        if not self.workers:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def close(self):
+        """Shut down the process pool, if one was started."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def resolve_codec(policy, compress, object_name, content_type=None, size=None):
+    """
+    Combine a per-call `compress` argument with a policy.
+
+    Args:
+        policy (CompressionPolicy or None): Default policy
+        compress (None, bool or str): None uses the policy, False disables,
+            True uses the policy codec (or gzip), a string names the codec
+
+    Returns:
+        str or None: Codec to use
+    """
+    if compress is False:
+        return None
+    if isinstance(compress, str):
+        if not available(compress):
+            raise ValueError(f"Codec {compress} is not available")
+        return compress
+    if compress is True:
+        return policy.codec if policy else 'gzip'
+    return policy.choose(object_name, content_type, size) if policy else None
+
+
+class CompressingReader:
+    """
+    File-like object yielding the compressed form of another stream.
+
+    The source is read one frame at a time, so memory stays bounded. With an
+    executor, up to 2 * workers frames are compressed concurrently and
+    emitted in order.
+    """
+
+    def __init__(self, source, codec, level=None, frame_size=FRAME_SIZE, executor=None, workers=0):
+        self.source = source
+        self.codec = codec
+        self.level = level
+        self.frame_size = frame_size
+        self.executor = executor
+        self.lookahead = max(1, 2 * workers) if executor else 1
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._pending = deque()
+        self._buffer = bytearray()
+        self._eof = False
+
+    def _fill(self):
+        while not self._eof and len(self._pending) < self.lookahead:
+            frame = self.source.read(self.frame_size)
+            if not frame:
+                self._eof = True
+                break
+            self.bytes_in += len(frame)
+            if self.executor:
+                self._pending.append(self.executor.submit(compress_frame, self.codec, self.level, frame))
+            else:
+                self._pending.append(compress_frame(self.codec, self.level, frame))
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            self._fill()
+            if not self._pending:
+                break
+            frame = self._pending.popleft()
+            self._buffer += frame.result() if self.executor else frame
+        if size < 0:
+            size = len(self._buffer)
+        out = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.bytes_out += len(out)
+        return out
+
+
+class DecompressionError(ValueError):
+    """Raised when a compressed object cannot be decoded: corrupt, truncated, or an unavailable codec."""
+
+
+class _StreamDecoder:
+    """
+    Incremental decoder for concatenated gzip members or zstd frames.
+
+    finish() must be called once the input ends: a stream cut off inside
+    its last member or frame decodes without error up to that point. An
+    empty stream is valid; CompressingReader emits no frame for empty input.
+    """
+
+    codec = None
+
+    def __init__(self):
+        self._inflater = self._new()
+        self._partial = False
+
+    def _new(self):
+        raise NotImplementedError
+
+    def decode(self, data):
+        out = []
+        try:
+            while data:
+                self._partial = True
+                out.append(self._inflater.decompress(data))
+                if not self._inflater.eof:
+                    break
+                self._partial = False
+                data = self._inflater.unused_data
+                self._inflater = self._new()
+        except DECODE_ERRORS as e:
+            raise DecompressionError(f"Corrupt {self.codec} data: {e}") from e
+        return b"".join(out)
+
+    def finish(self):
+        """
+        Raises:
+            DecompressionError: If the stream ended inside a member or frame
+        """
+        if self._partial:
+            raise DecompressionError(f"Truncated {self.codec} stream")
+
+
+class _GzipStreamDecoder(_StreamDecoder):
+    """Incremental gzip decoder that handles multiple concatenated members."""
+
+    codec = 'gzip'
+
+    def _new(self):
+        return zlib.decompressobj(31)
+
+
+class _ZstdStreamDecoder(_StreamDecoder):
+    """Incremental zstd decoder that handles multiple concatenated frames."""
+
+    codec = 'zstd'
+
+    def __init__(self):
+        self._dctx = zstandard.ZstdDecompressor()
+        super().__init__()
+
+    def _new(self):
+        return self._dctx.decompressobj()
+
+
+def stream_decoder(codec):
+    """
+    Incremental decoder for a codec.
+
+    Returns:
+        object: Object with decode(bytes) -> bytes and finish(), which checks the stream was complete
+
+    Raises:
+        DecompressionError: If the codec is unknown or its package is not installed
+    """
+    if codec == 'zstd':
+        if zstandard is None:
+            raise DecompressionError("Object is zstd-compressed but zstandard is not installed")
+        return _ZstdStreamDecoder()
+    if codec == 'gzip':
+        return _GzipStreamDecoder()
+    raise DecompressionError(f"Unknown codec {codec}")
+
+
+def decompress_chunks(chunks, codec):
+    """
+    Decompress an iterable of compressed chunks lazily.
+
+    Args:
+        chunks (iterable): Compressed byte chunks, e.g. response.stream()
+        codec (str): Codec recorded in the object metadata
+
+    Yields:
+        bytes: Decompressed chunks
+    """
+    decoder = stream_decoder(codec)
+    for chunk in chunks:
+        data = decoder.decode(chunk)
+        if data:
+            yield data
+    decoder.finish()
+
+
+def codec_from_metadata(metadata):
+    """
+    Codec recorded in an object's metadata (as returned by stat_object).
+
+    Returns:
+        str or None: Codec name, or None if the object is not compressed
+    """
+    for key, value in (metadata or {}).items():
+        if key.lower() == f"x-amz-meta-{META_CODEC.lower()}":
+            return value
+    return None
+
+
+def compression_metadata(codec, size=None, metadata=None):
+    """User metadata recording the codec (and original size if known)."""
+    result = dict(metadata or {})
+    result[META_CODEC] = codec
+    if size is not None:
+        result[META_SIZE] = str(size)
+    return result
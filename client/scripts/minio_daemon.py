@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Long-running job daemon and its thin client.
+
+`minio_multi_server.py -a daemon` keeps warm clients, connection pools and
+circuit breakers for every configured server and accepts jobs on a local
+Unix socket. Each connection sends one JSON object per line and gets one
+JSON object back per line:
+
+    {"op": "upload", "file": "/data/a.csv", "object": "reports/a.csv"}
+    {"ok": true, "result": {"servers": {"NG": true, "BW": true}, ...}}
+
+Operations: ping, upload, download, delete, sync, wait, stats, shutdown.
+Jobs from all connections share one worker pool. In async replication mode
+an upload is answered once the primary has the object; `wait` blocks until
+every server has it.
+
+This module doubles as the client and only imports the standard library at
+startup, so a cron job or shell script pays milliseconds, not seconds:
+
+    python3 minio_daemon.py upload /data/a.csv reports/a.csv
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+
+
+def default_socket_path():
+    """Per-user socket path, in XDG_RUNTIME_DIR if available."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'minio-daemon.sock')
+    return os.path.join('/tmp', f'minio-daemon-{os.getuid()}.sock')
+
+
+# Client side
+
+def request(payload, socket_path=None, timeout=None):
+    """
+    Send one job to the daemon and wait for its answer.
+
+    Args:
+        payload (dict): The job, e.g. {"op": "upload", "file": ..., "object": ...}
+        socket_path (str, optional): Daemon socket (default: default_socket_path())
+        timeout (float, optional): Seconds to wait for the answer
+
+    Returns:
+        dict: The daemon's response, with 'ok' and either 'result' or 'error'
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(payload).encode('utf-8') + b"\n")
+        with sock.makefile('rb') as responses:
+            line = responses.readline()
+    if not line:
+        raise ConnectionError("Daemon closed the connection without answering")
+    return json.loads(line)
+
+
+def is_listening(socket_path):
+    """True if a process accepts connections on the Unix socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(1.0)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+# Server side
+
+class JobServer:
+    """Runs jobs from the Unix socket on a shared worker pool."""
+
+    def __init__(self, clients, socket_path=None, workers=8, router=None, repairer=None, hints=None,
+                 replicator=None, tombstones=None):
+        """
+        Args:
+            clients (dict): Dictionary with MinioWrapper instances, kept warm for the daemon's lifetime
+            socket_path (str, optional): Socket to listen on (default: default_socket_path())
+            workers (int): Jobs run concurrently across all connections
+            router (ReplicaRouter, optional): Read order for downloads when no server is named
+            repairer (ReadRepairer, optional): Repairs replicas seen missing or stale by downloads
+            hints (HintQueue, optional): Records uploads that failed on some servers for hinted handoff
+            replicator (AsyncReplicator, optional): Uploads go to its primary and are replicated in the background
+            tombstones (Tombstones, optional): Records deletes that failed on some servers
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.clients = clients
+        self.socket_path = socket_path or default_socket_path()
+        self.router = router
+        self.repairer = repairer
+        self.hints = hints
+        self.replicator = replicator
+        self.tombstones = tombstones
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.started = time.time()
+        self.stats = {'jobs': 0, 'failed': 0}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def handle(self, job):
+        """
+        Run one job synchronously.
+
+        Returns:
+            dict: Response with 'ok' and 'result' or 'error'
+        """
+        op = job.get('op')
+        handler = getattr(self, f"_op_{op}", None) if isinstance(op, str) else None
+        if handler is None:
+            return {'ok': False, 'error': f"Unknown operation '{op}'"}
+        try:
+            result = self.pool.submit(handler, job).result()
+            ok = result.pop('ok', True) if isinstance(result, dict) else True
+            response = {'ok': ok, 'result': result}
+        except Exception as e:
+            ok = False
+            response = {'ok': False, 'error': str(e)}
+        with self._lock:
+            self.stats['jobs'] += 1
+            if not ok:
+                self.stats['failed'] += 1
+        return response
+
+    def _op_ping(self, job):
+        return {'pong': True}
+
+    def _op_stats(self, job):
+        with self._lock:
+            stats = dict(self.stats)
+        stats['uptime'] = round(time.time() - self.started, 1)
+        stats['servers'] = {name: client.breaker.state for name, client in self.clients.items()}
+        if self.repairer is not None:
+            stats['read_repair'] = self.repairer.snapshot()
+        if self.replicator is not None:
+            stats['replication'] = self.replicator.snapshot()
+        elif self.hints is not None:
+            stats['handoff'] = self.hints.depth()
+        if self.tombstones is not None:
+            stats['tombstones'] = self.tombstones.depth()
+        return stats
+
+    def _run_item(self, job):
+        from minio_batch import normalize_item, execute_item
+        item = normalize_item(job, 0)
+        if item['op'] == 'download' and not item['server'] and (self.router or self.repairer):
+            failed = []
+            for server_name in (self.router.read_order() if self.router else list(self.clients)):
+                if self.clients[server_name].download_file(item['object'], item['file']):
+                    if self.repairer is not None:
+                        self.repairer.submit(item['object'], server_name, failed)
+                    return {'ok': True, 'servers': {server_name: True}}
+                failed.append(server_name)
+            return {'ok': False, 'servers': {}}
+        if item['op'] == 'upload' and not item['server'] and self.replicator is not None:
+            primary, queued = self.replicator.upload_file(item['file'], item['object'])
+            return {'ok': primary is not None, 'servers': {primary: True} if primary else {}, 'queued': queued}
+        if item['op'] == 'delete' and not item['server'] and self.hints is not None:
+            # A pending write replayed after the delete would bring the key back
+            self.hints.forget(item['object'])
+        result = execute_item(self.clients, item)
+        if item['op'] == 'delete' and not item['server'] and self.tombstones is not None:
+            for server_name, ok in result['servers'].items():
+                if not ok:
+                    self.tombstones.add(server_name, item['object'])
+        if item['op'] == 'upload' and not item['server'] and self.hints is not None:
+            replicas = [name for name, ok in result['servers'].items() if ok]
+            for server_name, ok in result['servers'].items():
+                if not ok:
+                    self.hints.add(server_name, item['object'], item['file'], replicas)
+        return {'ok': result['ok'], 'servers': result['servers'], 'error': result['error'],
+                'seconds': result['seconds']}
+
+    _op_upload = _run_item
+    _op_download = _run_item
+    _op_delete = _run_item
+
+    def _op_wait(self, job):
+        """Wait until every server has the latest write of an object (async replication mode)."""
+        if self.replicator is None:
+            raise ValueError("The daemon does not run in async replication mode")
+        if not job.get('object'):
+            raise ValueError("wait needs an object")
+        replicated = self.replicator.wait_for_replication(job['object'], job.get('timeout', 60.0))
+        return {'ok': replicated, 'replicated': replicated}
+
+    def _op_sync(self, job):
+        """Upload every file under a directory that any server lacks or holds at a different size."""
+        directory = job.get('directory')
+        if not directory or not os.path.isdir(directory):
+            raise ValueError(f"Not a directory: {directory}")
+        prefix = job.get('prefix', '')
+        counts = {'ok': True, 'uploaded': 0, 'skipped': 0, 'failed': 0}
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                object_name = prefix + os.path.relpath(path, directory).replace(os.sep, '/')
+                size = os.path.getsize(path)
+                stale = [client for client in self.clients.values()
+                         if not self._same_size(client, object_name, size)]
+                if not stale:
+                    counts['skipped'] += 1
+                elif all([client.upload_file(path, object_name) for client in stale]):
+                    counts['uploaded'] += 1
+                else:
+                    counts['failed'] += 1
+                    counts['ok'] = False
+        return counts
+
+    @staticmethod
+    def _same_size(client, object_name, size):
+        from minio_retry import CALL_ERRORS
+        if client.inventory is not None:
+            entry = client.inventory.get(object_name)
+            return entry is not None and entry['size'] == size
+        try:
+            return client._call(client.client.stat_object, client.bucket_name, object_name).size == size
+        except CALL_ERRORS:
+            return False
+
+    def _op_shutdown(self, job):
+        # shutdown() waits for serve_forever() to return, so it cannot run on a handler thread
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {'stopping': True}
+
+    def serve_forever(self):
+        """
+        Listen on the socket until a shutdown job arrives (or KeyboardInterrupt).
+
+        Returns:
+            bool: False if another daemon already listens on the socket
+        """
+        import socketserver
+
+        job_server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        job = json.loads(line)
+                    except ValueError as e:
+                        response = {'ok': False, 'error': f"Invalid JSON: {e}"}
+                    else:
+                        response = job_server.handle(job)
+                    self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+                    self.wfile.flush()
+
+        if os.path.exists(self.socket_path):
+            if is_listening(self.socket_path):
+                print(f"Error: a daemon is already listening on {self.socket_path}")
+                return False
+            # Left behind by a daemon that did not shut down cleanly
+            os.remove(self.socket_path)
+        socketserver.ThreadingUnixStreamServer.daemon_threads = True
+        # bind() creates the socket file; with this umask it is private from the start
+        umask = os.umask(0o077)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        finally:
+            os.umask(umask)
+        print(f"Daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            self.pool.shutdown(wait=True)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Send a job to a running minio_multi_server daemon')
+    parser.add_argument('--socket', '-s', help='Daemon socket (default: per-user socket)')
+    parser.add_argument('--server', help='Only use this server (upload, download, delete)')
+    parser.add_argument('--timeout', type=float, help='Seconds to wait for the answer')
+    parser.add_argument('op', choices=['ping', 'upload', 'download', 'delete', 'sync', 'wait', 'stats', 'shutdown'])
+    parser.add_argument('args', nargs='*', help='upload FILE [OBJECT] | download OBJECT [FILE] | '
+                                                'delete OBJECT | sync DIRECTORY [PREFIX] | wait OBJECT [SECONDS]')
+    args = parser.parse_args()
+
+    job = {'op': args.op}
+    if args.server:
+        job['server'] = args.server
+    # The daemon has its own working directory, so local paths are sent absolute
+    if args.op == 'upload' and args.args:
+        job['file'] = os.path.abspath(args.args[0])
+        if len(args.args) > 1:
+            job['object'] = args.args[1]
+    elif args.op in ('download', 'delete') and args.args:
+        job['object'] = args.args[0]
+        if args.op == 'download':
+            job['file'] = os.path.abspath(args.args[1] if len(args.args) > 1 else args.args[0])
+    elif args.op == 'wait' and args.args:
+        job['object'] = args.args[0]
+        if len(args.args) > 1:
+            job['timeout'] = float(args.args[1])
+    elif args.op == 'sync' and args.args:
+        job['directory'] = os.path.abspath(args.args[0])
+        if len(args.args) > 1:
+            job['prefix'] = args.args[1]
+
+    try:
+        response = request(job, args.socket, args.timeout)
+    except (OSError, ConnectionError) as e:
+        print(f"Error: cannot reach the daemon: {e}", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(response))
+    sys.exit(0 if response.get('ok') else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Read and write pandas DataFrames directly from and to objects.
+
+Nothing touches local disk:
+- writes serialise the frame a slice of rows at a time and stream the
+  pieces into a multipart upload (MinioWrapper.upload_stream);
+- CSV and JSON-lines reads parse straight from the GET response,
+  decompressing on the fly if the object was stored compressed;
+- Parquet reads go through a seekable view of the object that turns every
+  read into a ranged GET, so only the footer and the selected columns are
+  transferred.
+
+Parquet needs the optional pyarrow package.
+"""
+
+import io
+import os
+
+import pandas as pd
+
+from minio_compression import decompress_chunks, codec_from_metadata, META_CODEC
+from minio_retry import CALL_ERRORS
+
+FORMATS = ('csv', 'parquet', 'jsonl')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'jsonl': 'application/x-ndjson',
+}
+
+_EXTENSIONS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.json': 'jsonl',
+}
+
+DEFAULT_CHUNK_ROWS = 100000
+
+
+def detect_format(object_name, data_format=None):
+    """
+    Format of an object, from the explicit argument or the file extension.
+
+    Returns:
+        str: 'csv', 'parquet' or 'jsonl'
+    """
+    if data_format is None:
+        name = object_name.lower()
+        for suffix in ('.gz', '.zst'):
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        data_format = _EXTENSIONS.get(os.path.splitext(name)[1], 'csv')
+    if data_format not in FORMATS:
+        raise ValueError(f"Unknown format {data_format}; expected one of {FORMATS}")
+    return data_format
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet support needs the pyarrow package")
+    return pyarrow
+
+
+class _ChunkSink:
+    """Write-only file that hands back what was written since the last take()."""
+
+    def __init__(self):
+        self._buffer = io.BytesIO()
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._buffer.write(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = self._buffer.getvalue()
+        self._buffer = io.BytesIO()
+        return data
+
+
+def _serialise(df, data_format, chunk_rows, **kwargs):
+    """Yield the serialised frame in pieces of at most chunk_rows rows."""
+    starts = range(0, max(len(df), 1), chunk_rows)
+    if data_format == 'csv':
+        kwargs.setdefault('index', False)
+        for start in starts:
+            yield df.iloc[start:start + chunk_rows].to_csv(header=start == 0, **kwargs).encode('utf-8')
+    elif data_format == 'jsonl':
+        for start in starts:
+            piece = df.iloc[start:start + chunk_rows]
+            if len(piece):
+                text = piece.to_json(orient='records', lines=True, **kwargs)
+                yield text.encode('utf-8') + (b"" if text.endswith("\n") else b"\n")
+    else:
+        pa = _require_pyarrow()
+        sink = _ChunkSink()
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        writer = pa.parquet.ParquetWriter(sink, schema, **kwargs)
+        try:
+            for start in starts:
+                writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema,
+                                                        preserve_index=False))
+                yield sink.take()
+        finally:
+            writer.close()
+        yield sink.take()
+
+
+def write_dataframe(client, df, object_name, data_format=None, compress=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                    **kwargs):
+    """
+    Serialise a DataFrame straight into an object.
+
+    Args:
+        client (MinioWrapper): Target server
+        df (pandas.DataFrame): Frame to write
+        object_name (str): Name of the object in MinIO
+        data_format (str, optional): 'csv', 'parquet' or 'jsonl'; guessed from the extension
+        compress (None, bool or str, optional): As for MinioWrapper.upload_data
+        chunk_rows (int): Rows serialised at a time (one Parquet row group each)
+        **kwargs: Passed to DataFrame.to_csv / to_json, or to pyarrow's ParquetWriter
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    data_format = detect_format(object_name, data_format)
+    if data_format == 'parquet':
+        # Parquet is compressed internally
+        compress = False if compress is None else compress
+        _require_pyarrow()
+    return client.upload_stream(_serialise(df, data_format, chunk_rows, **kwargs), object_name,
+                                content_type=CONTENT_TYPES[data_format], compress=compress)
+
+
+class _ResponseReader(io.RawIOBase):
+    """Raw binary stream over a GET response, decompressing if needed."""
+
+    def __init__(self, client, object_name):
+        super().__init__()
+        self._response = client._call(client.client.get_object, client.bucket_name, object_name)
+        codec = self._response.headers.get(f"x-amz-meta-{META_CODEC}")
+        chunks = client._stream(self._response)
+        self._chunks = decompress_chunks(chunks, codec) if codec else iter(chunks)
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if self._response is not None:
+            self._response.close()
+            self._response.release_conn()
+            self._response = None
+        super().close()
+
+
+def _open_text(client, object_name, data_format):
+    """Buffered stream over an object: bytes for CSV, text for JSON lines."""
+    stream = io.BufferedReader(_ResponseReader(client, object_name), buffer_size=1024 * 1024)
+    return stream if data_format == 'csv' else io.TextIOWrapper(stream, encoding='utf-8')
+
+
+class ObjectRangeFile:
+    """
+    Read-only, seekable file over an object; every read is a ranged GET.
+
+    Suitable for formats that read a footer and then jump to the parts they
+    need, such as Parquet.
+    """
+
+    def __init__(self, client, object_name, size=None):
+        self.client = client
+        self.object_name = object_name
+        if size is None:
+            size = client._call(client.client.stat_object, client.bucket_name, object_name).size
+        self.size = size
+        self._position = 0
+        self.closed = False
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self._position
+        size = min(size, self.size - self._position)
+        if size <= 0:
+            return b""
+        data = self.client.download_range(self.object_name, self._position, size)
+        if data is None:
+            raise IOError(f"Could not read {self.object_name}[{self._position}:{self._position + size}]")
+        self._position += len(data)
+        return data
+
+    def close(self):
+        self.closed = True
+
+
+def _read_parquet(client, object_name, columns, chunksize, filters=None, **kwargs):
+    pa = _require_pyarrow()
+    stat = client._call(client.client.stat_object, client.bucket_name, object_name)
+    if codec_from_metadata(stat.metadata):
+        # A compressed object cannot be range-read; it has to come down whole
+        data = client.download_data(object_name)
+        if data is None:
+            return None
+        source = io.BytesIO(data)
+    elif chunksize is None and not kwargs:
+        # Footer, then only the needed column chunks, coalesced and fetched concurrently.
+        # The reader takes nothing but columns and filters, so other options use pyarrow's reader
+        from minio_parquet import ParquetObjectReader
+        return ParquetObjectReader(client, object_name).read(columns, filters, to_pandas=True)
+    else:
+        source = ObjectRangeFile(client, object_name, stat.size)
+    if chunksize is None:
+        return pa.parquet.read_table(source, columns=columns, filters=filters, **kwargs).to_pandas()
+    return _iter_parquet_chunks(pa.parquet.ParquetFile(source), columns, chunksize, filters, **kwargs)
+
+
+def _iter_parquet_chunks(parquet_file, columns, chunksize, filters, **kwargs):
+    from minio_parquet import _row_mask
+    needed = columns
+    if filters and columns is not None:
+        needed = columns + [column for column, _, _ in filters if column not in columns]
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=needed, **kwargs):
+        if filters:
+            batch = batch.filter(_row_mask(batch, filters))
+            if columns is not None:
+                batch = batch.select(columns)
+        yield batch.to_pandas()
+
+
+def _iter_text_chunks(client, object_name, data_format, columns, chunksize, **kwargs):
+    reader = _open_text(client, object_name, data_format)
+    try:
+        if data_format == 'csv':
+            chunks = pd.read_csv(reader, usecols=columns, chunksize=chunksize, **kwargs)
+        else:
+            chunks = pd.read_json(reader, lines=True, chunksize=chunksize, **kwargs)
+        with chunks:
+            for chunk in chunks:
+                yield chunk[columns] if columns is not None and data_format == 'jsonl' else chunk
+    finally:
+        reader.close()
+
+
+def read_dataframe(client, object_name, data_format=None, columns=None, chunksize=None, **kwargs):
+    """
+    Parse an object straight into a DataFrame.
+
+    Args:
+        client (MinioWrapper): Source server
+        object_name (str): Name of the object in MinIO
+        data_format (str, optional): 'csv', 'parquet' or 'jsonl'; guessed from the extension
+        columns (list, optional): Only load these columns. For Parquet, only their
+            bytes are downloaded.
+        chunksize (int, optional): Return an iterator of DataFrames of this many rows
+            instead of one frame, so large objects are never fully materialised
+        **kwargs: Passed to pandas.read_csv / read_json, or to pyarrow's read_table /
+            iter_batches. Parquet also takes filters=[(column, op, value), ...], ANDed.
+
+    Returns:
+        pandas.DataFrame, iterator or None: The frame (or an iterator of frames), or None
+            if the object could not be read. Errors while iterating chunks are raised.
+    """
+    data_format = detect_format(object_name, data_format)
+    columns = list(columns) if columns is not None else None
+    try:
+        if data_format == 'parquet':
+            return _read_parquet(client, object_name, columns, chunksize, **kwargs)
+        if chunksize is not None:
+            return _iter_text_chunks(client, object_name, data_format, columns, chunksize, **kwargs)
+        reader = _open_text(client, object_name, data_format)
+        try:
+            if data_format == 'csv':
+                return pd.read_csv(reader, usecols=columns, **kwargs)
+            df = pd.read_json(reader, lines=True, **kwargs)
+            return df[columns] if columns is not None else df
+        finally:
+            reader.close()
+    except CALL_ERRORS as e:
+        print(f"Error reading {object_name} from {client.endpoint}: {e}")
+        return None
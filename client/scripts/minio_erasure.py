@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Client-side erasure coding across MinIO servers (k data + m parity shards).
+
+An object is split into k equally sized data shards and m Reed-Solomon
+parity shards over GF(2^8). The k + m shards are written concurrently to
+different servers together with a small JSON manifest. Any k shards are
+enough to rebuild the object, so m servers can be lost while storage costs
+(k + m) / k instead of one full copy per server.
+
+Arithmetic is vectorised with NumPy: multiplying a whole shard by a constant
+is one lookup in a 256x256 multiplication table, and adding shards is XOR.
+"""
+
+import json
+import hashlib
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+MANIFEST_VERSION = 1
+
+# ---------------------------------------------------------------------------
+# GF(2^8) arithmetic, primitive polynomial x^8 + x^4 + x^3 + x^2 + 1 (0x11d)
+# ---------------------------------------------------------------------------
+
+_EXP = np.zeros(512, dtype=np.uint8)
+_LOG = np.zeros(256, dtype=np.int32)
+_x = 1
+for _i in range(255):
+    _EXP[_i] = _x
+    _LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= 0x11d
+_EXP[255:510] = _EXP[:255]
+del _x, _i
+
+# _MUL[a] is the 256-entry table "multiply by a"; _MUL[a][shard] multiplies a whole shard
+_MUL = np.zeros((256, 256), dtype=np.uint8)
+_MUL[1:, 1:] = _EXP[(_LOG[1:, None] + _LOG[None, 1:]) % 255]
+
+
+def gf_mul(a, b):
+    """Multiply two field elements."""
+    return int(_MUL[a, b])
+
+
+def gf_inv(a):
+    """Multiplicative inverse of a non-zero field element."""
+    if a == 0:
+        raise ZeroDivisionError("0 has no inverse in GF(256)")
+    return int(_EXP[255 - _LOG[a]])
+
+
+def gf_invert_matrix(matrix):
+    """
+    Invert a square matrix over GF(256) with Gauss-Jordan elimination.
+
+    Args:
+        matrix (list): k x k matrix as a list of lists of ints
+
+    Returns:
+        list: The inverse matrix
+    """
+    n = len(matrix)
+    work = [list(row) + [1 if i == j else 0 for j in range(n)] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = next((r for r in range(col, n) if work[r][col]), None)
+        if pivot is None:
+            raise ValueError("Matrix is singular")
+        work[col], work[pivot] = work[pivot], work[col]
+        scale = gf_inv(work[col][col])
+        work[col] = [gf_mul(scale, v) for v in work[col]]
+        for r in range(n):
+            factor = work[r][col]
+            if r != col and factor:
+                work[r] = [v ^ gf_mul(factor, p) for v, p in zip(work[r], work[col])]
+    return [row[n:] for row in work]
+
+
+def _combine(coefficients, shards, block=1 << 16):
+    """
+    XOR-sum of coefficient * shard over all shards (one output shard).
+
+    Works in cache-sized blocks with a reused scratch buffer, which is about
+    twice as fast as multiplying whole shards at once.
+    """
+    size = len(shards[0])
+    out = np.zeros(size, dtype=np.uint8)
+    scratch = np.empty(min(block, size), dtype=np.uint8)
+    for start in range(0, size, block):
+        target = out[start:start + block]
+        tmp = scratch[:len(target)]
+        for coefficient, shard in zip(coefficients, shards):
+            segment = shard[start:start + block]
+            if coefficient == 1:
+                target ^= segment
+            elif coefficient:
+                np.take(_MUL[coefficient], segment, out=tmp)
+                target ^= tmp
+    return out
+
+
+class ReedSolomon:
+    """
+    Systematic Reed-Solomon code: shards 0..k-1 are the data itself, shards
+    k..k+m-1 are parity rows of a Cauchy matrix, so every k x k submatrix of
+    the encoding matrix is invertible.
+    """
+
+    def __init__(self, k, m):
+        """
+        Args:
+            k (int): Number of data shards
+            m (int): Number of parity shards
+        """
+        if k < 1 or m < 0 or k + m > 256:
+            raise ValueError("Need k >= 1, m >= 0 and k + m <= 256")
+        self.k = k
+        self.m = m
+        identity = [[1 if i == j else 0 for j in range(k)] for i in range(k)]
+        cauchy = [[gf_inv((k + i) ^ j) for j in range(k)] for i in range(m)]
+        self.matrix = identity + cauchy
+
+    def split(self, data):
+        """
+        Split a payload into k equally sized, zero-padded data shards.
+
+        Returns:
+            numpy.ndarray: Array of shape (k, shard_size)
+        """
+        shard_size = max(1, -(-len(data) // self.k))
+        buffer = np.zeros(self.k * shard_size, dtype=np.uint8)
+        buffer[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+        return buffer.reshape(self.k, shard_size)
+
+    def encode(self, data_shards):
+        """
+        Compute the m parity shards for k data shards.
+
+        Args:
+            data_shards (numpy.ndarray): Array of shape (k, shard_size)
+
+        Returns:
+            numpy.ndarray: Array of shape (m, shard_size)
+        """
+        return np.stack([_combine(self.matrix[self.k + i], data_shards) for i in range(self.m)]) \
+            if self.m else np.zeros((0, data_shards.shape[1]), dtype=np.uint8)
+
+    def decode(self, shards):
+        """
+        Rebuild the k data shards from any k available shards.
+
+        Args:
+            shards (dict): Shard index -> numpy.ndarray for at least k shards
+
+        Returns:
+            numpy.ndarray: Array of shape (k, shard_size)
+        """
+        if len(shards) < self.k:
+            raise ValueError(f"Need {self.k} shards to decode, got {len(shards)}")
+        # Fast path: all data shards are present
+        if all(i in shards for i in range(self.k)):
+            return np.stack([shards[i] for i in range(self.k)])
+
+        indices = sorted(shards, key=lambda i: (i >= self.k, i))[:self.k]
+        inverse = gf_invert_matrix([self.matrix[i] for i in indices])
+        chosen = [shards[i] for i in indices]
+        return np.stack([
+            shards[row] if row in shards else _combine(inverse[row], chosen)
+            for row in range(self.k)
+        ])
+
+
+def shard_name(object_name, index):
+    return f"{object_name}.ec/{index:03d}"
+
+
+def manifest_name(object_name):
+    return f"{object_name}.ec/manifest.json"
+
+
+def _placement(servers, object_name, count):
+    """Assign `count` shards round-robin to servers, starting at a key-dependent offset."""
+    start = zlib.crc32(object_name.encode('utf-8')) % len(servers)
+    return [servers[(start + i) % len(servers)] for i in range(count)]
+
+
+def put_erasure_coded(clients, data, object_name, k=2, m=1, workers=None):
+    """
+    Erasure-code a payload and write shards and manifest to the servers.
+
+    Shards go to different servers while k + m <= number of servers;
+    otherwise some servers hold more than one shard and the number of
+    server failures that can be tolerated drops accordingly.
+
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        data (bytes): Payload to store
+        object_name (str): Logical object name
+        k (int): Number of data shards
+        m (int): Number of parity shards
+        workers (int, optional): Concurrent shard uploads (default: k + m)
+
+    Returns:
+        dict: The manifest written, with an extra 'ok' flag that is True if
+            at least k shards and one manifest copy were stored
+    """
+    codec = ReedSolomon(k, m)
+    data_shards = codec.split(data)
+    shards = np.concatenate([data_shards, codec.encode(data_shards)])
+    servers = _placement(list(clients), object_name, k + m)
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'object_name': object_name,
+        'k': k,
+        'm': m,
+        'size': len(data),
+        'shard_size': int(shards.shape[1]),
+        'shards': [
+            {'index': i, 'server': server, 'md5': hashlib.md5(shards[i].tobytes()).hexdigest()}
+            for i, server in enumerate(servers)
+        ],
+    }
+
+    def put_shard(entry):
+        client = clients[entry['server']]
+        return client.upload_data(shards[entry['index']].tobytes(), shard_name(object_name, entry['index']))
+
+    with ThreadPoolExecutor(max_workers=workers or k + m) as pool:
+        stored = list(pool.map(put_shard, manifest['shards']))
+        # Every server holding a shard also gets a manifest copy
+        payload = json.dumps(manifest).encode('utf-8')
+        manifests = list(pool.map(
+            lambda server: clients[server].upload_data(payload, manifest_name(object_name),
+                                                       content_type="application/json"),
+            dict.fromkeys(servers)
+        ))
+
+    result = dict(manifest)
+    result['ok'] = sum(stored) >= k and any(manifests)
+    return result
+
+
+def read_manifest(clients, object_name):
+    """
+    Fetch the manifest of an erasure-coded object from the first server that has it.
+
+    Returns:
+        dict or None: The manifest, or None if no server returned one
+    """
+    for client in clients.values():
+        payload = client.download_data(manifest_name(object_name))
+        if payload is not None:
+            return json.loads(payload)
+    return None
+
+
+def get_erasure_coded(clients, object_name, manifest=None, workers=None):
+    """
+    Read an erasure-coded object back.
+
+    The k data shards are fetched in parallel first; only if some are
+    missing or corrupt are parity shards fetched and the data rebuilt.
+
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        object_name (str): Logical object name
+        manifest (dict, optional): Manifest, if already known
+        workers (int, optional): Concurrent shard downloads (default: k + m)
+
+    Returns:
+        bytes or None: The payload, or None if fewer than k shards are readable
+    """
+    manifest = manifest or read_manifest(clients, object_name)
+    if manifest is None:
+        return None
+    k, m = manifest['k'], manifest['m']
+    codec = ReedSolomon(k, m)
+    entries = manifest['shards']
+
+    def get_shard(entry):
+        client = clients.get(entry['server'])
+        if client is None:
+            return entry['index'], None
+        payload = client.download_data(shard_name(object_name, entry['index']))
+        if payload is None or len(payload) != manifest['shard_size'] \
+                or hashlib.md5(payload).hexdigest() != entry['md5']:
+            return entry['index'], None
+        return entry['index'], np.frombuffer(payload, dtype=np.uint8)
+
+    shards = {}
+    with ThreadPoolExecutor(max_workers=workers or k + m) as pool:
+        pending = entries[:k]
+        spare = list(entries[k:])
+        while pending:
+            for index, shard in pool.map(get_shard, pending):
+                if shard is not None:
+                    shards[index] = shard
+            needed = k - len(shards)
+            if needed <= 0 or not spare:
+                break
+            pending, spare = spare[:needed], spare[needed:]
+
+    if len(shards) < k:
+        return None
+    return codec.decode(shards).tobytes()[:manifest['size']]
+
+
+def delete_erasure_coded(clients, object_name, manifest=None):
+    """
+    Delete all shards and manifest copies of an erasure-coded object.
+
+    Returns:
+        bool: True if every delete succeeded
+    """
+    manifest = manifest or read_manifest(clients, object_name)
+    if manifest is None:
+        return False
+    ok = True
+    for entry in manifest['shards']:
+        client = clients.get(entry['server'])
+        ok = bool(client and client.delete_object(shard_name(object_name, entry['index']))) and ok
+    for server in dict.fromkeys(entry['server'] for entry in manifest['shards']):
+        client = clients.get(server)
+        ok = bool(client and client.delete_object(manifest_name(object_name))) and ok
+    return ok
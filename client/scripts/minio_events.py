@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Transfer events - pluggable hooks for upload/download progress reporting.
+
+MinioWrapper and the multi-server helpers report what they are doing through
+a TransferEvents hub instead of printing. With no listener attached the hub
+does nothing, so large batches pay no per-object console or progress cost.
+"""
+
+import sys
+import time
+import threading
+
+
+class Transfer:
+    """State of a single upload or download, passed to every listener hook."""
+
+    def __init__(self, operation, endpoint, object_name, total_bytes=0):
+        """
+        Args:
+            operation (str): 'upload' or 'download'
+            endpoint (str): Endpoint of the server involved in the transfer
+            object_name (str): Name of the object in MinIO
+            total_bytes (int, optional): Expected size in bytes, 0 if unknown
+        """
+        self.operation = operation
+        self.endpoint = endpoint
+        self.object_name = object_name
+        self.total_bytes = total_bytes
+        self.bytes_done = 0
+        self.local_path = None
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        """Seconds since the transfer started (or its total duration once finished)."""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+
+class TransferListener:
+    """
+    Base class for transfer listeners. Subclasses override only the hooks
+    they care about; the defaults do nothing.
+    """
+
+    def on_start(self, transfer):
+        """Called once when a transfer begins."""
+
+    def on_progress(self, transfer, nbytes):
+        """Called (throttled) as bytes move; nbytes is the increment since the last call."""
+
+    def on_complete(self, transfer):
+        """Called once when a transfer succeeds."""
+
+    def on_failed(self, transfer, error):
+        """Called once when a transfer fails."""
+
+
+class _ProgressTracker(threading.Thread):
+    """
+    Progress object handed to the MinIO SDK.
+
+    The SDK only accepts Thread instances as progress objects and calls
+    set_meta()/update() from the transferring thread; the thread itself is
+    never started. Updates are accumulated and forwarded to the listeners
+    at most once per `interval` seconds.
+    """
+
+    def __init__(self, events, transfer, interval):
+        super().__init__(daemon=True)
+        self._events = events
+        self._transfer = transfer
+        self._interval = interval
+        self._pending = 0
+        self._last_emit = 0.0
+
+    def set_meta(self, object_name=None, total_length=None):
+        # The SDK passes -1 for streams of unknown length
+        if total_length and total_length > 0:
+            self._transfer.total_bytes = total_length
+
+    def update(self, size):
+        self._pending += size
+        self._transfer.bytes_done += size
+        now = time.monotonic()
+        if now - self._last_emit >= self._interval:
+            self.flush(now)
+
+    def flush(self, now=None):
+        if self._pending:
+            self._events._dispatch('on_progress', self._transfer, self._pending)
+            self._pending = 0
+        self._last_emit = now if now is not None else time.monotonic()
+
+
+class TransferEvents:
+    """
+    Event hub shared by one or more MinioWrapper instances.
+
+    All methods are cheap no-ops while no listener is registered: start()
+    returns None and progress() returns None, so the SDK is not even given a
+    progress object.
+    """
+
+    def __init__(self, listeners=None, progress_interval=0.5):
+        """
+        Args:
+            listeners (list, optional): Initial TransferListener instances
+            progress_interval (float, optional): Minimum seconds between progress events per transfer
+        """
+        self._listeners = list(listeners or [])
+        self.progress_interval = progress_interval
+
+    def __bool__(self):
+        return bool(self._listeners)
+
+    def add_listener(self, listener):
+        """Register a TransferListener."""
+        self._listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener):
+        """Unregister a previously added TransferListener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _dispatch(self, hook, *args):
+        for listener in list(self._listeners):
+            getattr(listener, hook)(*args)
+
+    def start(self, operation, endpoint, object_name, total_bytes=0, local_path=None):
+        """
+        Announce a new transfer.
+
+        Returns:
+            Transfer or None: The transfer record, or None if nobody is listening
+        """
+        if not self._listeners:
+            return None
+        transfer = Transfer(operation, endpoint, object_name, total_bytes)
+        transfer.local_path = local_path
+        self._dispatch('on_start', transfer)
+        return transfer
+
+    def progress(self, transfer):
+        """
+        Build a progress object for the MinIO SDK.
+
+        Returns:
+            Thread or None: Progress object, or None if the transfer is not tracked
+        """
+        if transfer is None:
+            return None
+        return _ProgressTracker(self, transfer, self.progress_interval)
+
+    def complete(self, transfer, progress=None):
+        """Mark a transfer as successful, flushing any pending progress."""
+        if transfer is None:
+            return
+        if progress is not None:
+            progress.flush()
+        transfer.finished_at = time.monotonic()
+        self._dispatch('on_complete', transfer)
+
+    def failed(self, transfer, error, progress=None):
+        """Mark a transfer as failed."""
+        if transfer is None:
+            return
+        if progress is not None:
+            progress.flush()
+        transfer.finished_at = time.monotonic()
+        self._dispatch('on_failed', transfer, error)
+
+
+class ConsoleListener(TransferListener):
+    """Prints one line per finished transfer, as the scripts used to do."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def on_complete(self, transfer):
+        if transfer.operation == 'upload':
+            source = transfer.local_path or 'data'
+            print(f"Successfully uploaded {source} as {transfer.object_name} to {transfer.endpoint}",
+                  file=self.stream)
+        else:
+            target = transfer.local_path or 'memory'
+            print(f"Successfully downloaded {transfer.object_name} to {target} from {transfer.endpoint}",
+                  file=self.stream)
+
+    def on_failed(self, transfer, error):
+        direction = 'to' if transfer.operation == 'upload' else 'from'
+        print(f"Error during {transfer.operation} of {transfer.object_name} {direction} {transfer.endpoint}: {error}",
+              file=self.stream)
+
+
+class AggregateProgressReporter(TransferListener):
+    """
+    Reports combined throughput and ETA across all concurrent transfers.
+
+    Safe to share between threads. Output is rewritten in place on a single
+    line at most once per `interval` seconds.
+    """
+
+    def __init__(self, stream=None, interval=1.0):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._last_report = 0.0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+
+    def on_start(self, transfer):
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+            self.active += 1
+            if transfer.total_bytes:
+                transfer._counted = True
+                self.bytes_total += transfer.total_bytes
+
+    def on_progress(self, transfer, nbytes):
+        with self._lock:
+            self.bytes_done += nbytes
+            # Sizes reported by the SDK after start() are added once here
+            if transfer.total_bytes and not getattr(transfer, '_counted', False):
+                transfer._counted = True
+                self.bytes_total += transfer.total_bytes
+            self._maybe_report()
+
+    def on_complete(self, transfer):
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+            self._maybe_report()
+
+    def on_failed(self, transfer, error):
+        with self._lock:
+            self.active -= 1
+            self.failed += 1
+            self._maybe_report()
+
+    def rate(self):
+        """Average throughput in bytes per second since the first transfer started."""
+        if self._started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self._started_at
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """Estimated seconds remaining, or None if unknown."""
+        rate = self.rate()
+        remaining = self.bytes_total - self.bytes_done
+        if rate <= 0 or remaining <= 0:
+            return None
+        return remaining / rate
+
+    def _maybe_report(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        eta = self.eta()
+        eta_str = f"{eta:.0f}s" if eta is not None else "--"
+        self.stream.write(
+            f"\r{self.bytes_done / 1024**2:.1f}/{self.bytes_total / 1024**2:.1f} MB "
+            f"at {self.rate() / 1024**2:.2f} MB/s, ETA {eta_str} "
+            f"({self.active} active, {self.completed} done, {self.failed} failed)"
+        )
+        self.stream.flush()
+
+    def close(self):
+        """Print a final report and end the progress line."""
+        with self._lock:
+            self._maybe_report(force=True)
+            self.stream.write("\n")
+            self.stream.flush()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Durable hinted handoff for replica writes that could not be made.
+
+When a server is down during a replicated upload, the write is not lost:
+HintQueue records a hint, i.e. which key the server is missing and where
+the data can be found again. That is the local file (with its size and
+mtime, so a changed file is not mistaken for the original) and the
+servers that did receive it. Hints live in a small SQLite database, so they
+survive restarts.
+
+HintReplayer drains the queue in the background. Hints for servers whose
+circuit breaker is open are left alone. The others are replayed from the
+local file if it is unchanged, or else copied server-to-server from a
+replica that has the object. Failures back off exponentially per hint.
+
+The queue is bounded. When it is full, new hints are refused and the
+caller reports the write as failed, as it did before hints existed.
+
+Deletes are handed off the same way. Tombstones records a key (or prefix)
+and the deletion time for every server a delete did not reach. The replayer
+deletes it there once the server is back, sparing anything written after
+the deletion, and then drops the tombstone. A key's tombstone is gone once
+every server has confirmed. Until then it keeps hint replay and read repair
+from copying the deleted key back.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "minio-handoff", "hints.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    server TEXT NOT NULL,
+    key TEXT NOT NULL,
+    source_path TEXT,
+    source_size INTEGER,
+    source_mtime REAL,
+    replicas TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    last_error TEXT,
+    UNIQUE (server, key)
+);
+CREATE INDEX IF NOT EXISTS hints_due ON hints (next_attempt);
+"""
+
+_TOMBSTONE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tombstones (
+    server TEXT NOT NULL,
+    key TEXT NOT NULL,
+    prefix INTEGER NOT NULL DEFAULT 0,
+    deleted REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    PRIMARY KEY (server, key, prefix)
+);
+"""
+
+_COLUMNS = ('id', 'server', 'key', 'source_path', 'source_size', 'source_mtime', 'replicas', 'created',
+            'attempts', 'next_attempt', 'last_error')
+
+
+class HintQueue:
+    """Bounded, durable queue of writes owed to servers."""
+
+    def __init__(self, path=DEFAULT_PATH, max_hints=100000):
+        """
+        Args:
+            path (str): Database file; ':memory:' for a throwaway queue
+            max_hints (int): Hints held at most; add() refuses new ones beyond that
+        """
+        self.path = path
+        self.max_hints = max_hints
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def add(self, server, object_name, source_path=None, replicas=(), delay=0.0):
+        """
+        Record that `server` is owed `object_name`; replaces an older hint for the same pair.
+
+        Args:
+            server (str): Server that missed the write
+            object_name (str): Key it is missing
+            source_path (str, optional): Local file the object was uploaded from
+            replicas (iterable): Servers that hold the object
+            delay (float): Seconds before the first replay attempt
+
+        Returns:
+            bool: True if recorded, False if the queue is full
+        """
+        size = mtime = None
+        if source_path and os.path.exists(source_path):
+            source_path = os.path.abspath(source_path)
+            size = os.path.getsize(source_path)
+            mtime = os.path.getmtime(source_path)
+        else:
+            source_path = None
+        now = time.time()
+        with self._lock:
+            exists = self._db.execute("SELECT 1 FROM hints WHERE server = ? AND key = ?",
+                                      (server, object_name)).fetchone()
+            if not exists and self._db.execute("SELECT COUNT(*) FROM hints").fetchone()[0] >= self.max_hints:
+                return False
+            self._db.execute(
+                "INSERT INTO hints (server, key, source_path, source_size, source_mtime, replicas, created, "
+                "next_attempt) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (server, key) DO UPDATE SET source_path = excluded.source_path, "
+                "source_size = excluded.source_size, source_mtime = excluded.source_mtime, "
+                "replicas = excluded.replicas, created = excluded.created, attempts = 0, "
+                "next_attempt = excluded.next_attempt, last_error = NULL",
+                (server, object_name, source_path, size, mtime, json.dumps(list(replicas)), now, now + delay))
+        return True
+
+    def due(self, now=None, servers=None, limit=100, skip=None):
+        """
+        Hints whose next attempt is due, oldest first.
+
+        Args:
+            now (float, optional): Reference time (default: now)
+            servers (iterable, optional): Only hints for these servers
+            limit (int): At most this many
+            skip (iterable, optional): Leave out hints for these servers
+
+        Returns:
+            list: Hints as dicts (replicas decoded to a list)
+        """
+        query = "SELECT * FROM hints WHERE next_attempt <= ?"
+        params = [now if now is not None else time.time()]
+        if servers is not None:
+            servers = list(servers)
+            if not servers:
+                return []
+            query += f" AND server IN ({', '.join('?' * len(servers))})"
+            params.extend(servers)
+        if skip:
+            skip = list(skip)
+            query += f" AND server NOT IN ({', '.join('?' * len(skip))})"
+            params.extend(skip)
+        query += " ORDER BY next_attempt, id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        hints = []
+        for row in rows:
+            hint = dict(zip(_COLUMNS, row))
+            hint['replicas'] = json.loads(hint['replicas'])
+            hints.append(hint)
+        return hints
+
+    def done(self, hint):
+        """Remove a replayed hint, unless it was replaced by a newer write meanwhile."""
+        with self._lock:
+            self._db.execute("DELETE FROM hints WHERE id = ? AND created = ?", (hint['id'], hint['created']))
+
+    def discard(self, server, object_name):
+        """Forget what `server` is owed for a key (e.g. because a newer write reached it)."""
+        with self._lock:
+            self._db.execute("DELETE FROM hints WHERE server = ? AND key = ?", (server, object_name))
+
+    def forget(self, object_name, prefix=False):
+        """Drop every hint for a deleted key, or for every key under a deleted prefix."""
+        with self._lock:
+            if prefix:
+                self._db.execute("DELETE FROM hints WHERE substr(key, 1, ?) = ?", (len(object_name), object_name))
+            else:
+                self._db.execute("DELETE FROM hints WHERE key = ?", (object_name,))
+
+    def retry_later(self, hint, error, base_delay=1.0, max_delay=300.0):
+        """Push a hint back with exponential backoff."""
+        delay = min(max_delay, base_delay * 2 ** hint['attempts'])
+        with self._lock:
+            self._db.execute(
+                "UPDATE hints SET attempts = attempts + 1, next_attempt = ?, last_error = ? "
+                "WHERE id = ? AND created = ?",
+                (time.time() + delay, str(error)[:500], hint['id'], hint['created']))
+
+    def pending(self, object_name=None):
+        """Number of hints, optionally only for one key."""
+        with self._lock:
+            if object_name is None:
+                return self._db.execute("SELECT COUNT(*) FROM hints").fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM hints WHERE key = ?", (object_name,)).fetchone()[0]
+
+    def depth(self):
+        """
+        Returns:
+            dict: {server: {'hints': count, 'oldest': seconds since the oldest hint was recorded}}
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute("SELECT server, COUNT(*), MIN(created) FROM hints GROUP BY server").fetchall()
+        return {server: {'hints': count, 'oldest': round(now - oldest, 1)} for server, count, oldest in rows}
+
+
+class Tombstones:
+    """Deletes still owed to servers; kept next to the hints, in the same database."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Args:
+            path (str): Database file; ':memory:' for a throwaway store
+        """
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_TOMBSTONE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def add(self, server, object_name, prefix=False, deleted=None):
+        """
+        Record that `server` still holds a deleted key, or keys under a deleted prefix.
+
+        Unlike hints, tombstones are never refused: forgetting one would let the key come back.
+
+        Args:
+            server (str): Server the delete did not reach
+            object_name (str): Deleted key, or the prefix if `prefix` is set
+            prefix (bool): Whether every key under `object_name` was deleted
+            deleted (float, optional): Time of the delete (default: now)
+        """
+        deleted = deleted if deleted is not None else time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO tombstones (server, key, prefix, deleted, next_attempt) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (server, key, prefix) DO UPDATE SET deleted = excluded.deleted, attempts = 0, "
+                "next_attempt = excluded.next_attempt",
+                (server, object_name, int(prefix), deleted, deleted))
+
+    def deleted_at(self, object_name):
+        """
+        Returns:
+            float or None: Time of the latest pending delete covering this key
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MAX(deleted) FROM tombstones WHERE (prefix = 0 AND key = ?) "
+                "OR (prefix = 1 AND substr(?, 1, length(key)) = key)", (object_name, object_name)).fetchone()
+        return row[0]
+
+    def due(self, now=None, servers=None, limit=100, skip=None):
+        """Tombstones whose next attempt is due, as dicts, oldest first; same filters as HintQueue.due()."""
+        query = "SELECT server, key, prefix, deleted, attempts FROM tombstones WHERE next_attempt <= ?"
+        params = [now if now is not None else time.time()]
+        if servers is not None:
+            servers = list(servers)
+            if not servers:
+                return []
+            query += f" AND server IN ({', '.join('?' * len(servers))})"
+            params.extend(servers)
+        if skip:
+            skip = list(skip)
+            query += f" AND server NOT IN ({', '.join('?' * len(skip))})"
+            params.extend(skip)
+        query += " ORDER BY next_attempt LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [dict(zip(('server', 'key', 'prefix', 'deleted', 'attempts'), row)) for row in rows]
+
+    def confirm(self, tombstone):
+        """The server has applied the delete; drop its tombstone unless a newer delete replaced it."""
+        with self._lock:
+            self._db.execute("DELETE FROM tombstones WHERE server = ? AND key = ? AND prefix = ? AND deleted = ?",
+                             (tombstone['server'], tombstone['key'], tombstone['prefix'], tombstone['deleted']))
+
+    def retry_later(self, tombstone, base_delay=1.0, max_delay=300.0):
+        """Push a tombstone back with exponential backoff."""
+        delay = min(max_delay, base_delay * 2 ** tombstone['attempts'])
+        with self._lock:
+            self._db.execute(
+                "UPDATE tombstones SET attempts = attempts + 1, next_attempt = ? "
+                "WHERE server = ? AND key = ? AND prefix = ? AND deleted = ?",
+                (time.time() + delay, tombstone['server'], tombstone['key'], tombstone['prefix'],
+                 tombstone['deleted']))
+
+    def depth(self):
+        """
+        Returns:
+            dict: {server: tombstones not yet confirmed}
+        """
+        with self._lock:
+            return dict(self._db.execute("SELECT server, COUNT(*) FROM tombstones GROUP BY server").fetchall())
+
+
+def apply_tombstone(client, tombstone):
+    """
+    Delete a tombstoned key, or the keys under a tombstoned prefix, from one server.
+
+    Objects written after the delete are left alone.
+
+    Returns:
+        bool: True if nothing older than the delete is left
+    """
+    from minio_retry import CALL_ERRORS
+
+    def stale(obj):
+        return obj.last_modified is None or obj.last_modified.timestamp() <= tombstone['deleted']
+
+    try:
+        if tombstone['prefix']:
+            names = (obj.object_name for obj in client.scan_objects(tombstone['key']) if stale(obj))
+        else:
+            try:
+                stat = client._call(client.client.stat_object, client.bucket_name, tombstone['key'])
+            except CALL_ERRORS as e:
+                if getattr(e, 'code', None) in ('NoSuchKey', 'NoSuchObject'):
+                    return True
+                raise
+            names = [tombstone['key']] if stale(stat) else []
+        _, failed = client.delete_objects(names)
+        return not failed
+    except CALL_ERRORS as e:
+        print(f"Error applying delete of {tombstone['key']} on {client.endpoint}: {e}")
+        return False
+
+
+class HintReplayer:
+    """Drains a HintQueue into servers once they are reachable again."""
+
+    def __init__(self, hints, clients, workers=4, interval=5.0, base_delay=1.0, max_delay=300.0, tombstones=None):
+        """
+        Args:
+            hints (HintQueue): Queue to drain
+            clients (dict): Dictionary with MinioWrapper instances
+            workers (int): Hints replayed concurrently
+            interval (float): Seconds between polls of the queue in the background thread
+            base_delay (float): Backoff after a hint's first failed replay
+            max_delay (float): Longest backoff between replays of one hint
+            tombstones (Tombstones, optional): Deletes to replay as well; hints for keys
+                deleted after the write are dropped
+        """
+        self.hints = hints
+        self.tombstones = tombstones
+        self.clients = clients
+        self.workers = workers
+        self.interval = interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {'replayed': 0, 'failed': 0, 'dropped': 0, 'deleted': 0}
+        self.lag = {'last': None, 'max': 0.0, 'total': 0.0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _replayed(self, hint):
+        self.hints.done(hint)
+        # Lag: time from the original write to the replica having it
+        lag = time.time() - hint['created']
+        with self._lock:
+            self.stats['replayed'] += 1
+            self.lag['last'] = lag
+            self.lag['max'] = max(self.lag['max'], lag)
+            self.lag['total'] += lag
+
+    def _replay(self, hint):
+        target = self.clients.get(hint['server'])
+        if target is None:
+            # Server removed from the configuration; nobody will ever take this write
+            self.hints.done(hint)
+            self._count('dropped')
+            return
+        if self.tombstones is not None:
+            deleted = self.tombstones.deleted_at(hint['key'])
+            if deleted is not None and deleted >= hint['created']:
+                # The key was deleted after this write; replaying it would bring it back
+                self.hints.done(hint)
+                self._count('dropped')
+                return
+        path = hint['source_path']
+        if path and os.path.exists(path) and os.path.getsize(path) == hint['source_size'] \
+                and os.path.getmtime(path) == hint['source_mtime']:
+            if target.upload_file(path, hint['key']):
+                self._replayed(hint)
+                return
+        else:
+            sources = [name for name in hint['replicas'] if name in self.clients and name != hint['server']]
+            if not sources and not path:
+                print(f"Dropping hint for {hint['key']} on {hint['server']}: no copy left to replay from")
+                self.hints.done(hint)
+                self._count('dropped')
+                return
+            for name in sources:
+                if self.clients[name].copy_to(target, hint['key']):
+                    self._replayed(hint)
+                    return
+        self.hints.retry_later(hint, f"replay to {hint['server']} failed", self.base_delay, self.max_delay)
+        self._count('failed')
+
+    def replay_due(self, limit=1000):
+        """
+        Replay every due hint and tombstone for servers whose circuit is not open.
+
+        Hints and tombstones for servers no longer in `clients` are dropped.
+
+        Returns:
+            int: Number of hints and tombstones attempted
+        """
+        down = [name for name, client in self.clients.items() if client.breaker.state == 'open']
+        hints = self.hints.due(skip=down, limit=limit)
+        tombstones = self.tombstones.due(skip=down, limit=limit) if self.tombstones is not None else []
+        if hints or tombstones:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(self._delete, tombstones))
+                list(pool.map(self._replay, hints))
+        return len(hints) + len(tombstones)
+
+    def _delete(self, tombstone):
+        target = self.clients.get(tombstone['server'])
+        if target is None:
+            # Server removed from the configuration; there is nothing left to delete from
+            self.tombstones.confirm(tombstone)
+            self._count('dropped')
+            return
+        if apply_tombstone(target, tombstone):
+            self.tombstones.confirm(tombstone)
+            self._count('deleted')
+        else:
+            self.tombstones.retry_later(tombstone, self.base_delay, self.max_delay)
+            self._count('failed')
+
+    def snapshot(self):
+        """Counters, replication lag in seconds (last, max, average) and the queue depth per server."""
+        with self._lock:
+            stats = dict(self.stats)
+            lag = dict(self.lag)
+        total = lag.pop('total')
+        lag['avg'] = total / stats['replayed'] if stats['replayed'] else None
+        stats['lag'] = {name: round(value, 3) if value is not None else None for name, value in lag.items()}
+        stats['pending'] = self.hints.depth()
+        if self.tombstones is not None:
+            stats['tombstones'] = self.tombstones.depth()
+        return stats
+
+    def wake(self):
+        """Poll the queue now instead of at the next interval."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                while self.replay_due() and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                print(f"Hint replay error: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        """Start draining in a background thread; returns self."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
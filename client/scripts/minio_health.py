@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Background health checking and latency-aware replica routing.
+
+HealthMonitor probes each server's /minio/health/live endpoint (the same
+check the docker-compose healthchecks use) on a background thread and keeps
+an exponentially weighted moving average (EWMA) of its latency. Failed
+requests made through the monitored MinioWrappers count as failed probes
+too, so a server that starts failing is routed around before the next
+probe round. Their latency is not folded in, since it includes transfer
+time. ReplicaRouter uses that state to send reads to the fastest healthy replica
+and to keep unhealthy servers out of write sets.
+"""
+
+import functools
+import threading
+import time
+
+import urllib3
+
+from minio_retry import CircuitBreaker
+
+HEALTH_PATH = "/minio/health/live"
+
+
+class ServerHealth:
+    """Health state of one server as seen by the monitor."""
+
+    def __init__(self, name, alpha=0.3):
+        """
+        Args:
+            name (str): Server name (config section)
+            alpha (float): EWMA smoothing factor; higher reacts faster
+        """
+        self.name = name
+        self.alpha = alpha
+        self.healthy = True
+        self.latency = None
+        self.consecutive_failures = 0
+        self.last_checked = None
+        self.last_error = None
+
+    def record_success(self, latency):
+        """Fold a successful probe's latency (seconds) into the EWMA."""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.last_error = None
+        self.last_checked = time.time()
+
+    def record_failure(self, error, unhealthy_threshold):
+        """Count a failed probe or request, marking the server unhealthy past the threshold."""
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+        self.last_checked = time.time()
+        if self.consecutive_failures >= unhealthy_threshold:
+            self.healthy = False
+
+    def to_dict(self):
+        return {
+            'healthy': self.healthy,
+            'latency_ms': round(self.latency * 1000, 2) if self.latency is not None else None,
+            'consecutive_failures': self.consecutive_failures,
+            'last_checked': self.last_checked,
+            'last_error': self.last_error,
+        }
+
+
+class HealthMonitor:
+    """Periodically probes every server's liveness endpoint on a daemon thread."""
+
+    def __init__(self, clients, interval=10.0, timeout=2.0, alpha=0.3, unhealthy_threshold=2):
+        """
+        Args:
+            clients (dict): Dictionary with MinioWrapper instances
+            interval (float): Seconds between probe rounds
+            timeout (float): Connect/read timeout of a single probe
+            alpha (float): EWMA smoothing factor for latency
+            unhealthy_threshold (int): Consecutive failed probes before a server is marked unhealthy
+        """
+        self.clients = clients
+        self.interval = interval
+        self.unhealthy_threshold = unhealthy_threshold
+        self.health = {name: ServerHealth(name, alpha) for name in clients}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._http = urllib3.PoolManager(
+            timeout=urllib3.util.Timeout(connect=timeout, read=timeout),
+            retries=urllib3.Retry(total=0, raise_on_status=False),
+        )
+
+    def _health_url(self, client):
+        scheme = "https" if getattr(client, 'secure', False) else "http"
+        return f"{scheme}://{client.endpoint}{HEALTH_PATH}"
+
+    def probe(self, server_name):
+        """
+        Probe a single server once and update its state.
+
+        Returns:
+            bool: True if the server answered 200
+        """
+        client = self.clients[server_name]
+        started = time.monotonic()
+        try:
+            response = self._http.request("GET", self._health_url(client), preload_content=True)
+            ok = response.status == 200
+            error = None if ok else f"HTTP {response.status}"
+        except urllib3.exceptions.HTTPError as e:
+            ok, error = False, e
+        latency = time.monotonic() - started
+
+        with self._lock:
+            state = self.health[server_name]
+            if ok:
+                state.record_success(latency)
+            else:
+                state.record_failure(error, self.unhealthy_threshold)
+        return ok
+
+    def probe_all(self):
+        """Probe every server concurrently and wait for the results."""
+        threads = [threading.Thread(target=self.probe, args=(name,), daemon=True) for name in self.clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def observe(self, server_name, error):
+        """
+        Count a failed real request against a server, like a failed probe.
+
+        Args:
+            server_name (str): Server the request went to
+            error (Exception): The error the request ended with
+        """
+        with self._lock:
+            self.health[server_name].record_failure(error, self.unhealthy_threshold)
+
+    def is_healthy(self, server_name):
+        """True if the last probes succeeded and the server's circuit is not open."""
+        breaker = getattr(self.clients[server_name], 'breaker', None)
+        if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+            return False
+        with self._lock:
+            return self.health[server_name].healthy
+
+    def latency(self, server_name):
+        """EWMA latency in seconds, or None if never measured."""
+        with self._lock:
+            return self.health[server_name].latency
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Health state of every server as plain dictionaries
+        """
+        with self._lock:
+            return {name: state.to_dict() for name, state in self.health.items()}
+
+    def _run(self):
+        # start() has just probed, so wait a full interval before the next round
+        while not self._stop.wait(self.interval):
+            self.probe_all()
+
+    def start(self):
+        """Run an initial probe round, then keep probing in the background."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        for name, client in self.clients.items():
+            if hasattr(client, 'health_observer'):
+                client.health_observer = functools.partial(self.observe, name)
+        self.probe_all()
+        self._thread = threading.Thread(target=self._run, name="minio-health", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread and stop observing the clients' requests."""
+        self._stop.set()
+        for client in self.clients.values():
+            if hasattr(client, 'health_observer'):
+                client.health_observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+
+class ReplicaRouter:
+    """Chooses servers for reads and writes from HealthMonitor state."""
+
+    def __init__(self, clients, monitor):
+        """
+        Args:
+            clients (dict): Dictionary with MinioWrapper instances
+            monitor (HealthMonitor): Source of health and latency information
+        """
+        self.clients = clients
+        self.monitor = monitor
+
+    def _sort_key(self, server_name):
+        latency = self.monitor.latency(server_name)
+        # Servers never measured sort after measured ones
+        return (not self.monitor.is_healthy(server_name), latency is None, latency or 0.0)
+
+    def read_order(self, candidates=None):
+        """
+        Servers to try for a read, healthiest and fastest first.
+
+        Unhealthy servers are kept at the end as a last resort.
+
+        Args:
+            candidates (iterable, optional): Restrict to these server names
+
+        Returns:
+            list: Server names in preferred order
+        """
+        names = list(candidates) if candidates is not None else list(self.clients)
+        return sorted(names, key=self._sort_key)
+
+    def write_set(self, candidates=None):
+        """
+        Healthy servers that should receive a write.
+
+        Args:
+            candidates (iterable, optional): Restrict to these server names
+
+        Returns:
+            list: Server names currently considered healthy
+        """
+        names = list(candidates) if candidates is not None else list(self.clients)
+        return [name for name in names if self.monitor.is_healthy(name)]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Local inventory index of a bucket.
+
+An Inventory is a small SQLite database per server and bucket holding the
+key, size, ETag and last-modified time of every object. Prefix, pattern and
+size queries run against it instead of relisting the bucket.
+
+It is kept current three ways:
+- refresh(full=True) rescans the bucket with parallel listings and drops
+  keys that no longer exist;
+- refresh() lists only keys after the highest key a listing has seen
+  (start_after), which is cheap for append-style key names such as
+  timestamped logs. Write-through rows do not move that mark, so keys
+  other clients add below this client's own uploads are still found;
+- a MinioWrapper created with inventory=... writes its own uploads and
+  deletes through to the index as they succeed.
+
+Objects changed or deleted by other clients below the high-water key are
+only picked up by a full refresh; `max_age` triggers one automatically.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+from minio_listing import list_pages
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "minio-inventory")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    size INTEGER,
+    etag TEXT,
+    mtime REAL,
+    generation INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_BATCH = 1000
+
+
+def inventory_path(endpoint, bucket_name, cache_dir=DEFAULT_CACHE_DIR):
+    """Default database path for a server and bucket."""
+    server = f"{endpoint}_{bucket_name}".replace(':', '_').replace('/', '_')
+    return os.path.join(cache_dir, f"{server}.sqlite")
+
+
+def _prefix_upper(prefix):
+    """Smallest string greater than every key starting with `prefix`."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else None
+
+
+def _row(obj, generation):
+    mtime = obj.last_modified.timestamp() if obj.last_modified else None
+    return (obj.object_name, obj.size, (obj.etag or '').strip('"') or None, mtime, generation)
+
+
+class Inventory:
+    """SQLite index of one bucket on one server."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Database file (see inventory_path); ':memory:' for a throwaway index
+        """
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _meta(self, name, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, name, value):
+        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, str(value)))
+
+    def _upsert(self, rows):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO objects (key, size, etag, mtime, generation) VALUES (?, ?, ?, ?, ?)", rows)
+
+    # Refresh
+
+    def refresh(self, client, full=False, max_age=None, workers=16):
+        """
+        Bring the index up to date with the bucket.
+
+        Args:
+            client (MinioWrapper): Server the index belongs to
+            full (bool): Rescan everything and drop keys that are gone
+            max_age (float, optional): Force a full rescan if the last one is older than
+                this many seconds
+            workers (int): Concurrent listings for a full rescan
+
+        Returns:
+            int: Number of objects listed
+        """
+        with self._lock:
+            last_full = float(self._meta('last_full_refresh', 0))
+        if full or not last_full or (max_age is not None and time.time() - last_full > max_age):
+            return self._full_refresh(client, workers)
+        return self._incremental_refresh(client)
+
+    def _full_refresh(self, client, workers):
+        with self._lock:
+            generation = int(self._meta('generation', 0)) + 1
+        started = time.time()
+        listed = 0
+        rows = []
+        high_water = ''
+        for obj in client.scan_objects(workers=workers):
+            high_water = max(high_water, obj.object_name)
+            rows.append(_row(obj, generation))
+            if len(rows) >= _BATCH:
+                with self._lock:
+                    self._upsert(rows)
+                listed += len(rows)
+                rows = []
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._upsert(rows)
+            # Keys written through since the scan started (generation 0) may not have been listed yet
+            self._db.execute("DELETE FROM objects WHERE generation != ? AND NOT (generation = 0 AND mtime >= ?)",
+                             (generation, started))
+            self._set_meta('generation', generation)
+            self._set_meta('listed_up_to', high_water)
+            self._set_meta('last_full_refresh', started)
+            self._set_meta('last_refresh', started)
+            self._db.execute("COMMIT")
+        return listed + len(rows)
+
+    def _incremental_refresh(self, client):
+        with self._lock:
+            generation = int(self._meta('generation', 0))
+            high_water = self._meta('listed_up_to')
+            if high_water is None:
+                # Index written before the mark was kept: fall back to the highest listed (not written-through) key
+                high_water = self._db.execute("SELECT MAX(key) FROM objects WHERE generation != 0").fetchone()[0]
+        listed = 0
+        for page in list_pages(client.client, client.bucket_name, start_after=high_water or None,
+                               rate_limiter=client.rate_limiter):
+            with self._lock:
+                self._upsert([_row(obj, generation) for obj in page])
+                if page:
+                    self._set_meta('listed_up_to', page[-1].object_name)
+            listed += len(page)
+        with self._lock:
+            self._set_meta('last_refresh', time.time())
+        return listed
+
+    # Write-through
+
+    def record_put(self, key, size=None, etag=None, mtime=None):
+        """Record an object this client has just written."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO objects (key, size, etag, mtime, generation) VALUES (?, ?, ?, ?, 0)",
+                (key, size, (etag or '').strip('"') or None, mtime if mtime is not None else time.time()))
+
+    def record_delete(self, key):
+        """Record an object this client has just deleted."""
+        with self._lock:
+            self._db.execute("DELETE FROM objects WHERE key = ?", (key,))
+
+    # Queries
+
+    def get(self, key):
+        """
+        Returns:
+            dict or None: key, size, etag and mtime of an indexed object
+        """
+        with self._lock:
+            row = self._db.execute("SELECT key, size, etag, mtime FROM objects WHERE key = ?", (key,)).fetchone()
+        return dict(zip(('key', 'size', 'etag', 'mtime'), row)) if row else None
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM objects WHERE key = ?", (key,)).fetchone() is not None
+
+    def _where(self, prefix, pattern, min_size, max_size, modified_after):
+        clauses, params = [], []
+        if prefix:
+            clauses.append("key >= ? AND key < ?")
+            params += [prefix, _prefix_upper(prefix)]
+        if pattern:
+            clauses.append("key GLOB ?")
+            params.append(pattern)
+        if min_size is not None:
+            clauses.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            clauses.append("size <= ?")
+            params.append(max_size)
+        if modified_after is not None:
+            clauses.append("mtime >= ?")
+            params.append(modified_after)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def find(self, prefix="", pattern=None, min_size=None, max_size=None, modified_after=None, limit=None):
+        """
+        Query indexed objects, in key order.
+
+        Args:
+            prefix (str): Only keys starting with this prefix (uses the primary key range)
+            pattern (str, optional): Glob such as "logs/*/2024-*.gz" (case-sensitive)
+            min_size (int, optional): Minimum size in bytes
+            max_size (int, optional): Maximum size in bytes
+            modified_after (float, optional): Unix timestamp
+            limit (int, optional): Maximum number of results
+
+        Yields:
+            dict: key, size, etag and mtime
+        """
+        where, params = self._where(prefix, pattern, min_size, max_size, modified_after)
+        sql = "SELECT key, size, etag, mtime FROM objects" + where + " ORDER BY key"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(_BATCH)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(('key', 'size', 'etag', 'mtime'), row))
+
+    def summary(self, prefix="", pattern=None):
+        """
+        Returns:
+            dict: 'count' and 'total_bytes' of matching objects, plus 'last_refresh'
+        """
+        where, params = self._where(prefix, pattern, None, None, None)
+        with self._lock:
+            count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects" + where,
+                                            params).fetchone()
+            last_refresh = self._meta('last_refresh')
+        return {'count': count, 'total_bytes': total,
+                'last_refresh': float(last_refresh) if last_refresh else None}
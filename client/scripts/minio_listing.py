@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Parallel listing for large buckets.
+
+A recursive list_objects() is one sequential chain of 1000-key pages. Here
+the keyspace is split into independent pieces that are listed concurrently:
+
+- the top level is cut into character ranges (e.g. keys starting 0-7, 8-F,
+  ...), each listed with start_after and stopped at its upper bound;
+- down to `max_depth`, every range is listed with a '/' delimiter, and each
+  common prefix it finds becomes a new piece of work;
+- below that, each prefix is listed recursively.
+
+S3 returns a page's objects and common prefixes as two separate sorted
+lists, so listings are read page by page (ListObjectsV2 through the SDK's
+request layer) and each page is merged back into key order before the
+range bounds are applied.
+
+Every object is listed exactly once, so the total number of requests is
+about the same as a sequential scan, but wall time scales with `workers`.
+"""
+
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from minio.datatypes import parse_list_objects
+
+from minio_retry import CALL_ERRORS
+
+# Characters used to cut the top level into ranges, in byte order
+KEY_ALPHABET = "!-0123456789@ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz~"
+
+# Sorts after every valid key sharing the same prefix
+_KEY_MAX = "\U0010ffff"
+
+_DONE = object()
+
+
+class CommonPrefix:
+    """A common prefix of a delimiter listing, as opposed to an object.
+
+    Objects whose names end in '/' (folder markers) are real objects and are
+    listed as such; only the CommonPrefixes of a response become these.
+    """
+
+    __slots__ = ('object_name',)
+
+    def __init__(self, object_name):
+        self.object_name = object_name
+
+
+class _Stopped(Exception):
+    """The consumer went away; abandon the scan."""
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def key_ranges(prefix="", splits=16):
+    """
+    Split the keys under a prefix into contiguous ranges by their next character.
+
+    Args:
+        prefix (str): Common prefix of all keys
+        splits (int): Number of ranges
+
+    Returns:
+        list: (lower, upper) pairs; lower is inclusive, upper exclusive, None is unbounded
+    """
+    splits = max(1, min(splits, len(KEY_ALPHABET)))
+    step = len(KEY_ALPHABET) / splits
+    bounds = [prefix + KEY_ALPHABET[int(i * step)] for i in range(1, splits)]
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def _start_after(lower):
+    """The largest key that still sorts before `lower`, for use as start_after."""
+    return lower[:-1] + chr(ord(lower[-1]) - 1) + _KEY_MAX
+
+
+def list_pages(client, bucket_name, prefix="", delimiter=None, start_after=None, rate_limiter=None):
+    """
+    Yield ListObjectsV2 pages, each sorted by key with objects and prefixes merged.
+
+    Args:
+        client (Minio): MinIO SDK client
+        bucket_name (str): Bucket to list
+        prefix (str): Only list keys starting with this prefix
+        delimiter (str, optional): Roll keys up into common prefixes at this character
+        start_after (str, optional): Only list keys after this one
+        rate_limiter (RateLimiter, optional): Charged one request per page
+
+    Yields:
+        list: minio.datatypes.Object entries and, with a delimiter, CommonPrefix entries
+    """
+    continuation_token = None
+    while True:
+        query = {"list-type": "2", "delimiter": delimiter or "", "encoding-type": "url",
+                 "max-keys": "1000", "prefix": prefix or ""}
+        if continuation_token:
+            query["continuation-token"] = continuation_token
+        elif start_after:
+            query["start-after"] = start_after
+        if rate_limiter is not None:
+            rate_limiter.throttle_request()
+        response = client._execute("GET", bucket_name, query_params=query)
+        objects, is_truncated, continuation_token, _ = parse_list_objects(response)
+        # parse_list_objects returns Contents first, then CommonPrefixes; is_dir cannot
+        # tell them apart because it is true for any key ending in '/'
+        contents = len(ET.fromstring(response.data).findall("{*}Contents"))
+        page = objects[:contents] + [CommonPrefix(obj.object_name) for obj in objects[contents:]]
+        page.sort(key=lambda entry: entry.object_name)
+        yield page
+        if not is_truncated or not continuation_token:
+            return
+
+
+def _scan(client, bucket_name, task, max_depth, emit, submit, attempts, rate_limiter):
+    """List one piece of the keyspace, resuming after the last seen key on errors."""
+    prefix, lower, upper, depth = task
+    delimiter = None if depth >= max_depth else "/"
+    resume = _start_after(lower) if lower is not None else None
+    for attempt in range(attempts):
+        try:
+            for page in list_pages(client, bucket_name, prefix, delimiter, resume, rate_limiter):
+                for obj in page:
+                    name = obj.object_name
+                    if lower is not None and name < lower:
+                        continue
+                    if upper is not None and name >= upper:
+                        return
+                    if isinstance(obj, CommonPrefix):
+                        submit((name, None, None, depth + 1))
+                        resume = name + _KEY_MAX
+                    else:
+                        emit(obj)
+                        resume = name
+            return
+        except CALL_ERRORS:
+            if attempt == attempts - 1:
+                raise
+
+
+def list_objects_parallel(client, bucket_name, prefix="", workers=16, max_depth=2, splits=16, sort=False,
+                          attempts=3, buffer_size=10000, rate_limiter=None):
+    """
+    List all objects under a prefix with concurrent, disjoint listings.
+
+    Args:
+        client (Minio): MinIO SDK client
+        bucket_name (str): Bucket to list
+        prefix (str): Only list objects whose names start with this prefix
+        workers (int): Concurrent listing requests
+        max_depth (int): '/' levels explored with delimiter listings before
+            switching to recursive listings
+        splits (int): Character ranges the top level is cut into
+        sort (bool): Yield objects in key order. This holds the whole listing
+            in memory; unsorted output streams in constant memory.
+        attempts (int): Tries per piece before giving up
+        buffer_size (int): Objects buffered between the listers and the consumer
+        rate_limiter (RateLimiter, optional): Charged one request per listing page
+
+    Yields:
+        minio.datatypes.Object: Every object (not prefixes) under the prefix
+
+    Raises:
+        Exception: The first listing error that persisted after `attempts` tries
+    """
+    if sort:
+        yield from sorted(list_objects_parallel(client, bucket_name, prefix, workers, max_depth, splits,
+                                                False, attempts, buffer_size, rate_limiter),
+                          key=lambda obj: obj.object_name)
+        return
+
+    results = queue.Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+    lock = threading.Lock()
+    # Pieces not yet finished, plus one until all top-level ranges are queued
+    pending = [1]
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def emit(item):
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Stopped()
+
+    def submit(task):
+        if stopped.is_set():
+            return
+        with lock:
+            pending[0] += 1
+        pool.submit(run, task)
+
+    def release():
+        with lock:
+            pending[0] -= 1
+            finished = pending[0] == 0
+        if finished and not stopped.is_set():
+            results.put(_DONE)
+
+    def run(task):
+        try:
+            if not stopped.is_set():
+                _scan(client, bucket_name, task, max_depth, emit, submit, attempts, rate_limiter)
+        except _Stopped:
+            pass
+        except Exception as e:
+            results.put(_Failure(e))
+        finally:
+            release()
+
+    try:
+        for lower, upper in key_ranges(prefix, splits):
+            submit((prefix, lower, upper, 0))
+        release()
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        # Unblock listers waiting on a full queue, then let them exit
+        while not results.empty():
+            results.get_nowait()
+        pool.shutdown(wait=True)
@@ -3,7 +3,29 @@ import os
 import sys
 import configparser
 import argparse
+import queue
+import threading
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 from minio_wrapper import MinioWrapper
+from minio_events import TransferEvents, ConsoleListener, AggregateProgressReporter
+from minio_retry import RetryPolicy, CircuitBreaker, CALL_ERRORS
+from minio_health import HealthMonitor, ReplicaRouter
+from minio_sharding import build_ring, upload_sharded, download_sharded, rebalance
+from minio_erasure import put_erasure_coded, get_erasure_coded
+from minio_compression import CompressionPolicy
+from minio_checksum import ChecksumPolicy
+from minio_packs import PackWriter
+from minio_batch import read_manifest, failed_items, run_batch
+from minio_ratelimit import RateLimiter, parse_rate
+from minio_resume import upload_file_resumable, download_file_resumable, cleanup_abandoned_uploads
+from minio_inventory import Inventory, inventory_path
+from minio_daemon import JobServer
+from minio_verify import verify_replicas
+from minio_repair import ReadRepairer
+from minio_handoff import HintQueue, HintReplayer, Tombstones, DEFAULT_PATH as HANDOFF_PATH
+from minio_replication import AsyncReplicator
 
 def load_config(config_file):
     """
@@ -29,38 +51,87 @@ def load_config(config_file):
             'access_key': config[section]['access_key'],
             'secret_key': config[section]['secret_key'],
             'secure': config[section].getboolean('secure', fallback=False),
-            'bucket_name': config[section]['bucket_name']
+            'bucket_name': config[section]['bucket_name'],
+            # Optional resilience settings
+            'max_attempts': config[section].getint('max_attempts', fallback=3),
+            'retry_base_delay': config[section].getfloat('retry_base_delay', fallback=0.2),
+            'retry_max_delay': config[section].getfloat('retry_max_delay', fallback=10.0),
+            'failure_threshold': config[section].getint('failure_threshold', fallback=5),
+            'reset_timeout': config[section].getfloat('reset_timeout', fallback=30.0),
+            'connect_timeout': config[section].getfloat('connect_timeout', fallback=5.0),
+            'read_timeout': config[section].getfloat('read_timeout', fallback=60.0),
+            # Relative share of keys in sharded mode
+            'weight': config[section].getfloat('weight', fallback=1.0),
+            # Optional limits, e.g. "20M" bytes/s and "100" requests/s
+            'max_bytes_per_sec': parse_rate(config[section].get('max_bytes_per_sec')),
+            'max_requests_per_sec': parse_rate(config[section].get('max_requests_per_sec'))
         }
     
     return servers
 
-def initialize_clients(server_configs):
+def initialize_clients(server_configs, events=None, compression=None, global_limiter=None, inventory=False,
+                       checksum=None, keep_unreachable=False):
     """
     Initialize MinIO clients for all servers in the configuration.
     
     Args:
         server_configs (dict): Dictionary with server configurations
+        events (TransferEvents, optional): Event hub shared by all clients
+        compression (CompressionPolicy, optional): Upload compression policy shared by all clients
+        global_limiter (RateLimiter, optional): Limits shared by all servers on top of their own
+        inventory (bool): Attach a local inventory index to each client
+        checksum (ChecksumPolicy, optional): Single-pass checksum policy shared by all clients
+        keep_unreachable (bool): Keep servers that cannot be reached now, with their circuit
+            open, instead of leaving them out; writes they miss can then be handed off
         
     Returns:
         dict: Dictionary with MinioWrapper instances for each server
     """
     clients = {}
     for server_name, config in server_configs.items():
+        credentials = (config['endpoint'], config['access_key'], config['secret_key'], config['secure'],
+                       config['bucket_name'])
+        settings = None
         try:
-            clients[server_name] = MinioWrapper(
-                config['endpoint'],
-                config['access_key'],
-                config['secret_key'],
-                config['secure'],
-                config['bucket_name']
+            retry_policy = RetryPolicy(
+                max_attempts=config.get('max_attempts', 3),
+                base_delay=config.get('retry_base_delay', 0.2),
+                max_delay=config.get('retry_max_delay', 10.0)
             )
+            breaker = CircuitBreaker(
+                server_name,
+                failure_threshold=config.get('failure_threshold', 5),
+                reset_timeout=config.get('reset_timeout', 30.0)
+            )
+            rate_limiter = RateLimiter(
+                config.get('max_bytes_per_sec'),
+                config.get('max_requests_per_sec'),
+                parent=global_limiter
+            )
+            settings = dict(
+                events=events,
+                retry_policy=retry_policy,
+                breaker=breaker,
+                connect_timeout=config.get('connect_timeout', 5.0),
+                read_timeout=config.get('read_timeout', 60.0),
+                compression=compression,
+                rate_limiter=rate_limiter,
+                inventory=Inventory(inventory_path(config['endpoint'], config['bucket_name'])) if inventory else None,
+                checksum=checksum
+            )
+            clients[server_name] = MinioWrapper(*credentials, **settings)
             print(f"Connected to {server_name} at {config['endpoint']}")
         except Exception as e:
             print(f"Error connecting to {server_name}: {e}")
+            if keep_unreachable and settings is not None:
+                # Calls fail fast until the breaker's reset timeout passes, then the server is probed again
+                clients[server_name] = MinioWrapper(*credentials, check_bucket=False, **settings)
+                clients[server_name].breaker.trip()
+                print(f"  {server_name} is kept with an open circuit")
     
     return clients
 
-def upload_to_all_servers(clients, file_path, object_name=None):
+def upload_to_all_servers(clients, file_path, object_name=None, router=None, resume=False, hints=None):
     """
     Upload a file to all MinIO servers.
     
@@ -68,6 +139,11 @@ def upload_to_all_servers(clients, file_path, object_name=None):
         clients (dict): Dictionary with MinioWrapper instances
         file_path (str): Path to the local file
         object_name (str, optional): Name of the object in MinIO
+        router (ReplicaRouter, optional): If given, servers it considers unhealthy
+            are skipped and reported as failed
+        resume (bool): Checkpoint multipart uploads so an interrupted run can resume
+        hints (HintQueue, optional): Records the writes that failed, for replay once
+            the server is back
         
     Returns:
         dict: Dictionary with upload results for each server
@@ -75,32 +151,180 @@ def upload_to_all_servers(clients, file_path, object_name=None):
     results = {}
     
     if not os.path.exists(file_path):
-        print(f"Error: File {file_path} not found")
         return {server: False for server in clients}
     
     # Use filename as object_name if not specified
     if object_name is None:
         object_name = os.path.basename(file_path)
     
-    print(f"\n--- Uploading {file_path} as {object_name} to all servers ---")
+    write_set = router.write_set() if router else list(clients)
     
     for server_name, client in clients.items():
-        print(f"\nUploading to {server_name}...")
-        success = client.upload_file(file_path, object_name)
+        if server_name not in write_set:
+            results[server_name] = False
+            continue
+        if resume:
+            success = upload_file_resumable(client, file_path, object_name)
+        else:
+            success = client.upload_file(file_path, object_name)
         results[server_name] = success
     
-    # Summary
-    print("\n--- Upload Summary ---")
-    success_count = sum(1 for success in results.values() if success)
-    print(f"Uploaded to {success_count} out of {len(results)} servers.")
+    if hints is not None:
+        record_hints(hints, results, object_name, file_path)
     
-    for server, success in results.items():
-        status = "Success" if success else "Failed"
-        print(f"  {server}: {status}")
+    return results
+
+def record_hints(hints, results, object_name, file_path=None):
+    """
+    Queue a hinted handoff for every server a write failed on.
+    
+    Args:
+        hints (HintQueue): Durable queue of writes owed to servers
+        results (dict): Upload results for each server
+        object_name (str): Name of the object in MinIO
+        file_path (str, optional): Local file the object was uploaded from
+        
+    Returns:
+        list: Servers a hint was recorded for
+    """
+    replicas = [server for server, success in results.items() if success]
+    if not replicas and not file_path:
+        return []
+    
+    queued = []
+    for server_name, success in results.items():
+        if success:
+            continue
+        if hints.add(server_name, object_name, file_path, replicas):
+            queued.append(server_name)
+        else:
+            print(f"Hint queue full; {object_name} will not be handed off to {server_name}")
+    if queued:
+        print(f"Queued {object_name} for hinted handoff to {', '.join(queued)}")
+    return queued
+
+def upload_stream_to_all_servers(clients, source, object_name, content_type="application/octet-stream",
+                                 router=None, chunk_size=1024 * 1024, buffer_chunks=16, hints=None):
+    """
+    Fan one stream of unknown length out to all MinIO servers at once.
+    
+    The source is read once. Each server gets a bounded queue of chunks and
+    uploads from it in its own thread, so memory stays at roughly
+    buffer_chunks * chunk_size per server and the slowest server sets the
+    pace. A server that fails is dropped without stalling the others.
+    
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        source (file or str): Binary file-like object, or '-' for stdin
+        object_name (str): Name of the object in MinIO
+        content_type (str, optional): Content type of the object
+        router (ReplicaRouter, optional): If given, servers it considers unhealthy
+            are skipped and reported as failed
+        chunk_size (int): Bytes read from the source at a time
+        buffer_chunks (int): Chunks buffered per server
+        hints (HintQueue, optional): Records the writes that failed; they are replayed
+            by copying from a server that received the stream
+        
+    Returns:
+        dict: Dictionary with upload results for each server
+    """
+    if source == '-':
+        source = sys.stdin.buffer
+    
+    write_set = router.write_set() if router else list(clients)
+    results = {server: False for server in clients}
+    queues = {server: queue.Queue(maxsize=buffer_chunks) for server in clients if server in write_set}
+    
+    def consume(server_name):
+        chunks = queues[server_name]
+        finished = threading.Event()
+        
+        def read_chunks():
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    finished.set()
+                    return
+                yield chunk
+        
+        try:
+            results[server_name] = clients[server_name].upload_stream(read_chunks(), object_name, content_type)
+        finally:
+            # Keep draining after a failure, even an unexpected exception, so the reader never
+            # blocks on this server
+            if not finished.is_set():
+                while chunks.get() is not None:
+                    pass
+    
+    threads = [threading.Thread(target=consume, args=(server_name,), daemon=True) for server_name in queues]
+    for thread in threads:
+        thread.start()
+    try:
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            for chunks in queues.values():
+                chunks.put(chunk)
+    finally:
+        for chunks in queues.values():
+            chunks.put(None)
+        for thread in threads:
+            thread.join()
+    
+    if hints is not None:
+        record_hints(hints, results, object_name)
     
     return results
 
-def download_from_all_servers(clients, object_name, output_dir=None):
+def delete_from_all_servers(clients, object_name, prefix=False, tombstones=None, hints=None):
+    """
+    Delete a key, or every key under a prefix, from all MinIO servers at once.
+    
+    Each server deletes in batched multi-object requests in its own thread;
+    with a prefix, each server deletes what its own listing returns.
+    Servers whose circuit breaker is open are not tried. Every server the
+    delete did not fully reach gets a tombstone, so hint replay and read
+    repair do not bring the key back and the delete is replayed later.
+    
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        object_name (str): Key to delete, or the prefix if `prefix` is set
+        prefix (bool): Delete every key starting with `object_name`
+        tombstones (Tombstones, optional): Records deletes still owed to servers
+        hints (HintQueue, optional): Pending writes of the deleted keys are dropped from it
+        
+    Returns:
+        dict: {server_name: number of objects deleted, or None if the delete failed there}
+    """
+    if prefix and not object_name:
+        raise ValueError("Refusing to delete with an empty prefix")
+    if hints is not None:
+        hints.forget(object_name, prefix)
+    
+    def delete(client):
+        if client.breaker.state == 'open':
+            return None
+        try:
+            if prefix:
+                names = (obj.object_name for obj in client.scan_objects(object_name))
+            else:
+                names = [object_name]
+            deleted, failed = client.delete_objects(names)
+        except CALL_ERRORS as e:
+            print(f"Error listing {object_name} on {client.endpoint}: {e}")
+            return None
+        return None if failed else deleted
+    
+    with ThreadPoolExecutor(max_workers=len(clients) or 1) as pool:
+        futures = {server_name: pool.submit(delete, client) for server_name, client in clients.items()}
+        results = {server_name: future.result() for server_name, future in futures.items()}
+    
+    if tombstones is not None:
+        for server_name, deleted in results.items():
+            if deleted is None:
+                tombstones.add(server_name, object_name, prefix)
+    
+    return results
+
+def download_from_all_servers(clients, object_name, output_dir=None, resume=False):
     """
     Download a file from all MinIO servers.
     
@@ -108,6 +332,7 @@ def download_from_all_servers(clients, object_name, output_dir=None):
         clients (dict): Dictionary with MinioWrapper instances
         object_name (str): Name of the object in MinIO
         output_dir (str, optional): Directory to save the downloaded files
+        resume (bool): Checkpoint completed byte ranges so an interrupted run can resume
         
     Returns:
         dict: Dictionary with download results for each server
@@ -118,70 +343,525 @@ def download_from_all_servers(clients, object_name, output_dir=None):
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
     
-    print(f"\n--- Downloading {object_name} from all servers ---")
-    
     for server_name, client in clients.items():
-        print(f"\nDownloading from {server_name}...")
-        
         # Create server-specific filename to avoid overwriting
         if output_dir:
             file_path = os.path.join(output_dir, f"{server_name}_{object_name}")
         else:
             file_path = f"{server_name}_{object_name}"
         
-        success = client.download_file(object_name, file_path)
+        if resume:
+            success = download_file_resumable(client, object_name, file_path)
+        else:
+            success = client.download_file(object_name, file_path)
         results[server_name] = success
     
-    # Summary
-    print("\n--- Download Summary ---")
+    return results
+
+def download_from_best_server(clients, object_name, file_path=None, router=None, resume=False, repairer=None):
+    """
+    Download a file from a single replica, trying the fastest healthy server first.
+    
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        object_name (str): Name of the object in MinIO
+        file_path (str, optional): Path where to save the file. Defaults to object_name.
+        router (ReplicaRouter, optional): Decides the order servers are tried in.
+            Without a router, servers are tried in configuration order.
+        resume (bool): Checkpoint completed byte ranges so an interrupted run can resume
+        repairer (ReadRepairer, optional): Told about every successful read, so replicas
+            that are missing the object or hold a stale copy get repaired in the background
+        
+    Returns:
+        str or None: Name of the server the file was downloaded from, or None if all failed
+    """
+    order = router.read_order() if router else list(clients)
+    
+    failed = []
+    for server_name in order:
+        if resume:
+            success = download_file_resumable(clients[server_name], object_name, file_path)
+        else:
+            success = clients[server_name].download_file(object_name, file_path)
+        if success:
+            if repairer is not None:
+                repairer.submit(object_name, server_name, failed)
+            return server_name
+        failed.append(server_name)
+    
+    return None
+
+def pack_to_all_servers(clients, directory, pack_name, max_pack_size=None):
+    """
+    Pack every file under a directory into pack objects on all servers.
+    
+    Member names are paths relative to the directory, using '/' separators.
+    
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        directory (str): Local directory to pack
+        pack_name (str): Base name of the pack
+        max_pack_size (int, optional): Roll over to a new pack beyond this many bytes
+        
+    Returns:
+        dict: Dictionary with results for each server
+    """
+    kwargs = {'max_pack_size': max_pack_size} if max_pack_size else {}
+    writers = {server: PackWriter(client, pack_name, **kwargs) for server, client in clients.items()}
+    
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            file_path = os.path.join(root, filename)
+            member = os.path.relpath(file_path, directory).replace(os.sep, '/')
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            for writer in writers.values():
+                writer.add(member, data)
+    
+    return {server: writer.close() for server, writer in writers.items()}
+
+def print_summary(action, results):
+    """
+    Print a per-server summary of a multi-server operation.
+    
+    Args:
+        action (str): Name of the operation, e.g. 'Upload' or 'Download'
+        results (dict): Dictionary with results for each server
+    """
+    verb = {'Upload': 'Uploaded to', 'Download': 'Downloaded from'}.get(action, f"{action} on")
+    print(f"\n--- {action} Summary ---")
     success_count = sum(1 for success in results.values() if success)
-    print(f"Downloaded from {success_count} out of {len(results)} servers.")
+    print(f"{verb} {success_count} out of {len(results)} servers.")
     
     for server, success in results.items():
         status = "Success" if success else "Failed"
         print(f"  {server}: {status}")
+
+def run_erasure_coded(args, clients, object_name):
+    """Handle upload/download/fetch for --mode ec."""
+    if args.action in ['upload', 'both']:
+        if not args.file or not os.path.exists(args.file):
+            print(f"Error: File {args.file} not found")
+            sys.exit(1)
+        with open(args.file, 'rb') as f:
+            data = f.read()
+        manifest = put_erasure_coded(clients, data, object_name, args.ec_data, args.ec_parity)
+        placement = ', '.join(f"{entry['index']}@{entry['server']}" for entry in manifest['shards'])
+        status = "Stored" if manifest['ok'] else "Failed to store"
+        print(f"{status} {object_name} as {args.ec_data}+{args.ec_parity} shards: {placement}")
     
-    return results
+    if args.action in ['download', 'both', 'fetch']:
+        if not object_name:
+            print("Error: Object name is required for download operation")
+            sys.exit(1)
+        data = get_erasure_coded(clients, object_name)
+        if data is None:
+            print(f"Could not reconstruct {object_name}: fewer than k shards readable")
+            sys.exit(1)
+        file_path = os.path.join(args.output_dir, object_name) if args.output_dir else object_name
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        print(f"Reconstructed {object_name} ({len(data)} bytes) to {file_path}")
+
+def run_async_upload(args, replicator, object_name, upload):
+    """Upload to the primary, then replicate in this process unless --no-wait is given."""
+    started = time.monotonic()
+    primary, queued = upload()
+    if primary is None:
+        print(f"Upload of {object_name} failed on every server")
+        sys.exit(1)
+    print(f"Uploaded {object_name} to {primary} in {time.monotonic() - started:.3f} s; "
+          f"replication queued for {', '.join(queued) or 'no other server'}")
+    if args.no_wait:
+        return
+    replicator.start()
+    replicated = replicator.wait_for_replication(object_name, timeout=args.replication_timeout)
+    replicator.stop()
+    stats = replicator.snapshot()
+    if replicated:
+        print(f"Replicated {object_name} to every server; lag {stats['lag']['max']} s")
+    else:
+        pending = ', '.join(sorted(stats['pending'])) or 'none'
+        print(f"Replication of {object_name} still pending for {pending}; run the handoff action to finish it")
+        sys.exit(1)
 
 def main():
     parser = argparse.ArgumentParser(description='Multi-server MinIO operations')
     parser.add_argument('--config', '-c', required=True, help='Path to the config file')
-    parser.add_argument('--action', '-a', required=True, choices=['upload', 'download', 'both'], 
-                       help='Action to perform: upload, download, or both')
-    parser.add_argument('--file', '-f', help='File to upload (required for upload)')
+    parser.add_argument('--action', '-a', required=True,
+                       choices=['upload', 'download', 'both', 'fetch', 'rebalance', 'pack', 'batch', 'cleanup',
+                                'inventory', 'daemon', 'verify', 'handoff', 'delete'],
+                       help='Action to perform: upload, download, both, fetch (download from the best replica), '
+                            'rebalance (move keys after servers were added or removed in shard mode) '
+                            'pack (pack the small files of directory --file into pack --object) '
+                            'batch (run the operations listed in --manifest) '
+                            'verify (compare replicas by listing, deep-checking flagged and sampled keys) '
+                            'handoff (replay the hinted writes and deletes that are due and show the queue) '
+                            'or delete (remove --object, or every key under --prefix, from all servers)')
+    parser.add_argument('--file', '-f', help="File to upload (required for upload; '-' streams stdin)")
     parser.add_argument('--object', '-o', help='Object name in MinIO (uses filename if not specified)')
     parser.add_argument('--output-dir', '-d', help='Directory to save downloaded files')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Only print the final summary')
+    parser.add_argument('--progress', '-p', action='store_true',
+                       help='Show aggregate throughput and ETA across all transfers')
+    parser.add_argument('--mode', '-m', choices=['replicate', 'shard', 'ec', 'async'], default='replicate',
+                       help='replicate: every object on every server (default); '
+                            'shard: each object on its consistent-hash owners only; '
+                            'ec: erasure-coded into data and parity shards across servers; '
+                            'async: upload to one primary, copy to the other servers in the background')
+    parser.add_argument('--primary', help='Async mode: server written to synchronously '
+                                          '(default: the fastest healthy one with --health, else the first)')
+    parser.add_argument('--replication-timeout', type=float, default=300.0,
+                        help='Async upload: seconds to wait for the copies before leaving them queued (default: 300)')
+    parser.add_argument('--no-wait', action='store_true',
+                        help='Async upload: exit once the primary has the object; the handoff action '
+                             'or a daemon completes the replication')
+    parser.add_argument('--replicas', '-r', type=int, default=1,
+                       help='Copies per object in shard mode (default: 1)')
+    parser.add_argument('--vnodes', type=int, default=100,
+                       help='Virtual nodes per unit of weight on the hash ring (default: 100)')
+    parser.add_argument('--ec-data', type=int, default=2, help='Data shards (k) in ec mode (default: 2)')
+    parser.add_argument('--ec-parity', type=int, default=1, help='Parity shards (m) in ec mode (default: 1)')
+    parser.add_argument('--drain', action='append', default=[],
+                       help='Server to take off the hash ring (repeatable); rebalance moves its keys away')
+    parser.add_argument('--dry-run', action='store_true', help='Rebalance: only report what would move')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                       help='Compress compressible uploads (CSV, JSON, text) with this codec')
+    parser.add_argument('--compress-workers', type=int, default=0,
+                       help='Processes for parallel frame compression of large files (default: inline)')
+    parser.add_argument('--checksum', choices=['md5', 'sha256', 'crc32c'],
+                       help='Hash transfers in a single pass: Content-MD5 per part, ETag check after upload, '
+                            'and verification of downloads')
+    parser.add_argument('--hash-workers', type=int, default=4,
+                       help='Threads hashing and sending parts of checksummed uploads (default: 4)')
+    parser.add_argument('--manifest', help="Batch: CSV or JSON-lines manifest of operations ('-' for stdin)")
+    parser.add_argument('--retry-failed', metavar='RESULT_LOG',
+                       help='Batch: re-run the failed items of a previous result log')
+    parser.add_argument('--results',
+                       help='Batch/verify: append per-item results or findings to this JSON-lines file')
+    parser.add_argument('--workers', '-w', type=int, default=8, help='Batch/daemon: concurrent items or jobs (default: 8)')
+    parser.add_argument('--max-bandwidth', help='Global bandwidth limit across all servers, e.g. 50M (bytes/s)')
+    parser.add_argument('--max-rps', help='Global request-rate limit across all servers (requests/s)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Checkpoint uploads/downloads so an interrupted transfer continues where it stopped')
+    parser.add_argument('--older-than', type=float, default=24.0,
+                       help='Cleanup: abort multipart uploads older than this many hours (default: 24)')
+    parser.add_argument('--inventory', action='store_true',
+                       help='Keep a local index of each bucket up to date with this run\'s uploads and deletes')
+    parser.add_argument('--full-refresh', action='store_true',
+                       help='Inventory: rescan the whole bucket instead of only keys after the newest indexed one')
+    parser.add_argument('--pattern', help='Inventory: only show keys matching this glob, e.g. "logs/*.gz"')
+    parser.add_argument('--prefix', default='',
+                        help='Verify: only compare keys under this prefix; delete: delete every key under it')
+    parser.add_argument('--sample', type=float, default=0.001,
+                       help='Verify: fraction of identical-looking keys to deep-check by content (default: 0.001)')
+    parser.add_argument('--reference', help='Verify: server the others are compared with (default: the first)')
+    parser.add_argument('--read-repair', action='store_true',
+                       help='Fetch/daemon: copy the object in the background to replicas found missing or stale')
+    parser.add_argument('--repair-chance', type=float, default=0.1,
+                       help='Read repair: fraction of clean reads whose replicas are checked too (default: 0.1)')
+    parser.add_argument('--repair-rate', type=float,
+                       help='Read repair: maximum repairs started per second (default: unlimited)')
+    parser.add_argument('--handoff', action='store_true',
+                        help='Upload/daemon: queue writes that failed on a server and replay them once it is back')
+    parser.add_argument('--handoff-db', default=HANDOFF_PATH,
+                        help=f'Hinted handoff queue database (default: {HANDOFF_PATH})')
+    parser.add_argument('--max-hints', type=int, default=100000,
+                        help='Hinted handoff: writes queued at most; later failures are only reported '
+                             '(default: 100000)')
+    parser.add_argument('--socket', help='Daemon: Unix socket to accept jobs on (default: per-user socket)')
+    parser.add_argument('--health', action='store_true',
+                       help='Probe server health first; skip unhealthy servers and read from the fastest replica')
+    parser.add_argument('--health-interval', type=float, default=10.0,
+                       help='Seconds between background health probes (default: 10)')
     
     args = parser.parse_args()
     
     # Load server configurations
     server_configs = load_config(args.config)
     
+    # Attach console output and progress reporting only when asked for
+    events = TransferEvents()
+    if not args.quiet:
+        events.add_listener(ConsoleListener())
+    reporter = events.add_listener(AggregateProgressReporter()) if args.progress else None
+    
+    compression = CompressionPolicy(args.compress, workers=args.compress_workers) if args.compress else None
+    checksum = ChecksumPolicy(args.checksum, workers=args.hash_workers) if args.checksum else None
+    
+    global_limiter = None
+    if args.max_bandwidth or args.max_rps:
+        global_limiter = RateLimiter(parse_rate(args.max_bandwidth), parse_rate(args.max_rps))
+    
     # Initialize clients for all servers
-    clients = initialize_clients(server_configs)
+    # Writes, deletes and handoff replays must see servers that are down right now, or those
+    # servers would silently miss a copy or keep a deleted key. The hash ring is built from the
+    # configuration, so every server on it needs a client as well, and verify reports a server
+    # it cannot list instead of leaving it out
+    keep_unreachable = (args.action in ('upload', 'both', 'daemon', 'handoff', 'delete', 'rebalance', 'verify')
+                        or args.mode == 'shard')
+    clients = initialize_clients(server_configs, events, compression, global_limiter,
+                                 inventory=args.inventory or args.action == 'inventory', checksum=checksum,
+                                 keep_unreachable=keep_unreachable)
     
-    if not clients:
+    if not any(client.breaker.allow() for client in clients.values()):
         print("Error: No MinIO clients could be initialized. Exiting.")
         sys.exit(1)
     
+    # Start background health checking if requested
+    monitor = None
+    router = None
+    if args.health:
+        monitor = HealthMonitor(clients, interval=args.health_interval).start()
+        router = ReplicaRouter(clients, monitor)
+        for server, state in monitor.snapshot().items():
+            status = f"{state['latency_ms']} ms" if state['healthy'] else f"unhealthy ({state['last_error']})"
+            print(f"  {server}: {status}")
+    
+    # Hash ring for shard mode
+    ring = None
+    if args.mode == 'shard' or args.action == 'rebalance':
+        unknown = [name for name in args.drain if name not in server_configs]
+        if unknown:
+            print(f"Error: cannot drain unknown server(s): {', '.join(unknown)}")
+            sys.exit(1)
+        # Placement follows the configuration, not whichever servers happen to be reachable now
+        ring = build_ring(server_configs, [name for name in server_configs if name not in args.drain], args.vnodes)
+    
+    if args.action == 'rebalance':
+        try:
+            stats = rebalance(clients, ring, args.replicas, dry_run=args.dry_run)
+        except CALL_ERRORS:
+            print("Error: rebalance stopped before moving anything; every server must be listable.")
+            sys.exit(1)
+        print(f"Scanned {stats['scanned']} objects, {stats['moved']} need to move.")
+        if not args.dry_run:
+            print(f"Copied {stats['copied']}, deleted {stats['deleted']}, failed {stats['failed']}.")
+        return
+    
+    if args.action == 'batch':
+        if not args.manifest and not args.retry_failed:
+            print("Error: batch needs --manifest or --retry-failed")
+            sys.exit(1)
+        inputs = [path for path in (args.retry_failed, args.manifest) if path and path != '-']
+        if args.results and any(os.path.realpath(path) == os.path.realpath(args.results) for path in inputs):
+            print("Error: --results must be a different file from the manifest or retried log")
+            sys.exit(1)
+        items = failed_items(args.retry_failed) if args.retry_failed else read_manifest(args.manifest)
+        stats = run_batch(clients, items, args.workers, args.results)
+        if reporter:
+            reporter.close()
+        print(f"\n--- Batch Summary ---")
+        print(f"{stats['succeeded']} of {stats['total']} items succeeded, {stats['failed']} failed.")
+        if stats['failed'] and args.results:
+            print(f"Re-run the failures with --retry-failed {args.results} --results <new log>")
+        if monitor:
+            monitor.stop()
+        sys.exit(1 if stats['failed'] else 0)
+    
+    if args.action == 'cleanup':
+        for server_name, client in clients.items():
+            try:
+                aborted = cleanup_abandoned_uploads(client, timedelta(hours=args.older_than), args.object or "")
+                print(f"{server_name}: aborted {aborted} abandoned multipart upload(s)")
+            except Exception as e:
+                print(f"{server_name}: cleanup failed: {e}")
+        return
+    
+    # Hints and tombstones share one database: writes and deletes still owed to servers
+    hints = None
+    tombstones = None
+    if args.handoff or args.action in ('handoff', 'delete') or args.mode == 'async':
+        hints = HintQueue(args.handoff_db, args.max_hints)
+        tombstones = Tombstones(args.handoff_db)
+    replicator = None
+    if args.mode == 'async':
+        if args.primary and args.primary not in clients:
+            print(f"Error: unknown primary server {args.primary}")
+            sys.exit(1)
+        replicator = AsyncReplicator(clients, hints, args.primary, router, tombstones=tombstones)
+    
+    repairer = None
+    if args.read_repair and args.action in ('fetch', 'daemon'):
+        repairer = ReadRepairer(clients, repairs_per_sec=args.repair_rate, chance=args.repair_chance,
+                                tombstones=tombstones)
+    
+    if args.action == 'handoff':
+        replayer = HintReplayer(hints, clients, workers=args.workers, tombstones=tombstones)
+        replayed = replayer.replay_due()
+        print(f"Replayed {replayer.stats['replayed']} hint(s) and {replayer.stats['deleted']} delete(s) "
+              f"of {replayed} due, {replayer.stats['failed']} failed, {replayer.stats['dropped']} dropped")
+        depth = hints.depth()
+        for server_name, queued in sorted(depth.items()):
+            print(f"  {server_name}: {queued['hints']} hint(s) pending, oldest {queued['oldest']} s")
+        owed = tombstones.depth()
+        for server_name, count in sorted(owed.items()):
+            print(f"  {server_name}: {count} delete(s) pending")
+        hints.close()
+        tombstones.close()
+        if monitor:
+            monitor.stop()
+        sys.exit(1 if depth or owed else 0)
+    
+    if args.action == 'delete':
+        if not args.object and not args.prefix:
+            print("Error: delete needs --object or --prefix")
+            sys.exit(1)
+        target = args.prefix or args.object
+        results = delete_from_all_servers(clients, target, bool(args.prefix), tombstones, hints)
+        print(f"\n--- Delete Summary ---")
+        for server_name, deleted in results.items():
+            if deleted is None:
+                status = "failed; tombstone recorded"
+            else:
+                status = f"deleted {deleted} object(s)" if args.prefix else "deleted"
+            print(f"  {server_name}: {status}")
+        hints.close()
+        tombstones.close()
+        if monitor:
+            monitor.stop()
+        sys.exit(0 if all(deleted is not None for deleted in results.values()) else 1)
+    
+    if args.action == 'daemon':
+        # The replicator's workers also replay handoff hints
+        if replicator:
+            replayer = replicator.start()
+        else:
+            replayer = HintReplayer(hints, clients, tombstones=tombstones).start() if hints else None
+        served = JobServer(clients, args.socket, args.workers, router, repairer, hints, replicator,
+                           tombstones).serve_forever()
+        if replayer:
+            replayer.stop()
+        if repairer:
+            repairer.close()
+        if monitor:
+            monitor.stop()
+        if compression:
+            compression.close()
+        if not served:
+            sys.exit(1)
+        return
+    
+    if args.action == 'verify':
+        if args.reference and args.reference not in clients:
+            print(f"Error: unknown reference server {args.reference}")
+            sys.exit(1)
+        output = open(args.results, 'a') if args.results else None
+        try:
+            report = verify_replicas(clients, args.prefix, args.reference, args.sample, args.workers, output)
+        finally:
+            if output:
+                output.close()
+        summary = report.to_dict()
+        print(f"Verified {summary['keys']} key(s) across {len(clients)} server(s), "
+              f"{summary['deep_checks']} deep check(s)")
+        for status in report.STATUSES:
+            if summary[status]:
+                print(f"  {status}: {summary[status]}")
+        for finding in report.examples:
+            key = finding['key'] if finding['key'] is not None else 'listing'
+            print(f"  {finding['status']}: {key} {finding.get('server', '')}".rstrip())
+        if monitor:
+            monitor.stop()
+        sys.exit(0 if report.consistent else 1)
+    
+    if args.action == 'inventory':
+        for server_name, client in clients.items():
+            listed = client.inventory.refresh(client, full=args.full_refresh)
+            summary = client.inventory.summary(args.object or "", args.pattern)
+            print(f"{server_name}: listed {listed} new object(s); {summary['count']} matching, "
+                  f"{summary['total_bytes']} bytes")
+            if args.object or args.pattern:
+                for entry in client.inventory.find(args.object or "", args.pattern):
+                    print(f"  {entry['key']}  {entry['size']}")
+        return
+    
+    if args.action == 'pack':
+        if not args.file or not os.path.isdir(args.file) or not args.object:
+            print("Error: pack needs a directory as --file and a pack name as --object")
+            sys.exit(1)
+        print_summary('Pack', pack_to_all_servers(clients, args.file, args.object))
+        return
+    
     # Determine object name
     object_name = args.object
     if args.action in ['upload', 'both'] and args.file:
         if not object_name:
             object_name = os.path.basename(args.file)
     
+    if args.action == 'upload' and args.file == '-':
+        # Stream stdin of unknown length, e.g. pg_dump | ... -a upload -f - -o db.sql
+        if not args.object or args.mode == 'ec':
+            print("Error: uploading from stdin needs --object and replicate, shard or async mode")
+            sys.exit(1)
+        if replicator:
+            run_async_upload(args, replicator, object_name, lambda: replicator.upload_stream('-', object_name))
+            return
+        targets = clients
+        if ring:
+            targets = {name: clients[name] for name in ring.nodes_for(object_name, args.replicas)}
+        results = upload_stream_to_all_servers(targets, '-', object_name, router=router, hints=hints)
+        if reporter:
+            reporter.close()
+        print_summary('Upload', results)
+        if monitor:
+            monitor.stop()
+        return
+    
+    if args.mode == 'ec':
+        run_erasure_coded(args, clients, object_name)
+        return
+    
     # Perform requested actions
     if args.action in ['upload', 'both']:
         if not args.file:
             print("Error: File path is required for upload operation")
             sys.exit(1)
-        upload_to_all_servers(clients, args.file, object_name)
+        if not os.path.exists(args.file):
+            print(f"Error: File {args.file} not found")
+            sys.exit(1)
+        if replicator:
+            run_async_upload(args, replicator, object_name,
+                             lambda: replicator.upload_file(args.file, object_name))
+            return
+        if ring:
+            results = upload_sharded(clients, ring, args.file, object_name, args.replicas)
+        else:
+            results = upload_to_all_servers(clients, args.file, object_name, router, args.resume, hints)
+        if reporter:
+            reporter.close()
+        print_summary('Upload', results)
     
-    if args.action in ['download', 'both']:
+    if args.action in ['download', 'both'] and not ring:
         if not object_name:
             print("Error: Object name is required for download operation")
             sys.exit(1)
-        download_from_all_servers(clients, object_name, args.output_dir)
+        results = download_from_all_servers(clients, object_name, args.output_dir, args.resume)
+        if reporter:
+            reporter.close()
+        print_summary('Download', results)
+    
+    if args.action == 'fetch' or (ring and args.action in ['download', 'both']):
+        if not object_name:
+            print("Error: Object name is required for fetch operation")
+            sys.exit(1)
+        file_path = os.path.join(args.output_dir, object_name) if args.output_dir else None
+        if ring:
+            server = download_sharded(clients, ring, object_name, file_path, args.replicas)
+        else:
+            server = download_from_best_server(clients, object_name, file_path, router, args.resume, repairer)
+        if repairer:
+            # Let the background repair finish before the process exits
+            repairer.close()
+        if reporter:
+            reporter.close()
+        print(f"Fetched {object_name} from {server}" if server else f"Could not fetch {object_name} from any server")
+    
+    if monitor:
+        monitor.stop()
+    if compression:
+        compression.close()
 
 if __name__ == "__main__":
     main()
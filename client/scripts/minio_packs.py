@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Small-object packing.
+
+Uploading many tiny files costs one request each. PackWriter appends many
+small logical objects ("members") into one large pack object and writes a
+compact index of (name, offset, length, crc32) next to it. PackReader loads
+the index once, caches it locally, and fetches any member with a single
+ranged GET. Listing members only needs the index.
+
+Layout in the bucket:
+    <prefix><pack>.pack   - concatenated member bytes
+    <prefix><pack>.idx    - JSON index, stored gzip-compressed
+
+Writing a pack under an existing name replaces it. Cached indexes are
+keyed by the ETag of the index object, so a replaced pack is never read
+through a stale index.
+"""
+
+import os
+import json
+import zlib
+import fnmatch
+import tempfile
+
+from minio_retry import CALL_ERRORS
+
+PACK_PREFIX = "packs/"
+INDEX_VERSION = 1
+DEFAULT_MAX_PACK_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "minio-packs")
+
+
+def pack_object_name(pack_name, prefix=PACK_PREFIX):
+    return f"{prefix}{pack_name}.pack"
+
+
+def index_object_name(pack_name, prefix=PACK_PREFIX):
+    return f"{prefix}{pack_name}.idx"
+
+
+class PackWriter:
+    """
+    Collects small objects into pack objects.
+
+    Members are spooled to a temporary file and the pack is streamed from
+    it on close(), or as soon as it reaches
+    `max_pack_size`, in which case the next members go to a new pack named
+    `<pack_name>-0001`, `<pack_name>-0002`, ...
+
+    Usage:
+        with PackWriter(client, "batch-2024-01-01") as writer:
+            for path in paths:
+                writer.add_file(path)
+    """
+
+    def __init__(self, client, pack_name, max_pack_size=DEFAULT_MAX_PACK_SIZE, prefix=PACK_PREFIX):
+        """
+        Args:
+            client (MinioWrapper): Server to write the packs to
+            pack_name (str): Base name of the pack(s)
+            max_pack_size (int): Roll over to a new pack beyond this many bytes
+            prefix (str): Object name prefix for pack and index objects
+        """
+        self.client = client
+        self.pack_name = pack_name
+        self.max_pack_size = max_pack_size
+        self.prefix = prefix
+        self.written = []
+        self._sequence = 0
+        self._spool = None
+        self._members = []
+        self._names = set()
+        self._size = 0
+
+    def _current_name(self):
+        return self.pack_name if self._sequence == 0 else f"{self.pack_name}-{self._sequence:04d}"
+
+    def add(self, name, data):
+        """
+        Append one member.
+
+        Args:
+            name (str): Logical object name of the member
+            data (bytes or str): Member contents
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if name in self._names:
+            raise ValueError(f"Duplicate member name in pack: {name}")
+        if self._spool is None:
+            self._spool = tempfile.NamedTemporaryFile(prefix="minio-pack-", suffix=".pack")
+        self._spool.write(data)
+        self._members.append([name, self._size, len(data), zlib.crc32(data)])
+        self._names.add(name)
+        self._size += len(data)
+        if self._size >= self.max_pack_size:
+            self.flush()
+
+    def add_file(self, file_path, name=None):
+        """Append a local file as a member (named after the file by default)."""
+        with open(file_path, 'rb') as f:
+            self.add(name if name is not None else os.path.basename(file_path), f.read())
+
+    def flush(self):
+        """
+        Upload the current pack and its index, then start a new pack.
+
+        Returns:
+            bool: True if both objects were written (or there was nothing to write)
+        """
+        if not self._members:
+            return True
+        name = self._current_name()
+        # Upload from the spool file, so the pack is streamed and retried without being held in memory
+        self._spool.flush()
+        ok = self.client.upload_file(self._spool.name, pack_object_name(name, self.prefix), compress=False)
+        index = {'version': INDEX_VERSION, 'pack': pack_object_name(name, self.prefix), 'members': self._members}
+        ok = ok and self.client.upload_data(json.dumps(index, separators=(',', ':')),
+                                            index_object_name(name, self.prefix),
+                                            content_type="application/json", compress='gzip')
+        if ok:
+            self.written.append(name)
+        self._spool.close()
+        self._spool = None
+        self._members = []
+        self._names = set()
+        self._size = 0
+        self._sequence += 1
+        return ok
+
+    def close(self):
+        """Upload whatever is pending."""
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._spool is not None:
+            self._spool.close()
+
+
+class PackReader:
+    """Reads members of a pack with one ranged GET each."""
+
+    def __init__(self, client, pack_name, cache_dir=DEFAULT_CACHE_DIR, prefix=PACK_PREFIX):
+        """
+        Args:
+            client (MinioWrapper): Server holding the pack
+            pack_name (str): Name of the pack (without prefix or extension)
+            cache_dir (str or None): Directory for cached indexes; None disables caching
+            prefix (str): Object name prefix for pack and index objects
+        """
+        self.client = client
+        self.pack_name = pack_name
+        self.prefix = prefix
+        self.cache_dir = cache_dir
+        self._members = None
+
+    def _cache_path(self, etag):
+        server = f"{self.client.endpoint}_{self.client.bucket_name}".replace(':', '_').replace('/', '_')
+        return os.path.join(self.cache_dir, server, f"{index_object_name(self.pack_name, self.prefix)}.{etag}.json")
+
+    def _index_etag(self):
+        """ETag of the index object, or None if it cannot be read."""
+        try:
+            stat = self.client._call(self.client.client.stat_object, self.client.bucket_name,
+                                     index_object_name(self.pack_name, self.prefix))
+        except CALL_ERRORS:
+            return None
+        return (stat.etag or '').strip('"') or None
+
+    def _load_index(self):
+        if self._members is not None:
+            return self._members
+        index = None
+        cache_path = None
+        if self.cache_dir:
+            # A pack written again under the same name gets a new index ETag, and so a new cache entry
+            etag = self._index_etag()
+            if etag is None:
+                raise KeyError(f"Pack index not found: {self.pack_name}")
+            cache_path = self._cache_path(etag)
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r') as f:
+                index = json.load(f)
+        if index is None:
+            payload = self.client.download_data(index_object_name(self.pack_name, self.prefix))
+            if payload is None:
+                raise KeyError(f"Pack index not found: {self.pack_name}")
+            index = json.loads(payload)
+            if cache_path:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                tmp_path = f"{cache_path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(index, f, separators=(',', ':'))
+                os.replace(tmp_path, cache_path)
+        self._members = {name: (offset, length, crc) for name, offset, length, crc in index['members']}
+        return self._members
+
+    def names(self, pattern=None):
+        """
+        Member names, in pack order.
+
+        Args:
+            pattern (str, optional): fnmatch-style filter, e.g. "folder1/*.txt"
+        """
+        names = list(self._load_index())
+        return fnmatch.filter(names, pattern) if pattern else names
+
+    def __contains__(self, name):
+        return name in self._load_index()
+
+    def __len__(self):
+        return len(self._load_index())
+
+    def info(self, name):
+        """
+        Returns:
+            dict: offset, length and crc32 of a member
+        """
+        offset, length, crc = self._load_index()[name]
+        return {'offset': offset, 'length': length, 'crc32': crc}
+
+    def read(self, name):
+        """
+        Fetch one member.
+
+        Returns:
+            bytes or None: Member contents, or None if the read failed
+
+        Raises:
+            KeyError: If the member is not in the pack
+            IOError: If the checksum does not match
+        """
+        offset, length, crc = self._load_index()[name]
+        if length == 0:
+            return b""
+        data = self.client.download_range(pack_object_name(self.pack_name, self.prefix), offset, length)
+        if data is not None and zlib.crc32(data) != crc:
+            raise IOError(f"Checksum mismatch for {name} in pack {self.pack_name}")
+        return data
+
+
+def list_packs(client, prefix=PACK_PREFIX):
+    """
+    Names of all packs on a server.
+
+    Returns:
+        list: Pack names usable with PackReader
+    """
+    names = client.list_objects(prefix=prefix)
+    return [name[len(prefix):-len(".idx")] for name in names if name.endswith(".idx")]
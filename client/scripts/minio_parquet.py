@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Parquet-aware ranged reads.
+
+ParquetObjectReader reads only the parts of a Parquet object a query needs:
+
+1. The footer is fetched with one suffix-range GET (Range: bytes=-N). The
+   whole fetched tail is cached on disk, keyed by the object's ETag, so
+   opening the object again needs no ranged GET.
+2. Row groups are pruned with the footer's min/max statistics for the given
+   filters, and only the column chunks of the requested (and filtered)
+   columns are selected.
+3. Byte ranges that lie close together are coalesced, and the resulting
+   ranges are fetched concurrently.
+4. pyarrow then decodes from those prefetched ranges without further I/O.
+
+Needs the optional pyarrow package.
+"""
+
+import os
+import bisect
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "minio-parquet")
+
+# Bytes requested from the end of the object; usually covers the whole footer
+FOOTER_GUESS = 64 * 1024
+
+# Ranges closer than this are fetched with one GET
+COALESCE_GAP = 1024 * 1024
+
+# Largest single coalesced GET
+MAX_RANGE = 64 * 1024 * 1024
+
+_COMPARISONS = {
+    '==': pc.equal, '=': pc.equal, '!=': pc.not_equal,
+    '<': pc.less, '<=': pc.less_equal, '>': pc.greater, '>=': pc.greater_equal,
+}
+
+
+def coalesce_ranges(ranges, gap=COALESCE_GAP, max_size=MAX_RANGE):
+    """
+    Merge (start, end) byte ranges that overlap or lie within `gap` bytes of each other.
+
+    Returns:
+        list: Sorted, non-overlapping (start, end) ranges
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start - merged[-1][1] <= gap and end - merged[-1][0] <= max_size:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+def _may_match(statistics, op, value):
+    """False only if the row group's min/max prove no row can satisfy the predicate."""
+    if statistics is None or not statistics.has_min_max:
+        return True
+    low, high = statistics.min, statistics.max
+    try:
+        if op in ('==', '='):
+            return low <= value <= high
+        if op == 'in':
+            return any(low <= v <= high for v in value)
+        if op == '<':
+            return low < value
+        if op == '<=':
+            return low <= value
+        if op == '>':
+            return high > value
+        if op == '>=':
+            return high >= value
+    except TypeError:
+        # Statistics of a type we cannot compare against the value
+        return True
+    return True
+
+
+def _row_mask(table, filters):
+    mask = None
+    for column, op, value in filters:
+        values = table.column(column)
+        if op == 'in':
+            condition = pc.is_in(values, value_set=pa.array(list(value)))
+        elif op == 'not in':
+            condition = pc.invert(pc.is_in(values, value_set=pa.array(list(value))))
+        else:
+            condition = _COMPARISONS[op](values, value)
+        mask = condition if mask is None else pc.and_(mask, condition)
+    return mask
+
+
+class _PrefetchedFile:
+    """Seekable file serving reads from prefetched byte ranges, falling back to ranged GETs."""
+
+    def __init__(self, reader):
+        self._reader = reader
+        self.size = reader.size
+        self._starts = []
+        self._ranges = []
+        self._position = 0
+        self.closed = False
+
+    def add(self, start, data):
+        index = bisect.bisect(self._starts, start)
+        self._starts.insert(index, start)
+        self._ranges.insert(index, (start, data))
+
+    def _covering(self, position):
+        """(start, data) of a prefetched range holding `position`, or None."""
+        # Ranges may overlap, so a range starting earlier can reach further than a later one
+        for index in range(bisect.bisect(self._starts, position) - 1, -1, -1):
+            range_start, data = self._ranges[index]
+            if position < range_start + len(data):
+                return range_start, data
+        return None
+
+    def _lookup(self, start, size):
+        covering = self._covering(start)
+        if covering is not None:
+            range_start, data = covering
+            if start + size <= range_start + len(data):
+                return data[start - range_start:start - range_start + size]
+        return None
+
+    def _read_range(self, start, end):
+        """Bytes [start, end), taken from prefetched ranges where possible and fetching only the gaps."""
+        pieces = []
+        position = start
+        while position < end:
+            covering = self._covering(position)
+            if covering is not None:
+                range_start, data = covering
+                piece = data[position - range_start:min(end, range_start + len(data)) - range_start]
+            else:
+                index = bisect.bisect(self._starts, position)
+                gap_end = min(end, self._starts[index]) if index < len(self._starts) else end
+                piece = self._reader._fetch(position, gap_end)
+                if not piece:
+                    raise IOError(f"Short read of {self._reader.object_name} at {position}")
+                self.add(position, piece)
+            pieces.append(piece)
+            position += len(piece)
+        return pieces[0] if len(pieces) == 1 else b"".join(pieces)
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self._position
+        size = min(size, self.size - self._position)
+        if size <= 0:
+            return b""
+        data = self._read_range(self._position, self._position + size)
+        self._position += len(data)
+        return data
+
+    def close(self):
+        self.closed = True
+
+
+class ParquetObjectReader:
+    """Reads selected columns and row groups of a Parquet object with few, coalesced range GETs."""
+
+    def __init__(self, client, object_name, cache_dir=DEFAULT_CACHE_DIR, workers=8, coalesce_gap=COALESCE_GAP):
+        """
+        Args:
+            client (MinioWrapper): Server holding the object
+            object_name (str): Name of the Parquet object
+            cache_dir (str or None): Directory for cached object tails; None disables the disk cache
+            workers (int): Concurrent range GETs
+            coalesce_gap (int): Merge ranges separated by at most this many bytes
+        """
+        self.client = client
+        self.object_name = object_name
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.coalesce_gap = coalesce_gap
+        self.requests = 0
+        self.bytes_fetched = 0
+        self._lock = threading.Lock()
+
+        stat = client._call(client.client.stat_object, client.bucket_name, object_name)
+        self.size = stat.size
+        self.etag = (stat.etag or '').strip('"')
+        self._file = _PrefetchedFile(self)
+        tail = self._load_tail()
+        self._file.add(self.size - len(tail), tail)
+        self._parquet = pq.ParquetFile(self._file)
+        self.metadata = self._parquet.metadata
+        self.schema = self._parquet.schema_arrow
+
+    @property
+    def num_rows(self):
+        return self.metadata.num_rows
+
+    def _fetch(self, start, end):
+        """One ranged GET of [start, end)."""
+        data = self.client.download_range(self.object_name, start, end - start)
+        if data is None:
+            raise IOError(f"Could not read {self.object_name}[{start}:{end}]")
+        with self._lock:
+            self.requests += 1
+            self.bytes_fetched += len(data)
+        return data
+
+    def _suffix(self, length):
+        """Last `length` bytes of the object with a single suffix-range GET."""
+        def get():
+            response = self.client.client.get_object(self.client.bucket_name, self.object_name,
+                                                     request_headers={'Range': f'bytes=-{length}'})
+            try:
+                return b"".join(self.client._stream(response))
+            finally:
+                response.close()
+                response.release_conn()
+
+        data = self.client._call(get)
+        with self._lock:
+            self.requests += 1
+            self.bytes_fetched += len(data)
+        return data
+
+    def _cache_path(self):
+        key = f"{self.client.endpoint}|{self.client.bucket_name}|{self.object_name}|{self.etag}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".tail")
+
+    def _load_tail(self):
+        """
+        The object's last bytes, at least the whole footer, from the cache or a suffix-range GET.
+
+        pyarrow opens a file by reading its last 64 KiB (or all of a smaller
+        file), so the whole fetched tail is kept rather than only the footer.
+        """
+        cache_path = self._cache_path() if self.cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                return f.read()
+
+        tail = self._suffix(min(FOOTER_GUESS, self.size))
+        if tail[-4:] != b"PAR1":
+            raise ValueError(f"{self.object_name} is not a Parquet file")
+        footer_length = int.from_bytes(tail[-8:-4], 'little') + 8
+        if footer_length > len(tail):
+            tail = self._suffix(footer_length)
+
+        if cache_path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(tail)
+            os.replace(tmp_path, cache_path)
+        return tail
+
+    def row_groups(self, filters=None):
+        """
+        Row groups that may contain rows matching `filters`, judged by their statistics.
+
+        Args:
+            filters (list, optional): (column, op, value) tuples, ANDed; op is one of
+                ==, !=, <, <=, >, >=, in, not in
+
+        Returns:
+            list: Row group indexes
+        """
+        selected = []
+        for index in range(self.metadata.num_row_groups):
+            row_group = self.metadata.row_group(index)
+            columns = {row_group.column(i).path_in_schema: row_group.column(i)
+                       for i in range(row_group.num_columns)}
+            if all(column not in columns or _may_match(columns[column].statistics, op, value)
+                   for column, op, value in (filters or [])):
+                selected.append(index)
+        return selected
+
+    def byte_ranges(self, row_groups, columns=None):
+        """(start, end) of every column chunk needed for these row groups and columns."""
+        ranges = []
+        for index in row_groups:
+            row_group = self.metadata.row_group(index)
+            for i in range(row_group.num_columns):
+                chunk = row_group.column(i)
+                path = chunk.path_in_schema
+                if columns is not None and not any(path == c or path.startswith(c + ".") for c in columns):
+                    continue
+                start = chunk.data_page_offset
+                if chunk.has_dictionary_page and chunk.dictionary_page_offset is not None:
+                    start = min(start, chunk.dictionary_page_offset)
+                ranges.append((start, start + chunk.total_compressed_size))
+        return ranges
+
+    def prefetch(self, ranges):
+        """Fetch byte ranges concurrently after coalescing them."""
+        merged = [r for r in coalesce_ranges(ranges, self.coalesce_gap)
+                  if self._file._lookup(r[0], r[1] - r[0]) is None]
+        if not merged:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(merged))) as pool:
+            for (start, _), data in zip(merged, pool.map(lambda r: self._fetch(*r), merged)):
+                self._file.add(start, data)
+
+    def read(self, columns=None, filters=None, to_pandas=False):
+        """
+        Read selected columns of the row groups that may match the filters.
+
+        Args:
+            columns (list, optional): Columns to return (default: all)
+            filters (list, optional): (column, op, value) tuples, ANDed; used both to skip
+                row groups by statistics and to filter the rows that are read
+            to_pandas (bool): Return a pandas DataFrame instead of a pyarrow Table
+
+        Returns:
+            pyarrow.Table or pandas.DataFrame: The selected data
+        """
+        filters = list(filters or [])
+        columns = list(columns) if columns is not None else None
+        needed = None
+        if columns is not None:
+            needed = columns + [column for column, _, _ in filters if column not in columns]
+
+        row_groups = self.row_groups(filters)
+        if row_groups:
+            self.prefetch(self.byte_ranges(row_groups, needed))
+            table = self._parquet.read_row_groups(row_groups, columns=needed)
+        else:
+            table = self.schema.empty_table()
+            if needed is not None:
+                table = table.select(needed)
+        if filters and table.num_rows:
+            table = table.filter(_row_mask(table, filters))
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas() if to_pandas else table
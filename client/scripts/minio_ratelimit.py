@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Token-bucket bandwidth and request-rate limiting.
+
+A RateLimiter holds one bucket for bytes per second and one for requests
+per second. Each MinioWrapper gets the limiter of its server section, and
+every thread using that wrapper draws from the same buckets. A limiter can
+have a parent (the global limit), in which case every acquire is charged
+to both. Transfers are throttled per chunk as bytes flow, not per object,
+and a multipart upload is charged one request per part.
+"""
+
+import re
+import threading
+import time
+
+_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+
+def parse_rate(value):
+    """
+    Parse a rate such as '500', '64k', '10M' or '1.5G' (binary units).
+
+    Returns:
+        float or None: The rate, or None for empty/zero values (no limit)
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) or None
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([kmgKMG]?)(?:i?[bB])?(?:/s)?\s*", str(value))
+    if not match:
+        raise ValueError(f"Invalid rate: {value}")
+    rate = float(match.group(1)) * _UNITS[match.group(2).lower()]
+    return rate or None
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until enough tokens are available."""
+
+    def __init__(self, rate, burst=None):
+        """
+        Args:
+            rate (float): Tokens added per second
+            burst (float, optional): Bucket capacity (default: one second of tokens)
+        """
+        self.rate = float(rate)
+        self.capacity = float(burst) if burst else self.rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount):
+        """Take `amount` tokens, possibly going negative; return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self, amount=1):
+        """
+        Block until `amount` tokens have been taken.
+
+        Requests larger than the bucket are taken in capacity-sized pieces so
+        a single big chunk cannot starve other threads for long.
+        """
+        while amount > 0:
+            piece = min(amount, self.capacity)
+            wait = self._reserve(piece)
+            if wait > 0:
+                time.sleep(wait)
+            amount -= piece
+
+
+class RateLimiter:
+    """Bytes-per-second and requests-per-second limits, optionally nested under a parent."""
+
+    def __init__(self, bytes_per_sec=None, requests_per_sec=None, parent=None, burst_seconds=1.0):
+        """
+        Args:
+            bytes_per_sec (float, optional): Bandwidth limit; None for unlimited
+            requests_per_sec (float, optional): Request-rate limit; None for unlimited
+            parent (RateLimiter, optional): Shared limiter also charged for everything
+            burst_seconds (float): Bucket capacity in seconds of traffic
+        """
+        self.bytes = TokenBucket(bytes_per_sec, bytes_per_sec * burst_seconds) if bytes_per_sec else None
+        self.requests = (TokenBucket(requests_per_sec, max(1.0, requests_per_sec * burst_seconds))
+                         if requests_per_sec else None)
+        self.parent = parent
+
+    def __bool__(self):
+        return bool(self.bytes or self.requests or self.parent)
+
+    def throttle_bytes(self, nbytes):
+        """Block until `nbytes` may be transferred."""
+        if self.bytes is not None and nbytes:
+            self.bytes.acquire(nbytes)
+        if self.parent is not None:
+            self.parent.throttle_bytes(nbytes)
+
+    def throttle_request(self):
+        """Block until one more request may be sent."""
+        if self.requests is not None:
+            self.requests.acquire(1)
+        if self.parent is not None:
+            self.parent.throttle_request()
+
+    def wrap_reader(self, stream, chunk_size=64 * 1024, part_size=None):
+        """
+        File-like wrapper that charges every chunk read from `stream`.
+
+        With `part_size` set, a request is also charged each time the reads
+        move into another part, since the SDK sends every part of a multipart
+        upload as its own request. The first part is left to the caller.
+        """
+        return ThrottledReader(stream, self, chunk_size, part_size)
+
+    def iter_chunks(self, chunks):
+        """Charge each chunk of an iterable as it is consumed."""
+        for chunk in chunks:
+            self.throttle_bytes(len(chunk))
+            yield chunk
+
+
+class ThrottledReader:
+    """Reads from a stream in small chunks, waiting for bandwidth tokens before each one."""
+
+    def __init__(self, stream, limiter, chunk_size=64 * 1024, part_size=None):
+        self.stream = stream
+        self.limiter = limiter
+        self.chunk_size = chunk_size
+        self.part_size = part_size
+        self._parts = 1
+        self._bytes = 0
+
+    def _charge(self, nbytes):
+        self.limiter.throttle_bytes(nbytes)
+        if not self.part_size:
+            return
+        self._bytes += nbytes
+        # Parts started so far; the first one was charged with the call itself
+        parts = -(-self._bytes // self.part_size)
+        while self._parts < parts:
+            self.limiter.throttle_request()
+            self._parts += 1
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self.stream.read()
+            self._charge(len(data))
+            return data
+        parts = []
+        remaining = size
+        while remaining > 0:
+            piece = self.stream.read(min(remaining, self.chunk_size))
+            if not piece:
+                break
+            self._charge(len(piece))
+            parts.append(piece)
+            remaining -= len(piece)
+        return b"".join(parts)
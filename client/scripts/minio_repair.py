@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Read repair for replicated objects.
+
+After a read has been served from one replica, ReadRepairer checks the key
+on every server in the background. The newest copy (by last-modified time)
+is taken as the good one. Replicas that lack the key, or hold an older copy
+with a different ETag, get the object streamed to them server-to-server
+with MinioWrapper.copy_to.
+
+- Reads that already hit a missing replica are always checked; other reads
+  are checked with probability `chance`, as Cassandra's read_repair_chance
+  does.
+- A key is only queued once while its check is pending or running.
+- Repairs are rate-limited with a token bucket, and the queue is bounded:
+  when it is full, new work is dropped rather than slowing down reads.
+
+Divergence on hot keys therefore heals as they are read, without waiting
+for a full reconciliation run.
+"""
+
+import queue
+import random
+import threading
+
+from minio_ratelimit import TokenBucket
+from minio_retry import CALL_ERRORS
+
+
+class ReadRepairer:
+    """Background, deduplicated, rate-limited repair of replicas seen during reads."""
+
+    def __init__(self, clients, workers=2, repairs_per_sec=None, chance=0.1, max_pending=1000, tombstones=None):
+        """
+        Args:
+            clients (dict): Dictionary with MinioWrapper instances
+            workers (int): Threads checking and repairing keys
+            repairs_per_sec (float, optional): Upper bound on copies started per second
+            chance (float): Fraction of clean reads whose replicas are checked anyway
+            max_pending (int): Keys waiting for a check; further keys are dropped
+            tombstones (Tombstones, optional): Pending deletes; a copy older than its key's
+                delete is never spread to other replicas
+        """
+        self.clients = clients
+        self.tombstones = tombstones
+        self.chance = chance
+        self.stats = {'queued': 0, 'duplicate': 0, 'dropped': 0, 'checked': 0, 'repaired': 0, 'failed': 0}
+        self._bucket = TokenBucket(repairs_per_sec) if repairs_per_sec else None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def submit(self, object_name, source=None, suspect=()):
+        """
+        Report a read of an object.
+
+        Args:
+            object_name (str): Name of the object that was read
+            source (str, optional): Server the read was served from
+            suspect (iterable): Servers that failed to serve the read; forces a check
+
+        Returns:
+            bool: True if a check was queued
+        """
+        if not suspect and random.random() >= self.chance:
+            return False
+        with self._lock:
+            if object_name in self._pending:
+                self.stats['duplicate'] += 1
+                return False
+            self._pending.add(object_name)
+        try:
+            self._queue.put_nowait((object_name, source))
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(object_name)
+                self.stats['dropped'] += 1
+            return False
+        self._count('queued')
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            object_name, source = item
+            try:
+                self.repair(object_name, source)
+            except Exception as e:
+                # Whatever went wrong, the worker must keep draining the queue or close() never returns
+                print(f"Read repair of {object_name} failed: {e}")
+                self._count('failed')
+            finally:
+                with self._lock:
+                    self._pending.discard(object_name)
+                self._queue.task_done()
+
+    def _stat_all(self, object_name):
+        """{server_name: stat or None}; servers that could not be asked are left out."""
+        stats = {}
+        for server_name, client in self.clients.items():
+            try:
+                stats[server_name] = client._call(client.client.stat_object, client.bucket_name, object_name)
+            except CALL_ERRORS as e:
+                if getattr(e, 'code', None) in ('NoSuchKey', 'NoSuchObject'):
+                    stats[server_name] = None
+        return stats
+
+    def repair(self, object_name, source=None):
+        """
+        Check one key on every server now and copy the newest version to stale replicas.
+
+        Returns:
+            list: Servers that were repaired
+        """
+        stats = self._stat_all(object_name)
+        self._count('checked')
+        holders = {name: stat for name, stat in stats.items() if stat is not None}
+        if not holders:
+            return []
+        # Newest copy wins; on a tie prefer the replica the read came from
+        good = max(holders, key=lambda name: (holders[name].last_modified, name == source))
+        good_stat = holders[good]
+        if self.tombstones is not None:
+            deleted = self.tombstones.deleted_at(object_name)
+            if deleted is not None and good_stat.last_modified.timestamp() <= deleted:
+                # A replica the delete has not reached yet; the tombstone will remove it
+                return []
+
+        repaired = []
+        for server_name, stat in stats.items():
+            if server_name == good:
+                continue
+            if stat is not None and (stat.etag == good_stat.etag or stat.last_modified >= good_stat.last_modified):
+                continue
+            if self._bucket is not None:
+                self._bucket.acquire()
+            if self.clients[good].copy_to(self.clients[server_name], object_name):
+                repaired.append(server_name)
+                self._count('repaired')
+            else:
+                self._count('failed')
+        if repaired:
+            print(f"Read repair: copied {object_name} from {good} to {', '.join(repaired)}")
+        return repaired
+
+    @property
+    def depth(self):
+        """Keys waiting for a check."""
+        return self._queue.qsize()
+
+    def snapshot(self):
+        """Counters plus the current queue depth."""
+        with self._lock:
+            return dict(self.stats, pending=self.depth)
+
+    def close(self):
+        """Run the queued checks, then stop the workers."""
+        self._queue.join()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
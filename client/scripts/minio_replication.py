@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Write-local, replicate-async mode.
+
+AsyncReplicator makes a write return as soon as one server, the primary,
+has the object. The other servers are owed a copy, and that debt is
+recorded in the same durable queue hinted handoff uses (HintQueue).
+HintReplayer workers then copy the object server-to-server from the
+primary. A producer therefore waits for a single PUT, and a crash between
+the write and its replication loses nothing: the queue is replayed on the
+next start, or by the `handoff` action.
+
+The primary is chosen per replicator. It is either a fixed server or, with
+a ReplicaRouter, the healthiest and fastest server. If the primary fails,
+the write falls through to the next server. Replication lag, pending copies
+and wait_for_replication(key) let callers see how far the replicas are
+behind, or wait for them when a reader needs the key everywhere.
+"""
+
+import os
+import time
+
+from minio_handoff import HintReplayer
+
+
+class AsyncReplicator:
+    """Writes to one primary server and replicates to the others in the background."""
+
+    def __init__(self, clients, hints, primary=None, router=None, workers=4, interval=1.0, tombstones=None):
+        """
+        Args:
+            clients (dict): Dictionary with MinioWrapper instances
+            hints (HintQueue): Durable queue holding the copies still owed
+            primary (str, optional): Server written to synchronously (default: chosen per write)
+            router (ReplicaRouter, optional): Picks the healthiest, fastest server as primary
+            workers (int): Concurrent server-to-server copies
+            interval (float): Seconds between polls of the queue for retries
+            tombstones (Tombstones, optional): Deletes still owed to servers, replayed by the same workers
+        """
+        if primary is not None and primary not in clients:
+            raise ValueError(f"Unknown primary server {primary}")
+        self.clients = clients
+        self.hints = hints
+        self.primary = primary
+        self.router = router
+        self.replayer = HintReplayer(hints, clients, workers=workers, interval=interval, tombstones=tombstones)
+
+    def start(self):
+        """Start the background copy workers; returns self."""
+        self.replayer.start()
+        return self
+
+    def stop(self):
+        """Stop the copy workers; copies still owed stay in the queue."""
+        self.replayer.stop()
+
+    def candidates(self):
+        """Servers to try as primary, in order."""
+        if self.router is not None:
+            order = self.router.read_order()
+        else:
+            order = list(self.clients)
+        if self.primary is not None:
+            order.remove(self.primary)
+            order.insert(0, self.primary)
+        # Skip servers whose circuit is open, unless nothing else is left
+        closed = [name for name in order if self.clients[name].breaker.state != 'open']
+        return closed or order
+
+    def _replicate(self, primary, object_name):
+        """Queue a copy from the primary to every other server; returns the servers queued for."""
+        # An older debt of the primary itself is settled by this write
+        self.hints.discard(primary, object_name)
+        queued = []
+        for server_name in self.clients:
+            if server_name == primary:
+                continue
+            if self.hints.add(server_name, object_name, None, [primary]):
+                queued.append(server_name)
+            else:
+                print(f"Replication queue full; {object_name} will not be copied to {server_name}")
+        self.replayer.wake()
+        return queued
+
+    def upload_file(self, file_path, object_name=None, compress=None):
+        """
+        Upload a file to the primary and queue its replication.
+
+        If the primary fails, the next candidate becomes the primary for this write.
+
+        Args:
+            file_path (str): Path to the local file
+            object_name (str, optional): Name of the object in MinIO
+            compress (str, optional): Codec to compress with
+
+        Returns:
+            tuple: (primary server or None if every server failed, servers a copy was queued for)
+        """
+        if object_name is None:
+            object_name = os.path.basename(file_path)
+        for server_name in self.candidates():
+            if self.clients[server_name].upload_file(file_path, object_name, compress):
+                return server_name, self._replicate(server_name, object_name)
+        return None, []
+
+    def upload_stream(self, source, object_name, content_type="application/octet-stream"):
+        """
+        Upload a stream to the primary and queue its replication.
+
+        The stream cannot be replayed, so only the first candidate is tried.
+
+        Returns:
+            tuple: (primary server or None, servers a copy was queued for)
+        """
+        primary = self.candidates()[0]
+        if not self.clients[primary].upload_stream(source, object_name, content_type):
+            return None, []
+        return primary, self._replicate(primary, object_name)
+
+    def wait_for_replication(self, object_name, timeout=None, poll=0.1):
+        """
+        Block until every server has the latest write of a key.
+
+        Args:
+            object_name (str): Key to wait for
+            timeout (float, optional): Give up after this many seconds
+            poll (float): Seconds between checks of the queue
+
+        Returns:
+            bool: True if no copy is owed any more, False on timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.hints.pending(object_name):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def snapshot(self):
+        """Copies made, failed and pending per server, and replication lag in seconds."""
+        return self.replayer.snapshot()
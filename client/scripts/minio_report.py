@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Single-pass bucket report ("du" for a bucket).
+
+BucketReport consumes a stream of listed objects once and keeps only
+aggregates: object count and bytes per prefix at a fixed depth, a size
+histogram, the N largest objects (a min-heap), and age buckets. Memory is
+bounded by the number of distinct prefixes at the chosen depth plus N,
+independent of how many objects the bucket holds.
+"""
+
+import io
+import csv
+import json
+import heapq
+from datetime import datetime, timezone
+
+# Upper bounds of the size histogram buckets, in bytes
+SIZE_BUCKETS = [
+    (1024, "< 1 KB"),
+    (64 * 1024, "1-64 KB"),
+    (1024 ** 2, "64 KB-1 MB"),
+    (16 * 1024 ** 2, "1-16 MB"),
+    (256 * 1024 ** 2, "16-256 MB"),
+    (1024 ** 3, "256 MB-1 GB"),
+    (None, ">= 1 GB"),
+]
+
+# Upper bounds of the age buckets, in days
+AGE_BUCKETS = [
+    (1, "< 1 day"),
+    (7, "1-7 days"),
+    (30, "7-30 days"),
+    (90, "30-90 days"),
+    (365, "90-365 days"),
+    (None, ">= 1 year"),
+]
+
+
+def format_size(size):
+    """Human-readable size, as used by the listing scripts."""
+    if size < 1024:
+        return f"{size} B"
+    elif size < 1024 ** 2:
+        return f"{size / 1024:.2f} KB"
+    elif size < 1024 ** 3:
+        return f"{size / 1024 ** 2:.2f} MB"
+    return f"{size / 1024 ** 3:.2f} GB"
+
+
+def _bucket_index(value, buckets):
+    for index, (bound, _) in enumerate(buckets):
+        if bound is None or value < bound:
+            return index
+
+
+class BucketReport:
+    """Streaming aggregates over a bucket listing."""
+
+    def __init__(self, depth=1, top=10, now=None):
+        """
+        Args:
+            depth (int): Number of '/' levels that make up a prefix (0 aggregates everything together)
+            top (int): How many of the largest objects to keep
+            now (datetime, optional): Reference time for ages (default: now, UTC)
+        """
+        self.depth = depth
+        self.top = top
+        self.now = now or datetime.now(timezone.utc)
+        self.count = 0
+        self.total_bytes = 0
+        self.prefixes = {}
+        self.sizes = [[0, 0] for _ in SIZE_BUCKETS]
+        self.ages = [[0, 0] for _ in AGE_BUCKETS]
+        self._largest = []
+
+    def _prefix(self, name):
+        if self.depth <= 0:
+            return ""
+        parts = name.split('/')
+        if len(parts) <= self.depth:
+            # Objects directly at this level are grouped under their parent
+            return '/'.join(parts[:-1]) + '/' if len(parts) > 1 else "(root)"
+        return '/'.join(parts[:self.depth]) + '/'
+
+    def add(self, obj):
+        """Account for one listed object (anything with object_name, size and last_modified)."""
+        size = obj.size or 0
+        self.count += 1
+        self.total_bytes += size
+
+        prefix = self._prefix(obj.object_name)
+        entry = self.prefixes.get(prefix)
+        if entry is None:
+            entry = self.prefixes[prefix] = [0, 0]
+        entry[0] += 1
+        entry[1] += size
+
+        bucket = self.sizes[_bucket_index(size, SIZE_BUCKETS)]
+        bucket[0] += 1
+        bucket[1] += size
+
+        if obj.last_modified is not None:
+            days = (self.now - obj.last_modified).total_seconds() / 86400
+            bucket = self.ages[_bucket_index(days, AGE_BUCKETS)]
+            bucket[0] += 1
+            bucket[1] += size
+
+        if self.top:
+            item = (size, obj.object_name)
+            if len(self._largest) < self.top:
+                heapq.heappush(self._largest, item)
+            elif item > self._largest[0]:
+                heapq.heapreplace(self._largest, item)
+
+    def consume(self, objects):
+        """Add every object of an iterable; returns self."""
+        for obj in objects:
+            self.add(obj)
+        return self
+
+    def largest(self):
+        """The largest objects seen, biggest first, as (name, size) pairs."""
+        return [(name, size) for size, name in sorted(self._largest, reverse=True)]
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON-serialisable report
+        """
+        return {
+            'objects': self.count,
+            'total_bytes': self.total_bytes,
+            'depth': self.depth,
+            'prefixes': [{'prefix': prefix, 'objects': count, 'bytes': size}
+                         for prefix, (count, size) in sorted(self.prefixes.items(),
+                                                             key=lambda item: -item[1][1])],
+            'size_histogram': [{'bucket': label, 'objects': count, 'bytes': size}
+                               for (_, label), (count, size) in zip(SIZE_BUCKETS, self.sizes)],
+            'age_histogram': [{'bucket': label, 'objects': count, 'bytes': size}
+                              for (_, label), (count, size) in zip(AGE_BUCKETS, self.ages)],
+            'largest': [{'object': name, 'bytes': size} for name, size in self.largest()],
+        }
+
+    def render(self, output_format="table"):
+        """
+        Render the report.
+
+        Args:
+            output_format (str): 'table', 'json' or 'csv'
+
+        Returns:
+            str: The formatted report
+        """
+        report = self.to_dict()
+        if output_format == 'json':
+            return json.dumps(report, indent=2)
+        if output_format == 'csv':
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(['section', 'key', 'objects', 'bytes'])
+            writer.writerow(['total', '', report['objects'], report['total_bytes']])
+            for row in report['prefixes']:
+                writer.writerow(['prefix', row['prefix'], row['objects'], row['bytes']])
+            for row in report['size_histogram']:
+                writer.writerow(['size', row['bucket'], row['objects'], row['bytes']])
+            for row in report['age_histogram']:
+                writer.writerow(['age', row['bucket'], row['objects'], row['bytes']])
+            for row in report['largest']:
+                writer.writerow(['largest', row['object'], 1, row['bytes']])
+            return out.getvalue()
+        if output_format != 'table':
+            raise ValueError(f"Unknown report format {output_format}")
+
+        from tabulate import tabulate
+        sections = [f"{report['objects']} objects, {format_size(report['total_bytes'])}"]
+        sections.append(tabulate(
+            [[row['prefix'], row['objects'], format_size(row['bytes'])] for row in report['prefixes']],
+            headers=["Prefix", "Objects", "Size"], tablefmt="grid"))
+        sections.append(tabulate(
+            [[row['bucket'], row['objects'], format_size(row['bytes'])] for row in report['size_histogram']],
+            headers=["Object Size", "Objects", "Size"], tablefmt="grid"))
+        sections.append(tabulate(
+            [[row['bucket'], row['objects'], format_size(row['bytes'])] for row in report['age_histogram']],
+            headers=["Age", "Objects", "Size"], tablefmt="grid"))
+        if report['largest']:
+            sections.append(tabulate(
+                [[row['object'], format_size(row['bytes'])] for row in report['largest']],
+                headers=["Largest Objects", "Size"], tablefmt="grid"))
+        return "\n\n".join(sections)
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Resumable uploads and downloads with on-disk checkpoints.
+
+Large uploads are sent as multipart uploads. The upload ID and the ETag of
+every completed part are checkpointed in a small JSON state file, so an
+interrupted upload resumes from the first missing part. The server's own
+part listing is checked first, and the local file must have the same size
+and mtime as when the upload started. With a checksum policy every part
+carries Content-MD5, and the completed upload's ETag is checked against
+the part MD5s recorded in the checkpoint. Compressed uploads cannot be
+resumed (the compressed offsets are not known in advance) and are sent in
+one pass with upload_file() instead.
+
+Large downloads are fetched in fixed-size byte ranges into a .part.minio
+file. Each completed range is checkpointed, and every range request carries
+If-Match with the object's ETag. If the object changes in the meantime, the
+download starts over instead of mixing two versions. With download
+verification on, the assembled file is checked against the recorded
+checksum or ETag in the same pass that decompresses or finalises it; a
+mismatch discards the checkpoint so the next attempt starts over.
+
+cleanup_abandoned_uploads() aborts multipart uploads nobody will resume.
+"""
+
+import os
+import json
+import base64
+import hashlib
+import mimetypes
+import threading
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from minio.datatypes import Part
+from minio.error import S3Error
+from minio.helpers import genheaders
+
+from minio_retry import CALL_ERRORS, ChecksumMismatch
+from minio_compression import stream_decoder, codec_from_metadata, resolve_codec
+from minio_checksum import META_PART_SIZE, _check_etag
+
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "minio-resume")
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+
+
+def _state_path(state_dir, client, operation, object_name, file_path):
+    key = f"{operation}|{client.endpoint}|{client.bucket_name}|{object_name}|{os.path.abspath(file_path)}"
+    return os.path.join(state_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".json")
+
+
+def _load_state(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _remove_state(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _is_code(error, *codes):
+    return isinstance(error, S3Error) and error.code in codes
+
+
+def _server_parts(client, object_name, upload_id):
+    """ETags of the parts the server already has, or None if the upload no longer exists."""
+    parts = {}
+    marker = None
+    try:
+        while True:
+            result = client._call(client.client._list_parts, client.bucket_name, object_name, upload_id,
+                                  part_number_marker=marker)
+            for part in result.parts:
+                parts[str(part.part_number)] = part.etag
+            if not result.is_truncated:
+                return parts
+            marker = result.next_part_number_marker
+    except CALL_ERRORS as e:
+        if _is_code(e, 'NoSuchUpload'):
+            return None
+        raise
+
+
+def _read_range(file_path, offset, length):
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def upload_file_resumable(client, file_path, object_name=None, part_size=DEFAULT_PART_SIZE,
+                          state_dir=DEFAULT_STATE_DIR, workers=4, compress=None):
+    """
+    Upload a file as a multipart upload that can be resumed after interruption.
+
+    Files no larger than one part, and files the compression policy (or
+    `compress`) would compress, are uploaded with a plain upload_file().
+
+    Args:
+        client (MinioWrapper): Target server
+        file_path (str): Path to the local file
+        object_name (str, optional): Name of the object in MinIO. If None, uses the filename.
+        part_size (int): Bytes per part (at least 5 MiB)
+        state_dir (str): Directory for checkpoint files
+        workers (int): Parts uploaded concurrently
+        compress (None, bool or str, optional): As for MinioWrapper.upload_file
+
+    Returns:
+        bool: True if the object is complete, False if the upload should be retried
+    """
+    if object_name is None:
+        object_name = os.path.basename(file_path)
+    if not os.path.exists(file_path):
+        return client.upload_file(file_path, object_name, compress=compress)
+    size = os.path.getsize(file_path)
+    if size <= part_size:
+        return client.upload_file(file_path, object_name, compress=compress)
+    content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    if resolve_codec(client.compression, compress, object_name, content_type, size):
+        print(f"Compressed uploads cannot be resumed; uploading {object_name} in a single pass")
+        return client.upload_file(file_path, object_name, compress=compress)
+
+    mtime = os.path.getmtime(file_path)
+    state_path = _state_path(state_dir, client, 'upload', object_name, file_path)
+    state = _load_state(state_path)
+    transfer = client.events.start('upload', client.endpoint, object_name, size, local_path=file_path)
+    progress = client.events.progress(transfer)
+
+    try:
+        if state and (state['size'] != size or state['mtime'] != mtime or state['part_size'] != part_size):
+            # The local file changed; the old parts are useless
+            try:
+                client._call(client.client._abort_multipart_upload, client.bucket_name, object_name,
+                             state['upload_id'])
+            except CALL_ERRORS:
+                pass
+            state = None
+        if state:
+            server_parts = _server_parts(client, object_name, state['upload_id'])
+            if server_parts is None:
+                state = None
+            else:
+                # The server's listing is authoritative for what survived
+                state['parts'] = server_parts
+        # The part size is recorded so downloads can verify the multipart ETag
+        headers = genheaders({META_PART_SIZE: str(part_size)} if client.checksum is not None else None,
+                             None, None, None, None)
+        headers["Content-Type"] = content_type
+        if not state:
+            upload_id = client._call(client.client._create_multipart_upload, client.bucket_name,
+                                     object_name, headers)
+            state = {'upload_id': upload_id, 'size': size, 'mtime': mtime, 'part_size': part_size, 'parts': {},
+                     'md5': {}}
+            _save_state(state_path, state)
+
+        part_count = -(-size // part_size)
+        pending = [n for n in range(1, part_count + 1) if str(n) not in state['parts']]
+        if progress is not None:
+            progress.update(size - sum(min(part_size, size - (n - 1) * part_size) for n in pending))
+        lock = threading.Lock()
+
+        def send(part_number):
+            data = _read_range(file_path, (part_number - 1) * part_size, part_size)
+            md5 = hashlib.md5(data).digest()
+            part_headers = None
+            if client.checksum is not None:
+                part_headers = {"Content-MD5": base64.b64encode(md5).decode('ascii')}
+            if client.rate_limiter is not None:
+                client.rate_limiter.throttle_bytes(len(data))
+            etag = client._call(client.client._upload_part, client.bucket_name, object_name, data, part_headers,
+                                state['upload_id'], part_number)
+            with lock:
+                state['parts'][str(part_number)] = etag
+                state.setdefault('md5', {})[str(part_number)] = md5.hex()
+                _save_state(state_path, state)
+                if progress is not None:
+                    progress.update(len(data))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(send, pending))
+
+        numbers = sorted(int(n) for n in state['parts'])
+        parts = [Part(n, state['parts'][str(n)]) for n in numbers]
+        result = client._call(client.client._complete_multipart_upload, client.bucket_name, object_name,
+                              state['upload_id'], parts)
+        if client.checksum is not None:
+            # Parts the server acknowledged just before an interruption have no recorded MD5 yet
+            md5s = state.get('md5', {})
+            digests = [bytes.fromhex(md5s[str(n)]) if str(n) in md5s else
+                       hashlib.md5(_read_range(file_path, (n - 1) * part_size, part_size)).digest()
+                       for n in numbers]
+            _check_etag(client, object_name, result, digests, headers=headers)
+        client._record_put(object_name, result, size)
+        _remove_state(state_path)
+        client.events.complete(transfer, progress)
+        return True
+    except CALL_ERRORS as e:
+        if isinstance(e, ChecksumMismatch):
+            # The completed object was removed again; there is nothing left to resume
+            _remove_state(state_path)
+        # Otherwise the state is kept so the next call resumes
+        client.events.failed(transfer, e, progress)
+        return False
+
+
+def download_file_resumable(client, object_name, file_path=None, chunk_size=DEFAULT_PART_SIZE,
+                            state_dir=DEFAULT_STATE_DIR, workers=4):
+    """
+    Download an object in byte ranges that survive interruption.
+
+    Compressed objects are fetched the same way and decompressed once all
+    ranges are present; verification happens in the same pass.
+
+    Args:
+        client (MinioWrapper): Source server
+        object_name (str): Name of the object in MinIO
+        file_path (str, optional): Path where to save the file. Defaults to object_name.
+        chunk_size (int): Bytes per range request
+        state_dir (str): Directory for checkpoint files
+        workers (int): Ranges fetched concurrently
+
+    Returns:
+        bool: True if the file is complete, False if the download should be retried
+    """
+    if file_path is None:
+        file_path = object_name
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    state_path = _state_path(state_dir, client, 'download', object_name, file_path)
+    tmp_file_path = f"{file_path}.part.minio"
+    transfer = client.events.start('download', client.endpoint, object_name, local_path=file_path)
+    progress = client.events.progress(transfer)
+
+    for attempt in range(2):
+        try:
+            stat = client._call(client.client.stat_object, client.bucket_name, object_name)
+            state = _load_state(state_path)
+            if not state or state['etag'] != stat.etag or state['size'] != stat.size \
+                    or state['chunk_size'] != chunk_size or not os.path.exists(tmp_file_path):
+                state = {'etag': stat.etag, 'size': stat.size, 'chunk_size': chunk_size, 'completed': []}
+                with open(tmp_file_path, 'wb') as f:
+                    f.truncate(stat.size)
+                _save_state(state_path, state)
+            if transfer is not None:
+                transfer.total_bytes = stat.size
+
+            completed = set(state['completed'])
+            pending = [i for i in range(-(-stat.size // chunk_size)) if i not in completed]
+            lock = threading.Lock()
+
+            def fetch(index):
+                offset = index * chunk_size
+                length = min(chunk_size, stat.size - offset)
+
+                def get():
+                    response = client.client.get_object(
+                        client.bucket_name, object_name, offset=offset, length=length,
+                        request_headers={'If-Match': f'"{stat.etag}"'},
+                    )
+                    try:
+                        return b"".join(client._stream(response))
+                    finally:
+                        response.close()
+                        response.release_conn()
+
+                data = client._call(get)
+                with open(tmp_file_path, 'r+b') as f:
+                    f.seek(offset)
+                    f.write(data)
+                with lock:
+                    state['completed'].append(index)
+                    _save_state(state_path, state)
+                    if progress is not None:
+                        progress.update(len(data))
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(fetch, pending))
+
+            codec = codec_from_metadata(stat.metadata)
+            verifier = client._verifier(object_name, stat.metadata)
+            if codec:
+                _decompress_file(tmp_file_path, file_path, codec, verifier)
+                os.remove(tmp_file_path)
+            else:
+                if verifier:
+                    _verify_file(tmp_file_path, verifier)
+                os.replace(tmp_file_path, file_path)
+            _remove_state(state_path)
+            client.events.complete(transfer, progress)
+            return True
+        except CALL_ERRORS as e:
+            if attempt == 0 and (_is_code(e, 'PreconditionFailed') or getattr(e, 'status_code', None) == 412):
+                # The object changed since the checkpoint; start over once
+                _remove_state(state_path)
+                continue
+            if isinstance(e, ChecksumMismatch):
+                # Some range is corrupt and there is no telling which; start over next time
+                _remove_state(state_path)
+                if os.path.exists(tmp_file_path):
+                    os.remove(tmp_file_path)
+            client.events.failed(transfer, e, progress)
+            return False
+    return False
+
+
+def _verify_file(path, verifier):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            verifier.update(chunk)
+    verifier.verify()
+
+
+def _decompress_file(source_path, target_path, codec, verifier=None):
+    decoder = stream_decoder(codec)
+    tmp_path = f"{target_path}.tmp"
+    try:
+        with open(source_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                if verifier:
+                    verifier.update(chunk)
+                dst.write(decoder.decode(chunk))
+        decoder.finish()
+        if verifier:
+            verifier.verify()
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cleanup_abandoned_uploads(client, older_than=timedelta(hours=24), prefix="", state_dir=DEFAULT_STATE_DIR):
+    """
+    Abort multipart uploads that were started long ago and never completed.
+
+    Checkpoint files older than the same age are removed as well.
+
+    Args:
+        client (MinioWrapper): Server to clean up
+        older_than (timedelta): Minimum age of an upload to abort
+        prefix (str): Only consider objects with this prefix
+
+    Returns:
+        int: Number of uploads aborted
+    """
+    cutoff = datetime.now(timezone.utc) - older_than
+    aborted = 0
+    key_marker = upload_id_marker = None
+    while True:
+        result = client._call(client.client._list_multipart_uploads, client.bucket_name, prefix=prefix,
+                              key_marker=key_marker, upload_id_marker=upload_id_marker)
+        for upload in result.uploads:
+            if upload.initiated_time and upload.initiated_time < cutoff:
+                try:
+                    client._call(client.client._abort_multipart_upload, client.bucket_name,
+                                 upload.object_name, upload.upload_id)
+                    aborted += 1
+                except CALL_ERRORS as e:
+                    print(f"Error aborting upload of {upload.object_name} on {client.endpoint}: {e}")
+        if not result.is_truncated:
+            break
+        key_marker, upload_id_marker = result.next_key_marker, result.next_upload_id_marker
+
+    if os.path.isdir(state_dir):
+        threshold = cutoff.timestamp()
+        for name in os.listdir(state_dir):
+            path = os.path.join(state_dir, name)
+            if name.endswith(".json") and os.path.getmtime(path) < threshold:
+                os.remove(path)
+    return aborted
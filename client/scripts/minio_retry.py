@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Retry policies and per-server circuit breakers for MinIO calls.
+
+The MinIO SDK's default HTTP pool waits up to five minutes to connect and
+retries internally, so a dead server costs minutes per call. MinioWrapper
+instead uses a pool with short timeouts and no internal retries, and runs
+each call through a RetryPolicy (exponential backoff with full jitter) and a
+CircuitBreaker that fails fast once a server keeps failing.
+"""
+
+import random
+import threading
+import time
+
+import certifi
+import urllib3
+from minio.error import S3Error, ServerError, InvalidResponseError
+
+from minio_compression import DecompressionError
+
+# S3 error codes worth retrying: throttling and transient server-side failures
+RETRYABLE_S3_CODES = {
+    'SlowDown',
+    'SlowDownRead',
+    'SlowDownWrite',
+    'ServiceUnavailable',
+    'InternalError',
+    'RequestTimeout',
+    'RequestTimeTooSkewed',
+    'OperationTimedOut',
+    'XMinioServerNotInitialized',
+    'XMinioStorageFull',
+}
+
+# S3 error codes that mean the server is overloaded and wants us to back off harder
+THROTTLE_S3_CODES = {'SlowDown', 'SlowDownRead', 'SlowDownWrite'}
+
+RETRYABLE_HTTP_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Network-level failures raised by urllib3 or the socket layer
+TRANSPORT_ERRORS = (urllib3.exceptions.HTTPError, ConnectionError, TimeoutError)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a server whose circuit breaker is open."""
+
+    def __init__(self, name, retry_in):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {name}; next probe in {retry_in:.1f}s")
+
+
+class ChecksumMismatch(Exception):
+    """Raised when transferred bytes do not match their recorded checksum or ETag."""
+
+    def __init__(self, object_name, expected, actual):
+        self.object_name = object_name
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"Checksum mismatch for {object_name}: expected {expected}, got {actual}")
+
+
+# Every exception a wrapped MinIO call may end with; a download also fails with DecompressionError
+# when a compressed object is corrupt, truncated or in a codec that is not installed
+CALL_ERRORS = (S3Error, ServerError, InvalidResponseError, CircuitOpenError, ChecksumMismatch,
+               DecompressionError) + TRANSPORT_ERRORS
+
+
+def _status_of(error):
+    """Best-effort HTTP status code of a MinIO SDK exception."""
+    if isinstance(error, ServerError):
+        return error.status_code
+    if isinstance(error, S3Error) and error.response is not None:
+        return getattr(error.response, 'status', None)
+    if isinstance(error, InvalidResponseError):
+        return getattr(error, '_code', None)
+    return None
+
+
+def is_retryable(error):
+    """
+    Classify an exception raised by a MinIO call.
+
+    Args:
+        error (Exception): The exception to classify
+
+    Returns:
+        bool: True if the call may succeed when repeated
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (TRANSPORT_ERRORS, ChecksumMismatch)):
+        # A corrupted transfer may well succeed when repeated
+        return True
+    if isinstance(error, S3Error) and error.code in RETRYABLE_S3_CODES:
+        return True
+    return _status_of(error) in RETRYABLE_HTTP_STATUS
+
+
+def is_throttle(error):
+    """True if the server asked us to slow down (SlowDown or HTTP 503/429)."""
+    if isinstance(error, S3Error) and error.code in THROTTLE_S3_CODES:
+        return True
+    return _status_of(error) in (429, 503)
+
+
+def counts_against_server(error):
+    """
+    True if an error says something about the server's health.
+
+    Client errors such as NoSuchKey or AccessDenied are normal answers from a
+    healthy server and must not trip the circuit breaker. Neither does a
+    checksum mismatch, which is as likely to come from the network path.
+    """
+    if isinstance(error, ChecksumMismatch):
+        return False
+    return isinstance(error, TRANSPORT_ERRORS) or is_retryable(error)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts=3, base_delay=0.2, max_delay=10.0, throttle_multiplier=4.0,
+                 retryable=is_retryable):
+        """
+        Args:
+            max_attempts (int): Total attempts including the first call (1 disables retries)
+            base_delay (float): Delay ceiling in seconds before the first retry
+            max_delay (float): Upper bound for any single delay
+            throttle_multiplier (float): Extra factor applied after SlowDown/503 responses
+            retryable (callable): Predicate deciding whether an exception is retryable
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.throttle_multiplier = throttle_multiplier
+        self.retryable = retryable
+
+    def delay(self, attempt, error=None):
+        """
+        Seconds to sleep before retry number `attempt` (1-based).
+
+        Args:
+            attempt (int): Number of the failed attempt
+            error (Exception, optional): The error that caused the retry
+        """
+        ceiling = self.base_delay * (2 ** (attempt - 1))
+        if error is not None and is_throttle(error):
+            ceiling *= self.throttle_multiplier
+        return random.uniform(0, min(self.max_delay, ceiling))
+
+    def call(self, fn, *args, breaker=None, **kwargs):
+        """
+        Call fn(*args, **kwargs), retrying retryable failures.
+
+        Args:
+            fn (callable): The operation to run
+            breaker (CircuitBreaker, optional): Breaker guarding the target server
+
+        Returns:
+            The return value of fn
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None:
+                breaker.before_call()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if breaker is not None:
+                    if counts_against_server(e):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if attempt >= self.max_attempts or not self.retryable(e):
+                    raise
+                time.sleep(self.delay(attempt, e))
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+
+
+class CircuitBreaker:
+    """
+    Per-server circuit breaker.
+
+    closed    - calls pass through; consecutive failures are counted
+    open      - calls fail immediately with CircuitOpenError until reset_timeout passes
+    half_open - a single probe call is let through; success closes the
+                circuit, failure re-opens it
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            name (str): Name used in error messages (usually the endpoint)
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds to stay open before probing again
+        """
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self):
+        """Current state, moving from open to half_open once the timeout has passed."""
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    def _raise_if_open(self):
+        self._refresh()
+        if self._state == self.OPEN:
+            retry_in = self.reset_timeout - (time.monotonic() - self._opened_at)
+            raise CircuitOpenError(self.name, max(0.0, retry_in))
+
+    def check(self):
+        """
+        Raise CircuitOpenError while the circuit is open.
+
+        Unlike before_call(), this does not take the half-open probe, so it
+        suits calls that bypass the breaker and never report their outcome.
+        """
+        with self._lock:
+            self._raise_if_open()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not reach the server."""
+        with self._lock:
+            self._raise_if_open()
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Count a failure, opening the circuit when the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def trip(self):
+        """Open the circuit now, e.g. for a server that could not be reached at startup."""
+        with self._lock:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def allow(self):
+        """
+        Check without raising whether a call would currently be let through.
+
+        Returns:
+            bool: False while the circuit is open
+        """
+        with self._lock:
+            self._refresh()
+            return self._state != self.OPEN
+
+
+def build_http_client(connect_timeout=5.0, read_timeout=60.0, maxsize=10):
+    """
+    Build an HTTP pool for Minio() with short timeouts and no internal retries.
+
+    Args:
+        connect_timeout (float): Seconds to wait for a TCP connection
+        read_timeout (float): Seconds to wait for response data
+        maxsize (int): Connections kept per host
+
+    Returns:
+        urllib3.PoolManager: Pool suitable for Minio(http_client=...)
+    """
+    return urllib3.PoolManager(
+        timeout=urllib3.util.Timeout(connect=connect_timeout, read=read_timeout),
+        maxsize=maxsize,
+        cert_reqs='CERT_REQUIRED',
+        ca_certs=certifi.where(),
+        retries=urllib3.Retry(total=0, raise_on_status=False),
+    )
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Consistent-hash sharding across MinIO servers.
+
+Instead of storing every object on every server, each key is owned by the
+first `replicas` distinct servers found clockwise from the key's position on
+a hash ring. Every server is placed on the ring many times (virtual nodes),
+in proportion to its configured weight, so keys spread evenly and adding or
+removing a server only moves the keys whose owners changed.
+"""
+
+import os
+import bisect
+import hashlib
+
+from minio_retry import CALL_ERRORS
+
+
+def _hash(value):
+    """Stable 64-bit position on the ring."""
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent-hash ring with weighted virtual nodes."""
+
+    def __init__(self, weights, vnodes=100):
+        """
+        Args:
+            weights (dict): Server name -> relative weight (e.g. 1, 2, 0.5)
+            vnodes (int): Virtual nodes for a server of weight 1
+        """
+        self.vnodes = vnodes
+        self.weights = {}
+        self._points = []
+        self._owners = []
+        for name, weight in weights.items():
+            self.add_server(name, weight)
+
+    def add_server(self, name, weight=1):
+        """Place a server on the ring with vnodes * weight points."""
+        if name in self.weights:
+            self.remove_server(name)
+        self.weights[name] = weight
+        count = max(1, int(round(self.vnodes * weight)))
+        for i in range(count):
+            point = _hash(f"{name}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, name)
+
+    def remove_server(self, name):
+        """Take a server and all its virtual nodes off the ring."""
+        self.weights.pop(name, None)
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != name]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    @property
+    def servers(self):
+        return list(self.weights)
+
+    def nodes_for(self, key, replicas=1):
+        """
+        Servers responsible for a key, primary first.
+
+        Args:
+            key (str): Object name
+            replicas (int): Number of distinct servers to return (R)
+
+        Returns:
+            list: Up to `replicas` server names
+        """
+        if not self._points:
+            return []
+        replicas = min(replicas, len(self.weights))
+        start = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        nodes = []
+        for offset in range(len(self._points)):
+            owner = self._owners[(start + offset) % len(self._points)]
+            if owner not in nodes:
+                nodes.append(owner)
+                if len(nodes) == replicas:
+                    break
+        return nodes
+
+
+def build_ring(server_configs, servers=None, vnodes=100):
+    """
+    Build a HashRing from server configurations.
+
+    Args:
+        server_configs (dict): Dictionary with server configurations (uses the optional 'weight' key)
+        servers (iterable, optional): Only place these servers on the ring
+        vnodes (int): Virtual nodes for a server of weight 1
+
+    Returns:
+        HashRing: The ring
+    """
+    names = servers if servers is not None else server_configs.keys()
+    return HashRing({name: server_configs[name].get('weight', 1.0) for name in names}, vnodes)
+
+
+def upload_sharded(clients, ring, file_path, object_name=None, replicas=1):
+    """
+    Upload a file to the servers that own its key.
+
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        ring (HashRing): Placement ring
+        file_path (str): Path to the local file
+        object_name (str, optional): Name of the object in MinIO
+        replicas (int): Number of copies to store (R)
+
+    Returns:
+        dict: Dictionary with upload results for each owning server
+    """
+    if object_name is None:
+        object_name = os.path.basename(file_path)
+    return {server: clients[server].upload_file(file_path, object_name)
+            for server in ring.nodes_for(object_name, replicas)}
+
+
+def download_sharded(clients, ring, object_name, file_path=None, replicas=1):
+    """
+    Download a file from the first owning server that has it.
+
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        ring (HashRing): Placement ring
+        object_name (str): Name of the object in MinIO
+        file_path (str, optional): Path where to save the file
+        replicas (int): Number of copies stored (R)
+
+    Returns:
+        str or None: Name of the server the file came from, or None
+    """
+    for server in ring.nodes_for(object_name, replicas):
+        if clients[server].download_file(object_name, file_path):
+            return server
+    return None
+
+
+def plan_rebalance(placement, ring, replicas=1):
+    """
+    Work out which keys must move for the current placement to match the ring.
+
+    Args:
+        placement (dict): Object name -> set of servers that currently hold it
+        ring (HashRing): Target placement ring
+        replicas (int): Number of copies to store (R)
+
+    Returns:
+        list: (object_name, copies, deletes) for every key whose owners changed,
+            where copies is a list of (source, target) and deletes a list of servers
+    """
+    plan = []
+    for object_name, holders in placement.items():
+        owners = ring.nodes_for(object_name, replicas)
+        missing = [server for server in owners if server not in holders]
+        extra = [server for server in holders if server not in owners]
+        if not missing and not extra:
+            continue
+        # Prefer a source that keeps the key, so it is readable throughout the move
+        sources = sorted(holders, key=lambda server: server not in owners)
+        copies = [(sources[i % len(sources)], target) for i, target in enumerate(missing)]
+        plan.append((object_name, copies, extra))
+    return plan
+
+
+def rebalance(clients, ring, replicas=1, dry_run=False):
+    """
+    Move only the keys whose owners changed after servers were added or removed.
+
+    Every server in `clients` is listed, including servers that are no
+    longer on the ring, so their keys can be drained. A key is deleted from
+    a former owner only after all of its copies to new owners succeeded.
+    A listing error stops the rebalance before anything is moved, since a
+    plan made from a partial listing could drop the last copy of a key.
+
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        ring (HashRing): Target placement ring
+        replicas (int): Number of copies to store (R)
+        dry_run (bool): Only compute the plan
+
+    Returns:
+        dict: Counts of 'scanned', 'moved', 'copied', 'deleted' and 'failed' keys
+
+    Raises:
+        Exception: One of CALL_ERRORS if a server could not be listed
+    """
+    placement = {}
+    for server_name, client in clients.items():
+        try:
+            # scan_objects raises on errors where list_objects would return a partial list
+            client.breaker.check()
+            for obj in client.scan_objects():
+                placement.setdefault(obj.object_name, set()).add(server_name)
+        except CALL_ERRORS as e:
+            print(f"Error listing {server_name}: {e}")
+            raise
+
+    plan = plan_rebalance(placement, ring, replicas)
+    stats = {'scanned': len(placement), 'moved': len(plan), 'copied': 0, 'deleted': 0, 'failed': 0}
+    if dry_run:
+        return stats
+
+    for object_name, copies, deletes in plan:
+        ok = True
+        for source, target in copies:
+            if clients[source].copy_to(clients[target], object_name):
+                stats['copied'] += 1
+            else:
+                ok = False
+        if not ok:
+            stats['failed'] += 1
+            continue
+        for server in deletes:
+            if clients[server].delete_object(object_name):
+                stats['deleted'] += 1
+    return stats
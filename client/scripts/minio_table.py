@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Columnar object listings.
+
+objects_table() turns a stream of listed objects into a table with the
+columns key, size, etag and last_modified. Objects are accumulated in
+fixed-size chunks straight into NumPy arrays (sizes, timestamps) and Arrow
+string arrays (keys, ETags), so no Object instances or per-row Python
+dicts outlive a chunk. The result is a pandas DataFrame or a pyarrow Table.
+
+pyarrow is optional: without it, strings are stored as NumPy object arrays.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+COLUMNS = ('key', 'size', 'etag', 'last_modified')
+DEFAULT_CHUNK_SIZE = 100000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_NAT = np.iinfo(np.int64).min
+
+
+def _chunks(objects, chunk_size):
+    """Yield (keys, sizes, etags, mtimes) per chunk; sizes and mtimes are NumPy int64 arrays."""
+    keys, etags = [], []
+    sizes = np.empty(chunk_size, dtype=np.int64)
+    mtimes = np.empty(chunk_size, dtype=np.int64)
+    count = 0
+    for obj in objects:
+        keys.append(obj.object_name)
+        etags.append((obj.etag or '').strip('"'))
+        sizes[count] = obj.size or 0
+        # Nanoseconds since the epoch; NaT (int64 min) when unknown
+        mtimes[count] = (obj.last_modified - _EPOCH) // _MICROSECOND * 1000 if obj.last_modified else _NAT
+        count += 1
+        if count == chunk_size:
+            yield keys, sizes.copy(), etags, mtimes.copy()
+            keys, etags = [], []
+            count = 0
+    if count:
+        yield keys, sizes[:count].copy(), etags, mtimes[:count].copy()
+
+
+def objects_table(objects, backend="pandas", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Build a columnar table from listed objects.
+
+    Args:
+        objects (iterable): minio.datatypes.Object instances, e.g. MinioWrapper.scan_objects()
+        backend (str): 'pandas' for a DataFrame or 'arrow' for a pyarrow Table
+        chunk_size (int): Objects converted to columns at a time
+
+    Returns:
+        pandas.DataFrame or pyarrow.Table: Columns key, size, etag, last_modified (UTC)
+    """
+    if backend not in ('pandas', 'arrow'):
+        raise ValueError(f"Unknown backend {backend}; expected 'pandas' or 'arrow'")
+    if backend == 'arrow' and pa is None:
+        raise ImportError("backend='arrow' needs the pyarrow package")
+
+    if pa is not None:
+        schema = pa.schema([('key', pa.string()), ('size', pa.int64()), ('etag', pa.string()),
+                            ('last_modified', pa.timestamp('ns', tz='UTC'))])
+        batches = [
+            pa.RecordBatch.from_arrays([
+                pa.array(keys, pa.string()),
+                pa.array(sizes),
+                pa.array(etags, pa.string()),
+                pa.array(mtimes, pa.int64(), mask=mtimes == _NAT).cast(pa.timestamp('ns', tz='UTC')),
+            ], schema=schema)
+            for keys, sizes, etags, mtimes in _chunks(objects, chunk_size)
+        ]
+        table = pa.Table.from_batches(batches, schema=schema)
+        if backend == 'arrow':
+            return table
+        import pandas as pd
+        # Arrow-backed columns keep the strings out of Python objects
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        df['size'] = df['size'].astype('int64')
+        df['last_modified'] = df['last_modified'].astype('datetime64[ns, UTC]')
+        return df
+
+    import pandas as pd
+    parts = {name: [] for name in COLUMNS}
+    for keys, sizes, etags, mtimes in _chunks(objects, chunk_size):
+        parts['key'].append(np.array(keys, dtype=object))
+        parts['size'].append(sizes)
+        parts['etag'].append(np.array(etags, dtype=object))
+        parts['last_modified'].append(mtimes)
+    columns = {name: np.concatenate(chunks) if chunks else np.array([], dtype=object if name in ('key', 'etag')
+                                                                     else np.int64)
+               for name, chunks in parts.items()}
+    columns['last_modified'] = pd.to_datetime(columns['last_modified'].view('datetime64[ns]'), utc=True)
+    return pd.DataFrame(columns, columns=list(COLUMNS))
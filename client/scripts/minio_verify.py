@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Listing-only consistency check across replicas.
+
+Every server's bucket is listed concurrently in key order, and the sorted
+streams are merge-joined one key at a time. Memory stays constant: each
+server contributes only a few buffered listing pages, and findings are
+written out as they are found. Per key, the replicas are compared with the
+reference server (the first one by default):
+
+- missing:   the reference has the key, this server does not
+- extra:     this server has the key, the reference does not
+- divergent:  the replicas' decoded content differs
+
+A server that cannot be listed is reported as check_failed and left out
+of the rest of the comparison; if it is the reference, the comparison
+ends there. Either way the run is not reported as consistent.
+
+Nothing is downloaded except for deep checks. These cover every key whose
+sizes or ETags differ between replicas (compression, multipart part sizes
+or encryption can explain that without the content differing) and a
+random sample of keys that look identical. A deep check streams each
+replica and compares digests of the decoded content; equal content is
+reported as content_match.
+
+Listing requests and deep-check reads go through each client's rate
+limiter, so a verifier can run continuously next to production traffic.
+"""
+
+import json
+import queue
+import random
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from minio_listing import list_pages
+from minio_compression import stream_decoder, META_CODEC
+from minio_retry import CALL_ERRORS
+
+# Listing pages buffered per server
+PAGE_BUFFER = 4
+
+_DONE = object()
+
+
+def sorted_objects(client, prefix="", attempts=3):
+    """
+    Yield every object under a prefix in key order, resuming after the last key on errors.
+
+    Args:
+        client (MinioWrapper): Server to list
+        prefix (str): Only list keys starting with this prefix
+        attempts (int): Consecutive failures tolerated before giving up
+
+    Yields:
+        minio.datatypes.Object: Objects in key order
+    """
+    last = None
+    failures = 0
+    while True:
+        try:
+            for page in list_pages(client.client, client.bucket_name, prefix, start_after=last,
+                                   rate_limiter=client.rate_limiter):
+                failures = 0
+                for obj in page:
+                    last = obj.object_name
+                    yield obj
+            return
+        except CALL_ERRORS:
+            failures += 1
+            if failures >= attempts:
+                raise
+
+
+def _put(out, item, stop):
+    """Put into a bounded queue unless the consumer has gone away."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+
+def _feed(client, prefix, attempts, out, stop):
+    """Push one server's sorted listing into a bounded queue, page by page."""
+    try:
+        # The listing bypasses the breaker, so a server known to be down fails fast here
+        client.breaker.check()
+        page = []
+        for obj in sorted_objects(client, prefix, attempts):
+            page.append(obj)
+            if len(page) == 1000:
+                _put(out, page, stop)
+                page = []
+                if stop.is_set():
+                    return
+        if page:
+            _put(out, page, stop)
+        _put(out, _DONE, stop)
+    except Exception as e:
+        _put(out, e, stop)
+
+
+def _stream(out):
+    """Objects from a feeder queue; re-raises the feeder's error."""
+    while True:
+        item = out.get()
+        if item is _DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield from item
+
+
+def merge_listings(clients, prefix="", attempts=3, on_error=None):
+    """
+    Merge-join the sorted listings of several servers.
+
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        prefix (str): Only compare keys starting with this prefix
+        attempts (int): Consecutive listing failures tolerated per server
+        on_error (callable, optional): Called as on_error(server_name, error) when a
+            server's listing fails; that server is then left out of later rows.
+            Without it, the error is raised.
+
+    Yields:
+        tuple: (key, {server_name: Object or None})
+    """
+    stop = threading.Event()
+    streams = {}
+    for server_name, client in clients.items():
+        out = queue.Queue(maxsize=PAGE_BUFFER)
+        threading.Thread(target=_feed, args=(client, prefix, attempts, out, stop), daemon=True).start()
+        streams[server_name] = _stream(out)
+    heads = {}
+
+    def advance(name):
+        try:
+            heads[name] = next(streams[name], None)
+        except Exception as e:
+            if on_error is None:
+                raise
+            heads.pop(name, None)
+            on_error(name, e)
+
+    try:
+        for name in streams:
+            advance(name)
+        while True:
+            present = [obj.object_name for obj in heads.values() if obj is not None]
+            if not present:
+                return
+            key = min(present)
+            row = {}
+            for name, obj in list(heads.items()):
+                if obj is not None and obj.object_name == key:
+                    row[name] = obj
+                    advance(name)
+                else:
+                    row[name] = None
+            yield key, row
+    finally:
+        stop.set()
+
+
+def content_digest(client, object_name):
+    """SHA-256 of an object's decoded content, streamed through the client's rate limiter."""
+    def fetch():
+        response = client.client.get_object(client.bucket_name, object_name)
+        try:
+            codec = response.headers.get(f"x-amz-meta-{META_CODEC}")
+            decoder = stream_decoder(codec) if codec else None
+            h = hashlib.sha256()
+            for chunk in client._stream(response):
+                h.update(decoder.decode(chunk) if decoder else chunk)
+            if decoder:
+                decoder.finish()
+            return h.hexdigest()
+        finally:
+            response.close()
+            response.release_conn()
+
+    return client._call(fetch)
+
+
+def _describe(obj):
+    if obj is None:
+        return None
+    return {'size': obj.size, 'etag': (obj.etag or '').strip('"')}
+
+
+class ConsistencyReport:
+    """Counts findings and writes each one as a JSON line as soon as it is known."""
+
+    STATUSES = ('missing', 'extra', 'divergent', 'content_match', 'check_failed')
+
+    def __init__(self, output=None, keep=20):
+        """
+        Args:
+            output (file, optional): Text file receiving one JSON object per finding
+            keep (int): Findings kept in memory for the console summary
+        """
+        self.output = output
+        self.keep = keep
+        self.keys = 0
+        self.deep_checks = 0
+        self.counts = {status: 0 for status in self.STATUSES}
+        self.examples = []
+        self._lock = threading.Lock()
+
+    def add(self, key, status, servers, **details):
+        record = {'key': key, 'status': status, 'servers': servers}
+        record.update(details)
+        with self._lock:
+            self.counts[status] += 1
+            if status != 'content_match' and len(self.examples) < self.keep:
+                self.examples.append(record)
+            if self.output is not None:
+                self.output.write(json.dumps(record) + "\n")
+
+    @property
+    def consistent(self):
+        return not any(self.counts[status] for status in self.STATUSES if status != 'content_match')
+
+    def to_dict(self):
+        return {'keys': self.keys, 'deep_checks': self.deep_checks, 'consistent': self.consistent,
+                **self.counts}
+
+
+def verify_replicas(clients, prefix="", reference=None, sample=0.001, workers=4, output=None, attempts=3):
+    """
+    Compare the listings of all servers and deep-check flagged and sampled keys.
+
+    Args:
+        clients (dict): Dictionary with MinioWrapper instances
+        prefix (str): Only verify keys starting with this prefix
+        reference (str, optional): Server the others are compared with (default: the first)
+        sample (float): Fraction of identical-looking keys to deep-check (0 disables sampling)
+        workers (int): Concurrent deep checks; also bounds how many are queued
+        output (file, optional): Text file receiving one JSON line per finding
+        attempts (int): Consecutive listing failures tolerated per server
+
+    Returns:
+        ConsistencyReport: Counts, examples and the consistent flag
+    """
+    reference = reference or next(iter(clients))
+    report = ConsistencyReport(output)
+    in_flight = []
+    failed = set()
+
+    def listing_failed(name, error):
+        failed.add(name)
+        report.add(None, 'check_failed', {name: None}, server=name, reason='listing', error=str(error))
+
+    def deep_check(key, row, reason):
+        holders = {name: obj for name, obj in row.items() if obj is not None}
+        servers = {name: _describe(obj) for name, obj in row.items()}
+        try:
+            digests = {name: content_digest(clients[name], key) for name in holders}
+        except CALL_ERRORS as e:
+            report.add(key, 'check_failed', servers, reason=reason, error=str(e))
+            return
+        status = 'content_match' if len(set(digests.values())) == 1 else 'divergent'
+        report.add(key, status, servers, reason=reason, sha256=digests)
+
+    listing = merge_listings(clients, prefix, attempts, on_error=listing_failed)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for key, row in listing:
+            if reference in failed:
+                # Without the reference, missing and extra keys can no longer be told apart
+                listing.close()
+                break
+            report.keys += 1
+            servers = {name: _describe(obj) for name, obj in row.items()}
+            ref = row.get(reference)
+            for name, obj in row.items():
+                if name == reference:
+                    continue
+                if ref is not None and obj is None:
+                    report.add(key, 'missing', servers, server=name)
+                elif ref is None and obj is not None:
+                    report.add(key, 'extra', servers, server=name)
+
+            holders = [obj for obj in row.values() if obj is not None]
+            if len(holders) < 2:
+                continue
+            if len({(obj.size, (obj.etag or '').strip('"')) for obj in holders}) > 1:
+                reason = 'listing'
+            elif sample and random.random() < sample:
+                reason = 'sample'
+            else:
+                continue
+            report.deep_checks += 1
+            in_flight.append(pool.submit(deep_check, key, row, reason))
+            if len(in_flight) >= workers * 2:
+                in_flight.pop(0).result()
+        for future in in_flight:
+            future.result()
+    return report
@@ -1,12 +1,49 @@
 #!/usr/bin/env python3
 import os
+import io
+import sys
+import mimetypes
 from minio import Minio
-from minio.error import S3Error
+from minio.deleteobjects import DeleteObject
+from minio.helpers import get_part_info
+from minio_events import TransferEvents
+from minio_compression import (CompressingReader, resolve_codec, compression_metadata, stream_decoder,
+                               META_CODEC)
+from minio_retry import RetryPolicy, CircuitBreaker, CALL_ERRORS, build_http_client, counts_against_server
+from minio_listing import list_objects_parallel
+from minio_checksum import put_verified, verifier_for, META_PART_SIZE
+
+# Part size for multipart uploads of unknown length (the S3 minimum is 5 MiB)
+MULTIPART_PART_SIZE = 16 * 1024 * 1024
+
+# Keys per multi-object delete request (the S3 maximum)
+DELETE_BATCH_SIZE = 1000
+
+class _IterableReader:
+    """File-like view of an iterable of byte chunks, buffering at most one read plus one chunk."""
+    
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+    
+    def read(self, size=-1):
+        while size is None or size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+        if size is None or size < 0:
+            size = len(self._buffer)
+        out = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return out
 
 class MinioWrapper:
     """A wrapper class for Minio client operations."""
     
-    def __init__(self, endpoint=None, access_key=None, secret_key=None, secure=False, bucket_name="demo-bucket"):
+    def __init__(self, endpoint=None, access_key=None, secret_key=None, secure=False, bucket_name="demo-bucket",
+                 events=None, retry_policy=None, breaker=None, connect_timeout=5.0, read_timeout=60.0,
+                 compression=None, rate_limiter=None, inventory=None, checksum=None, check_bucket=True):
         """
         Initialize MinIO client with provided configuration.
         
@@ -16,67 +53,229 @@ class MinioWrapper:
             secret_key (str): Secret key for authentication
             secure (bool): Use HTTPS if True, HTTP if False
             bucket_name (str): Default bucket name to use
+            events (TransferEvents, optional): Event hub for transfer notifications.
+                Defaults to a quiet hub with no listeners.
+            retry_policy (RetryPolicy, optional): Retry policy for every call. Defaults to RetryPolicy().
+            breaker (CircuitBreaker, optional): Circuit breaker for this server. Defaults to a new one.
+            connect_timeout (float): Seconds to wait when connecting to the server
+            read_timeout (float): Seconds to wait for response data
+            compression (CompressionPolicy, optional): Which uploads to compress. Downloads are
+                decompressed whenever the object metadata says so, with or without a policy.
+            rate_limiter (RateLimiter, optional): Bandwidth and request-rate limits for this server,
+                shared by every thread using this wrapper
+            inventory (Inventory, optional): Local index of the bucket; successful uploads and
+                deletes made through this wrapper are written through to it
+            checksum (ChecksumPolicy, optional): Hash uploads in a single pass, send Content-MD5
+                per part and check the resulting ETag; verify downloads as they stream
+            check_bucket (bool): Make sure the bucket exists now; False skips the request, e.g. for
+                a server that is known to be down
         """
         self.endpoint = endpoint
+        self.secure = secure
         self.bucket_name = bucket_name
+        self.events = events if events is not None else TransferEvents()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.breaker = breaker if breaker is not None else CircuitBreaker(endpoint)
+        self.compression = compression
+        self.rate_limiter = rate_limiter if rate_limiter else None
+        self.inventory = inventory
+        self.checksum = checksum
+        # Called with every error that counts against this server; set by HealthMonitor.start()
+        self.health_observer = None
         
-        # Initialize MinIO client
+        # Initialize MinIO client; retries are handled by self.retry_policy, not urllib3
         self.client = Minio(
             endpoint,
             access_key=access_key,
             secret_key=secret_key,
-            secure=secure
+            secure=secure,
+            http_client=build_http_client(connect_timeout, read_timeout)
         )
         
         # Ensure bucket exists
-        self.ensure_bucket()
+        if check_bucket:
+            self.ensure_bucket()
+    
+    def _call(self, fn, *args, **kwargs):
+        """
+        Run a MinIO SDK call through the retry policy and circuit breaker.
+        
+        Raises:
+            CircuitOpenError: If the server's circuit is open
+        """
+        call = fn
+        if self.rate_limiter is not None:
+            limiter = self.rate_limiter
+            
+            def call(*a, **kw):
+                limiter.throttle_request()
+                return fn(*a, **kw)
+        
+        try:
+            return self.retry_policy.call(call, *args, breaker=self.breaker, **kwargs)
+        except CALL_ERRORS as e:
+            self._observe(e)
+            raise
+    
+    def _observe(self, error):
+        """Report a failed call to the health monitor, if one is watching this server."""
+        if self.health_observer is not None and counts_against_server(error):
+            self.health_observer(error)
+    
+    def _call_once(self, fn, *args, **kwargs):
+        """
+        Run a call that cannot be retried (its input stream is consumed as it goes),
+        still honouring the circuit breaker and request-rate limit.
+        
+        Raises:
+            CircuitOpenError: If the server's circuit is open
+        """
+        self.breaker.before_call()
+        if self.rate_limiter is not None:
+            self.rate_limiter.throttle_request()
+        try:
+            result = fn(*args, **kwargs)
+        except CALL_ERRORS as e:
+            if counts_against_server(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            self._observe(e)
+            raise
+        self.breaker.record_success()
+        return result
+    
+    def _reader(self, stream, part_size=None):
+        """
+        Wrap an upload stream so it is throttled chunk by chunk, if a limiter is set.
+        
+        Pass the multipart part size for uploads the SDK may split into parts,
+        so every part after the first is charged as a request of its own.
+        """
+        if self.rate_limiter is None:
+            return stream
+        return self.rate_limiter.wrap_reader(stream, part_size=part_size)
+    
+    def _stream(self, response):
+        """Iterate over a GET response body, throttled chunk by chunk if a limiter is set."""
+        if self.rate_limiter is None:
+            return response.stream(amt=1024 * 1024)
+        return self.rate_limiter.iter_chunks(response.stream(amt=64 * 1024))
+    
+    def _verifier(self, object_name, headers):
+        """Verifier for GET/HEAD response headers if download verification is on and the object can be checked."""
+        if self.checksum is None or not self.checksum.verify_downloads:
+            return None
+        return verifier_for(object_name, headers)
+    
+    def _record_put(self, object_name, result=None, size=None):
+        """Write a successful upload through to the inventory, if one is attached."""
+        if self.inventory is not None:
+            self.inventory.record_put(object_name, size, getattr(result, 'etag', None))
     
     def ensure_bucket(self):
         """Create the bucket if it doesn't exist."""
         try:
-            if not self.client.bucket_exists(self.bucket_name):
-                self.client.make_bucket(self.bucket_name)
+            if not self._call(self.client.bucket_exists, self.bucket_name):
+                self._call(self.client.make_bucket, self.bucket_name)
                 print(f"Bucket '{self.bucket_name}' created successfully")
             else:
                 print(f"Bucket '{self.bucket_name}' already exists")
-        except S3Error as e:
+        except CALL_ERRORS as e:
             print(f"Error ensuring bucket exists: {e}")
             raise
     
-    def upload_file(self, file_path, object_name=None):
+    def upload_file(self, file_path, object_name=None, compress=None):
         """
         Upload a file to MinIO server.
         
         Args:
             file_path (str): Path to the local file
             object_name (str, optional): Name of the object in MinIO. If None, uses the filename.
+            compress (None, bool or str, optional): None follows the compression policy,
+                False stores the file as is, True or a codec name ('gzip', 'zstd') forces compression
             
         Returns:
             bool: True if successful, False otherwise
         """
-        if not os.path.exists(file_path):
-            print(f"Error: File {file_path} not found")
-            return False
-        
         # Use filename as object_name if not specified
         if object_name is None:
             object_name = os.path.basename(file_path)
         
+        if not os.path.exists(file_path):
+            transfer = self.events.start('upload', self.endpoint, object_name, local_path=file_path)
+            self.events.failed(transfer, FileNotFoundError(f"File {file_path} not found"))
+            return False
+        
+        size = os.path.getsize(file_path)
+        codec = resolve_codec(self.compression, compress, object_name,
+                              mimetypes.guess_type(file_path)[0], size)
+        
+        transfer = self.events.start('upload', self.endpoint, object_name, size, local_path=file_path)
+        progress = self.events.progress(transfer)
         try:
-            # Upload the file
-            self.client.fput_object(
-                self.bucket_name, object_name, file_path,
-            )
-            print(f"Successfully uploaded {file_path} as {object_name} to {self.endpoint}")
+            if self.checksum is not None:
+                result = self._put_file_verified(file_path, object_name, codec, size, progress)
+                size = None if codec else size
+            elif codec:
+                result = self._call(self._put_compressed_file, file_path, object_name, codec, size, progress)
+                size = None
+            elif self.rate_limiter is not None:
+                result = self._call(self._put_file, file_path, object_name, size, progress)
+            else:
+                # Upload the file
+                result = self._call(
+                    self.client.fput_object,
+                    self.bucket_name, object_name, file_path, progress=progress,
+                )
+            self._record_put(object_name, result, size)
+            self.events.complete(transfer, progress)
             return True
-        except S3Error as e:
-            print(f"Error uploading file to {self.endpoint}: {e}")
+        except CALL_ERRORS as e:
+            self.events.failed(transfer, e, progress)
             return False
     
+    def _compressing_reader(self, source, codec):
+        policy = self.compression
+        if policy is None:
+            return CompressingReader(source, codec)
+        return CompressingReader(source, codec, policy.level, policy.frame_size,
+                                 policy.executor(), policy.workers)
+    
+    def _put_file(self, file_path, object_name, size, progress):
+        """Upload a file through the rate limiter (fput_object reads the file itself)."""
+        with open(file_path, 'rb') as f:
+            return self.client.put_object(
+                self.bucket_name, object_name, self._reader(f, get_part_info(size, 0)[0]), size,
+                progress=progress,
+            )
+    
+    def _put_compressed_file(self, file_path, object_name, codec, size, progress):
+        """Stream a file through the compressor as a multipart upload of unknown length."""
+        with open(file_path, 'rb') as f:
+            source = self._reader(self._compressing_reader(f, codec), MULTIPART_PART_SIZE)
+            return self.client.put_object(
+                self.bucket_name, object_name, source, -1,
+                metadata=compression_metadata(codec, size), progress=progress,
+                part_size=MULTIPART_PART_SIZE,
+            )
+    
+    def _put_file_verified(self, file_path, object_name, codec, size, progress):
+        """Read the file once, hashing and sending it part by part (compressed first if codec is set)."""
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        with open(file_path, 'rb') as f:
+            if codec:
+                return put_verified(self, self._compressing_reader(f, codec), object_name, self.checksum,
+                                    content_type=content_type, metadata=compression_metadata(codec, size),
+                                    progress=progress)
+            return put_verified(self, f, object_name, self.checksum, size, content_type, progress=progress)
+    
     def download_file(self, object_name, file_path=None):
         """
         Download a file from MinIO server.
         
+        Compressed objects are decompressed while they stream to disk.
+        
         Args:
             object_name (str): Name of the object in MinIO
             file_path (str, optional): Path where to save the file. If None, saves to current directory.
@@ -91,27 +290,416 @@ class MinioWrapper:
         # Ensure directory exists
         os.makedirs(os.path.dirname(file_path) if os.path.dirname(file_path) else '.', exist_ok=True)
         
+        transfer = self.events.start('download', self.endpoint, object_name, local_path=file_path)
+        progress = self.events.progress(transfer)
         try:
             # Download the file
-            self.client.fget_object(
-                self.bucket_name, object_name, file_path
+            self._call(self._get_to_file, object_name, file_path, progress)
+            self.events.complete(transfer, progress)
+            return True
+        except CALL_ERRORS as e:
+            self.events.failed(transfer, e, progress)
+            return False
+    
+    def _get_to_file(self, object_name, file_path, progress=None):
+        """Single GET streamed to a temporary file, decompressing if the object metadata says so."""
+        response = self.client.get_object(self.bucket_name, object_name)
+        tmp_file_path = f"{file_path}.part.minio"
+        try:
+            codec = response.headers.get(f"x-amz-meta-{META_CODEC}")
+            decoder = stream_decoder(codec) if codec else None
+            verifier = self._verifier(object_name, response.headers)
+            if progress:
+                progress.set_meta(object_name=object_name,
+                                  total_length=int(response.headers.get('content-length', 0)))
+            with open(tmp_file_path, 'wb') as f:
+                for chunk in self._stream(response):
+                    if verifier:
+                        verifier.update(chunk)
+                    f.write(decoder.decode(chunk) if decoder else chunk)
+                    if progress:
+                        progress.update(len(chunk))
+            if decoder:
+                decoder.finish()
+            if verifier:
+                verifier.verify()
+            os.replace(tmp_file_path, file_path)
+        finally:
+            response.close()
+            response.release_conn()
+            if os.path.exists(tmp_file_path):
+                os.remove(tmp_file_path)
+    
+    def upload_data(self, data, object_name, content_type="application/octet-stream", metadata=None,
+                    compress=None):
+        """
+        Upload in-memory data to MinIO server.
+        
+        Args:
+            data (bytes or str): Data to upload
+            object_name (str): Name of the object in MinIO
+            content_type (str, optional): Content type of the object
+            metadata (dict, optional): User metadata to store with the object
+            compress (None, bool or str, optional): None follows the compression policy,
+                False stores the data as is, True or a codec name forces compression
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        # Convert string to bytes if needed
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        
+        size = len(data)
+        codec = resolve_codec(self.compression, compress, object_name, content_type, size)
+        if codec:
+            metadata = compression_metadata(codec, size, metadata)
+            data = self._compressing_reader(io.BytesIO(data), codec).read()
+        
+        transfer = self.events.start('upload', self.endpoint, object_name, len(data))
+        progress = self.events.progress(transfer)
+        try:
+            if self.checksum is not None:
+                result = put_verified(self, io.BytesIO(data), object_name, self.checksum, len(data), content_type,
+                                      metadata, progress)
+                self._record_put(object_name, result, len(data))
+                self.events.complete(transfer, progress)
+                return True
+            # A fresh stream per attempt so retries resend the whole payload
+            result = self._call(
+                lambda: self.client.put_object(
+                    self.bucket_name, object_name, self._reader(io.BytesIO(data), get_part_info(len(data), 0)[0]),
+                    len(data),
+                    content_type=content_type, metadata=metadata, progress=progress,
+                )
             )
-            print(f"Successfully downloaded {object_name} to {file_path} from {self.endpoint}")
+            self._record_put(object_name, result, len(data))
+            self.events.complete(transfer, progress)
+            return True
+        except CALL_ERRORS as e:
+            self.events.failed(transfer, e, progress)
+            return False
+    
+    def upload_stream(self, source, object_name, content_type="application/octet-stream", metadata=None,
+                      compress=None, part_size=MULTIPART_PART_SIZE):
+        """
+        Upload a stream of unknown length as a multipart upload.
+        
+        Only one part is held in memory at a time, so pipes of any size
+        can be uploaded. A consumed stream cannot be replayed, so the upload
+        is not retried; a failed multipart upload is aborted by the SDK.
+        
+        Args:
+            source (file, iterable or str): Binary file-like object, iterable of bytes chunks,
+                or '-' for stdin
+            object_name (str): Name of the object in MinIO
+            content_type (str, optional): Content type of the object
+            metadata (dict, optional): User metadata to store with the object
+            compress (None, bool or str, optional): None follows the compression policy,
+                False stores the data as is, True or a codec name forces compression
+            part_size (int): Bytes per part (at least 5 MiB)
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if source == '-':
+            source = sys.stdin.buffer
+        elif not hasattr(source, 'read'):
+            source = _IterableReader(source)
+        
+        codec = resolve_codec(self.compression, compress, object_name, content_type)
+        if codec:
+            metadata = compression_metadata(codec, metadata=metadata)
+            source = self._compressing_reader(source, codec)
+        
+        transfer = self.events.start('upload', self.endpoint, object_name)
+        progress = self.events.progress(transfer)
+        try:
+            if self.checksum is not None:
+                # Parts are buffered, so each one can be retried even though the stream cannot
+                result = put_verified(self, source, object_name, self.checksum, content_type=content_type,
+                                      metadata=metadata, progress=progress)
+            else:
+                result = self._call_once(
+                    self.client.put_object,
+                    self.bucket_name, object_name, self._reader(source, part_size), -1,
+                    content_type=content_type, metadata=metadata, progress=progress, part_size=part_size,
+                )
+            self._record_put(object_name, result)
+            self.events.complete(transfer, progress)
             return True
-        except S3Error as e:
-            print(f"Error downloading file from {self.endpoint}: {e}")
+        except CALL_ERRORS as e:
+            self.events.failed(transfer, e, progress)
             return False
     
-    def list_objects(self):
+    def download_data(self, object_name):
         """
-        List all objects in the bucket.
+        Download an object from MinIO server and return it as bytes, decompressed if needed.
+        
+        Args:
+            object_name (str): Name of the object in MinIO
+            
+        Returns:
+            bytes or None: Object data, or None if the download failed
+        """
+        transfer = self.events.start('download', self.endpoint, object_name)
+        
+        def fetch():
+            response = self.client.get_object(self.bucket_name, object_name)
+            try:
+                codec = response.headers.get(f"x-amz-meta-{META_CODEC}")
+                verifier = self._verifier(object_name, response.headers)
+                chunks = self._stream(response)
+                if verifier:
+                    chunks = list(chunks)
+                    for chunk in chunks:
+                        verifier.update(chunk)
+                    verifier.verify()
+                if codec:
+                    decoder = stream_decoder(codec)
+                    data = b"".join(decoder.decode(chunk) for chunk in chunks)
+                    decoder.finish()
+                    return data
+                return b"".join(chunks)
+            finally:
+                response.close()
+                response.release_conn()
+        
+        try:
+            data = self._call(fetch)
+            if transfer is not None:
+                transfer.total_bytes = transfer.bytes_done = len(data)
+            self.events.complete(transfer)
+            return data
+        except CALL_ERRORS as e:
+            self.events.failed(transfer, e)
+            return None
+    
+    def write_dataframe(self, df, object_name, format=None, compress=None, chunk_rows=100000, **kwargs):
+        """
+        Write a pandas DataFrame straight into an object, without a local file.
+        
+        Args:
+            df (pandas.DataFrame): Frame to write
+            object_name (str): Name of the object in MinIO
+            format (str, optional): 'csv', 'parquet' or 'jsonl'; guessed from the extension
+            compress (None, bool or str, optional): As for upload_data (Parquet defaults to False)
+            chunk_rows (int, optional): Rows serialised and uploaded at a time
+            **kwargs: Passed to the pandas/pyarrow writer
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        from minio_dataframe import write_dataframe
+        return write_dataframe(self, df, object_name, format, compress, chunk_rows, **kwargs)
+    
+    def read_dataframe(self, object_name, format=None, columns=None, chunksize=None, **kwargs):
+        """
+        Read an object straight into a pandas DataFrame, without a local file.
+        
+        Args:
+            object_name (str): Name of the object in MinIO
+            format (str, optional): 'csv', 'parquet' or 'jsonl'; guessed from the extension
+            columns (list, optional): Only load these columns (for Parquet, only their bytes
+                are downloaded)
+            chunksize (int, optional): Return an iterator of frames with this many rows
+            **kwargs: Passed to the pandas/pyarrow reader
+            
+        Returns:
+            pandas.DataFrame, iterator or None: The frame or frames, or None if the read failed
+        """
+        from minio_dataframe import read_dataframe
+        return read_dataframe(self, object_name, format, columns, chunksize, **kwargs)
+    
+    def download_range(self, object_name, offset, length):
+        """
+        Read a byte range of an object with a single ranged GET.
+        
+        Compression is not undone here: offsets refer to the stored bytes.
+        
+        Args:
+            object_name (str): Name of the object in MinIO
+            offset (int): First byte to read
+            length (int): Number of bytes to read
+            
+        Returns:
+            bytes or None: The requested bytes, or None if the read failed
+        """
+        def fetch():
+            response = self.client.get_object(self.bucket_name, object_name, offset=offset, length=length)
+            try:
+                return b"".join(self._stream(response))
+            finally:
+                response.close()
+                response.release_conn()
+        
+        try:
+            return self._call(fetch)
+        except CALL_ERRORS as e:
+            print(f"Error reading {object_name}[{offset}:{offset + length}] from {self.endpoint}: {e}")
+            return None
+    
+    def list_objects(self, prefix="", recursive=True):
+        """
+        List objects in the bucket.
+        
+        Args:
+            prefix (str, optional): Only list objects whose names start with this prefix
+            recursive (bool, optional): List recursively instead of one "folder" level
         
         Returns:
             list: List of object names in the bucket
         """
         try:
-            objects = self.client.list_objects(self.bucket_name, recursive=True)
-            return [obj.object_name for obj in objects]
-        except S3Error as e:
+            return self._call(
+                lambda: [obj.object_name for obj in
+                         self.client.list_objects(self.bucket_name, prefix=prefix, recursive=recursive)]
+            )
+        except CALL_ERRORS as e:
             print(f"Error listing objects: {e}")
             return []
+    
+    def scan_objects(self, prefix="", workers=16, sort=False):
+        """
+        Iterate over every object under a prefix using concurrent, disjoint listings.
+        
+        Unlike list_objects(), the full Object instances (size, ETag, last
+        modified) are returned, lazily, and listing errors are raised rather
+        than swallowed, so a partial scan is never mistaken for a complete one.
+        
+        Args:
+            prefix (str, optional): Only list objects whose names start with this prefix
+            workers (int, optional): Concurrent listing requests
+            sort (bool, optional): Yield objects in key order (holds the listing in memory)
+        
+        Yields:
+            minio.datatypes.Object: Objects in the bucket
+        """
+        return list_objects_parallel(self.client, self.bucket_name, prefix, workers=workers, sort=sort,
+                                     attempts=self.retry_policy.max_attempts, rate_limiter=self.rate_limiter)
+    
+    def list_objects_table(self, prefix="", workers=16, backend="pandas", chunk_size=100000):
+        """
+        List objects into a columnar table for vectorized analysis.
+        
+        Args:
+            prefix (str, optional): Only list objects whose names start with this prefix
+            workers (int, optional): Concurrent listing requests
+            backend (str, optional): 'pandas' for a DataFrame or 'arrow' for a pyarrow Table
+            chunk_size (int, optional): Objects converted to columns at a time
+        
+        Returns:
+            pandas.DataFrame or pyarrow.Table: Columns key, size, etag, last_modified
+        """
+        # Imported here so plain transfers do not pay for NumPy/pandas at startup
+        from minio_table import objects_table
+        return objects_table(self.scan_objects(prefix, workers), backend, chunk_size)
+    
+    def delete_object(self, object_name):
+        """
+        Delete an object from the bucket.
+        
+        Args:
+            object_name (str): Name of the object to delete
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            self._call(self.client.remove_object, self.bucket_name, object_name)
+            if self.inventory is not None:
+                self.inventory.record_delete(object_name)
+            return True
+        except CALL_ERRORS as e:
+            print(f"Error deleting {object_name} from {self.endpoint}: {e}")
+            return False
+    
+    def delete_objects(self, object_names):
+        """
+        Delete many objects with batched multi-object delete requests.
+        
+        Keys are sent DELETE_BATCH_SIZE at a time, so any iterable (e.g. a
+        lazy listing) can be passed. Keys that do not exist count as deleted.
+        
+        Args:
+            object_names (iterable): Names of the objects to delete
+            
+        Returns:
+            tuple: (number of objects deleted, list of names that could not be deleted)
+        """
+        deleted = 0
+        failed = []
+        batch = []
+        for object_name in object_names:
+            batch.append(object_name)
+            if len(batch) == DELETE_BATCH_SIZE:
+                errors = self._delete_batch(batch)
+                deleted += len(batch) - len(errors)
+                failed.extend(errors)
+                batch = []
+        if batch:
+            errors = self._delete_batch(batch)
+            deleted += len(batch) - len(errors)
+            failed.extend(errors)
+        return deleted, failed
+    
+    def _delete_batch(self, object_names):
+        """Send one multi-object delete; returns the names the server refused."""
+        def remove():
+            # remove_objects is lazy; the request is only sent while iterating
+            return [error.name for error in self.client.remove_objects(
+                self.bucket_name, [DeleteObject(name) for name in object_names])]
+        
+        try:
+            errors = self._call(remove)
+        except CALL_ERRORS as e:
+            print(f"Error deleting {len(object_names)} object(s) from {self.endpoint}: {e}")
+            return list(object_names)
+        if self.inventory is not None:
+            refused = set(errors)
+            for object_name in object_names:
+                if object_name not in refused:
+                    self.inventory.record_delete(object_name)
+        return errors
+    
+    def copy_to(self, target, object_name):
+        """
+        Stream an object from this server to another server.
+        
+        The object is read and written in one pass without touching local
+        disk. Content type and user metadata are preserved. Objects uploaded
+        with checksums are copied with their recorded part size, so the copy's
+        multipart ETag still matches the recorded checksum metadata.
+        
+        Args:
+            target (MinioWrapper): Wrapper of the destination server
+            object_name (str): Name of the object to copy
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        response = None
+        try:
+            stat = self._call(self.client.stat_object, self.bucket_name, object_name)
+            metadata = {k[len("x-amz-meta-"):]: v for k, v in (stat.metadata or {}).items()
+                        if k.lower().startswith("x-amz-meta-")}
+            recorded = next((v for k, v in metadata.items() if k.lower() == META_PART_SIZE.lower()), "")
+            response = self._call(self.client.get_object, self.bucket_name, object_name)
+            part_size = get_part_info(stat.size, int(recorded) if recorded.isdigit() else 0)[0]
+            # A partly consumed stream cannot be replayed, so the write is not retried
+            result = target._call_once(
+                target.client.put_object,
+                target.bucket_name, object_name, target._reader(self._reader(response), part_size), stat.size,
+                content_type=stat.content_type or "application/octet-stream",
+                metadata=metadata,
+                part_size=part_size,
+            )
+            target._record_put(object_name, result, stat.size)
+            return True
+        except CALL_ERRORS as e:
+            print(f"Error copying {object_name} from {self.endpoint} to {target.endpoint}: {e}")
+            return False
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
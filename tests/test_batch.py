@@ -0,0 +1,80 @@
+import io
+import json
+
+import pytest
+
+from minio_batch import read_manifest, failed_items, run_batch
+
+
+class FakeClient:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.uploads = []
+
+    def upload_file(self, file_path, object_name):
+        self.uploads.append(object_name)
+        return object_name not in self.fail
+
+    def delete_object(self, object_name):
+        return object_name not in self.fail
+
+
+def _lines(path):
+    with open(path) as f:
+        return [json.loads(text) for text in f if text.strip()]
+
+
+def test_malformed_line_is_logged_and_the_batch_continues(tmp_path):
+    manifest = io.StringIO('{"op": "upload", "file": "a.csv"}\n'
+                           '{"op": "upload", "file": \n'
+                           '{"op": "frobnicate", "object": "x"}\n'
+                           '{"op": "delete", "object": "b.csv"}\n')
+    log = tmp_path / "results.jsonl"
+    stats = run_batch({'S0': FakeClient()}, read_manifest(manifest), workers=2, result_log=str(log))
+
+    assert stats == {'total': 4, 'succeeded': 2, 'failed': 2}
+    results = {result['line']: result for result in _lines(log)}
+    assert results[1]['ok'] and results[4]['ok']
+    assert not results[2]['ok'] and results[2]['error']
+    assert "unknown operation" in results[3]['error']
+
+
+def test_csv_manifest_with_bad_row():
+    manifest = io.StringIO("op,file,object,server\nupload,a.csv,,\nupload,,,\n")
+    items = list(read_manifest(manifest))
+    assert items[0]['object'] == 'a.csv'
+    assert "needs a file" in items[1]['invalid']
+
+
+def test_failed_items_only_keeps_the_latest_result(tmp_path):
+    log = tmp_path / "results.jsonl"
+    client = FakeClient(fail={'a.csv', 'b.csv'})
+    manifest = io.StringIO('{"op": "upload", "file": "a.csv"}\n{"op": "upload", "file": "b.csv"}\n')
+    run_batch({'S0': client}, read_manifest(manifest), result_log=str(log))
+
+    # a.csv succeeds on the retry, b.csv keeps failing
+    client.fail = {'b.csv'}
+    run_batch({'S0': client}, failed_items(str(log)), result_log=str(log))
+    assert [item['object'] for item in failed_items(str(log))] == ['b.csv']
+
+
+def test_retrying_into_the_same_log_terminates(tmp_path):
+    log = tmp_path / "results.jsonl"
+    client = FakeClient(fail={'a.csv'})
+    run_batch({'S0': client}, read_manifest(io.StringIO('{"op": "upload", "file": "a.csv"}\n')), result_log=str(log))
+
+    stats = run_batch({'S0': client}, failed_items(str(log)), result_log=str(log))
+    assert stats['total'] == 1
+    assert len(_lines(log)) == 2
+
+
+def test_manifest_read_error_still_logs_finished_items(tmp_path):
+    log = tmp_path / "results.jsonl"
+
+    def items():
+        yield {'line': 1, 'op': 'upload', 'file': 'a.csv', 'object': 'a.csv', 'server': None}
+        raise OSError("manifest went away")
+
+    with pytest.raises(OSError):
+        run_batch({'S0': FakeClient()}, items(), result_log=str(log))
+    assert [result['object'] for result in _lines(log)] == ['a.csv']
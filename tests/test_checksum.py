@@ -0,0 +1,68 @@
+import hashlib
+import io
+
+import pytest
+from minio.helpers import ObjectWriteResult
+
+from minio_checksum import ChecksumPolicy, put_verified, verifier_for
+from minio_retry import ChecksumMismatch
+
+# What encrypted objects get instead of the MD5 of their content
+OPAQUE_ETAG = "0" * 32
+
+
+class FakeSDK:
+    def __init__(self, etag=None, response_headers=None):
+        self.etag = etag
+        self.response_headers = response_headers or {}
+        self.objects = {}
+
+    def _put_object(self, bucket_name, object_name, data, headers):
+        self.objects[object_name] = data
+        etag = self.etag or hashlib.md5(data).hexdigest()
+        return ObjectWriteResult(bucket_name, object_name, None, etag, self.response_headers)
+
+    def remove_object(self, bucket_name, object_name):
+        del self.objects[object_name]
+
+
+class FakeClient:
+    bucket_name = "bucket"
+    rate_limiter = None
+
+    def __init__(self, **kwargs):
+        self.client = FakeSDK(**kwargs)
+
+    def _call(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def test_plain_upload_is_checked_against_its_etag():
+    client = FakeClient()
+    put_verified(client, io.BytesIO(b"data"), "a", ChecksumPolicy('md5'))
+    assert client.client.objects == {"a": b"data"}
+
+
+def test_mismatching_etag_removes_the_object():
+    client = FakeClient(etag=OPAQUE_ETAG)
+    with pytest.raises(ChecksumMismatch):
+        put_verified(client, io.BytesIO(b"data"), "a", ChecksumPolicy('md5'))
+    assert client.client.objects == {}
+
+
+def test_upload_encrypted_by_the_server_is_kept():
+    client = FakeClient(etag=OPAQUE_ETAG, response_headers={'x-amz-server-side-encryption': 'AES256'})
+    put_verified(client, io.BytesIO(b"data"), "a", ChecksumPolicy('md5'))
+    assert client.client.objects == {"a": b"data"}
+
+
+def test_upload_requesting_encryption_is_kept():
+    client = FakeClient(etag=OPAQUE_ETAG)
+    put_verified(client, io.BytesIO(b"data"), "a", ChecksumPolicy('md5'),
+                 metadata={'x-amz-server-side-encryption-customer-algorithm': 'AES256'})
+    assert client.client.objects == {"a": b"data"}
+
+
+def test_encrypted_download_is_not_verified_by_etag():
+    headers = {'ETag': f'"{OPAQUE_ETAG}"', 'x-amz-server-side-encryption': 'AES256'}
+    assert verifier_for("a", headers) is None
@@ -0,0 +1,51 @@
+import socket
+
+import pytest
+
+moto_server = pytest.importorskip("moto.server")
+
+from minio_cli import Session, build_parser, run_script
+
+
+@pytest.fixture(scope="module")
+def endpoint():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = moto_server.ThreadedMotoServer(port=port, verbose=False)
+    server.start()
+    yield f"127.0.0.1:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def session(endpoint, tmp_path):
+    config = tmp_path / "minio_config.ini"
+    config.write_text(f"[minio]\nendpoint = {endpoint}\naccess_key = a\nsecret_key = b\nbucket_name = cli-bucket\n")
+    return Session(str(config))
+
+
+def run(session, *lines):
+    return run_script(session, build_parser(), lines, keep_going=True)
+
+
+def test_failed_transfers_say_why(session, tmp_path, capsys):
+    assert run(session, f"put {tmp_path / 'missing.csv'}", "get no/such/key.csv " + str(tmp_path / "out.csv")) == 2
+    err = capsys.readouterr().err
+    assert "missing.csv not found" in err
+    assert "NoSuchKey" in err
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_ls_lists_through_the_breaker(session, tmp_path, capsys, workers):
+    source = tmp_path / "a.csv"
+    source.write_text("a,b\n")
+    assert run(session, f"put {source} ls/a.csv", f"put {source} ls/b.csv") == 0
+    capsys.readouterr()
+
+    assert run(session, f"ls ls/ --workers {workers}") == 0
+    assert capsys.readouterr().out.split() == ["ls/a.csv", "ls/b.csv"]
+
+    session.client.breaker.trip()
+    assert run(session, "ls ls/") == 1
+    assert "Circuit open" in capsys.readouterr().err
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "client", "scripts")
+
+# Heavy modules minio_cli must only import once a command needs them
+HEAVY = ("minio", "tabulate", "pandas", "pyarrow", "urllib3", "minio_wrapper")
+
+CHECK = """
+import runpy, sys
+sys.argv = ["minio_cli.py"] + sys.argv[1:]
+try:
+    {run}
+except SystemExit:
+    pass
+heavy = sorted(name for name in sys.modules if name.split('.')[0] in {heavy!r})
+print("HEAVY:" + ",".join(heavy), file=sys.stderr)
+"""
+
+
+def run_cli(run, *args):
+    code = CHECK.format(run=run, heavy=HEAVY)
+    result = subprocess.run([sys.executable, "-c", code, *args], cwd=SCRIPTS, capture_output=True, text=True,
+                            timeout=60)
+    marker = [line for line in result.stderr.splitlines() if line.startswith("HEAVY:")]
+    assert marker, result.stderr
+    return result.stdout, marker[-1][len("HEAVY:"):]
+
+
+def test_import_does_not_load_heavy_modules():
+    _, heavy = run_cli("import minio_cli")
+    assert heavy == ""
+
+
+@pytest.mark.parametrize("args", [["--help"], ["put", "--help"], ["ls", "--help"]])
+def test_help_does_not_load_heavy_modules(args):
+    stdout, heavy = run_cli("runpy.run_path('minio_cli.py', run_name='__main__')", *args)
+    assert "usage:" in stdout
+    assert heavy == ""
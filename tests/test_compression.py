@@ -0,0 +1,119 @@
+import gzip
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from minio_compression import (CompressingReader, DecompressionError, META_CODEC, available, decompress_chunks,
+                               stream_decoder)
+from minio_retry import RetryPolicy
+from minio_wrapper import MinioWrapper
+
+DATA = b"".join(f"{i},row-{i}\n".encode() for i in range(10000))
+
+
+def chunked(data, size=1000):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+CODECS = [pytest.param(codec, marks=pytest.mark.skipif(not available(codec), reason=f"{codec} not installed"))
+          for codec in ('gzip', 'zstd')]
+
+
+def compress(data, codec, frame_size=4096, executor=None):
+    reader = CompressingReader(io.BytesIO(data), codec, frame_size=frame_size, executor=executor,
+                               workers=2 if executor else 0)
+    out = b"".join(iter(lambda: reader.read(1000), b""))
+    assert reader.bytes_in == len(data) and reader.bytes_out == len(out)
+    return out
+
+
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize("data", [b"", b"x", DATA])
+def test_round_trip_of_concatenated_frames(codec, data):
+    compressed = compress(data, codec)
+    # One independent member/frame per 4 KiB of input
+    for size in (1, 7, 1000, len(compressed) or 1):
+        assert b"".join(decompress_chunks(chunked(compressed, size), codec)) == data
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_parallel_compression_keeps_frame_order(codec):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        compressed = compress(DATA, codec, executor=executor)
+    assert compressed == compress(DATA, codec)
+    assert b"".join(decompress_chunks(chunked(compressed), codec)) == DATA
+
+
+def test_gzip_frames_are_readable_by_standard_tools():
+    assert gzip.decompress(compress(DATA, 'gzip')) == DATA
+
+
+def test_truncated_gzip_stream_is_an_error():
+    compressed = gzip.compress(DATA)
+    decoder = stream_decoder('gzip')
+    decoder.decode(compressed[:len(compressed) // 2])
+    with pytest.raises(DecompressionError):
+        decoder.finish()
+    with pytest.raises(DecompressionError):
+        list(decompress_chunks(chunked(compressed[:-10]), 'gzip'))
+
+
+def test_corrupt_gzip_stream_is_an_error():
+    compressed = bytearray(gzip.compress(DATA))
+    compressed[20:30] = b"\xff" * 10
+    with pytest.raises(DecompressionError):
+        list(decompress_chunks(chunked(bytes(compressed)), 'gzip'))
+
+
+def test_unknown_codec_is_an_error():
+    with pytest.raises(DecompressionError):
+        stream_decoder('lz4')
+
+
+class Response:
+    def __init__(self, data, headers):
+        self.data = data
+        self.headers = headers
+
+    def stream(self, amt=None):
+        return iter(chunked(self.data))
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeSDK:
+    def __init__(self, data, codec):
+        self.data = data
+        self.codec = codec
+
+    def get_object(self, bucket_name, object_name):
+        return Response(self.data, {f"x-amz-meta-{META_CODEC}": self.codec})
+
+
+def wrapper(data, codec):
+    client = MinioWrapper("127.0.0.1:9", "a", "b", False, "bucket", retry_policy=RetryPolicy(max_attempts=1),
+                          check_bucket=False)
+    client.client = FakeSDK(data, codec)
+    return client
+
+
+@pytest.mark.parametrize("data, codec", [(gzip.compress(DATA)[:-100], 'gzip'), (gzip.compress(DATA), 'lz4')])
+def test_downloads_of_undecodable_objects_fail(tmp_path, data, codec):
+    client = wrapper(data, codec)
+    target = tmp_path / "out.csv"
+    assert client.download_file("a.csv", str(target)) is False
+    assert not target.exists()
+    assert client.download_data("a.csv") is None
+
+
+def test_download_of_gzip_object_is_decompressed(tmp_path):
+    client = wrapper(gzip.compress(DATA), 'gzip')
+    target = tmp_path / "out.csv"
+    assert client.download_file("a.csv", str(target))
+    assert target.read_bytes() == DATA
+    assert client.download_data("a.csv") == DATA
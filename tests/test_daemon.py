@@ -0,0 +1,155 @@
+import json
+import os
+import socket
+import stat
+import threading
+import time
+
+import pytest
+
+from minio_daemon import JobServer, request
+from minio_handoff import HintQueue, Tombstones
+from minio_retry import CircuitBreaker
+
+
+class FakeClient:
+    inventory = None
+
+    def __init__(self, name, up=True):
+        self.breaker = CircuitBreaker(name)
+        self.up = up
+        self.objects = {}
+
+    def upload_file(self, file_path, object_name=None):
+        if self.up:
+            with open(file_path, 'rb') as f:
+                self.objects[object_name] = f.read()
+        return self.up
+
+    def download_file(self, object_name, file_path=None):
+        if not self.up or object_name not in self.objects:
+            return False
+        with open(file_path, 'wb') as f:
+            f.write(self.objects[object_name])
+        return True
+
+    def delete_object(self, object_name):
+        if self.up:
+            self.objects.pop(object_name, None)
+        return self.up
+
+
+def start(socket_path, clients=None):
+    server = JobServer(clients or {'S0': FakeClient('S0')}, str(socket_path), workers=2)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(server.serve_forever()), daemon=True)
+    thread.start()
+    for _ in range(200):
+        if not thread.is_alive() or server._server is not None and os.path.exists(socket_path):
+            break
+        time.sleep(0.01)
+    return server, thread, results
+
+
+def stop(socket_path, thread):
+    assert request({'op': 'shutdown'}, str(socket_path), timeout=5) == {'ok': True, 'result': {'stopping': True}}
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return tmp_path / "d.sock"
+
+
+def test_socket_is_private(socket_path):
+    umask = os.umask(0o022)
+    try:
+        _, thread, _ = start(socket_path)
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) & 0o077 == 0
+        # The daemon's own umask is restored after bind
+        assert os.umask(0o022) == 0o022
+        stop(socket_path, thread)
+    finally:
+        os.umask(umask)
+
+
+def test_second_daemon_does_not_take_over_a_live_socket(socket_path, capsys):
+    _, thread, _ = start(socket_path)
+    try:
+        other, other_thread, results = start(socket_path)
+        other_thread.join(timeout=10)
+        assert results == [False] and other._server is None
+        assert "already listening" in capsys.readouterr().out
+        assert request({'op': 'ping'}, str(socket_path), timeout=5)['ok']
+    finally:
+        stop(socket_path, thread)
+
+
+def test_stale_socket_is_replaced(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(socket_path))
+    assert os.path.exists(socket_path)
+    _, thread, results = start(socket_path)
+    assert request({'op': 'ping'}, str(socket_path), timeout=5) == {'ok': True, 'result': {'pong': True}}
+    stop(socket_path, thread)
+    assert results == [True]
+    assert not os.path.exists(socket_path)
+
+
+
+def exchange(socket_path, lines):
+    """Send several lines on one connection and read one response per job."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(str(socket_path))
+        sock.sendall(b"".join(line + b"\n" for line in lines))
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile('rb') as responses:
+            return [json.loads(line) for line in responses]
+
+
+def test_jobs_on_one_connection(socket_path):
+    clients = {'S0': FakeClient('S0'), 'S1': FakeClient('S1')}
+    _, thread, _ = start(socket_path, clients)
+    try:
+        responses = exchange(socket_path, [b'{"op": "ping"}', b'not json', b'{"op": "format"}', b'',
+                                           b'{"op": "wait", "object": "a"}', b'{"op": "stats"}'])
+    finally:
+        stop(socket_path, thread)
+    assert len(responses) == 5
+    assert responses[0] == {'ok': True, 'result': {'pong': True}}
+    assert not responses[1]['ok'] and responses[1]['error'].startswith("Invalid JSON")
+    assert responses[2] == {'ok': False, 'error': "Unknown operation 'format'"}
+    assert responses[3] == {'ok': False, 'error': "The daemon does not run in async replication mode"}
+    stats = responses[4]['result']
+    assert stats['jobs'] == 2 and stats['failed'] == 1
+    assert stats['servers'] == {'S0': 'closed', 'S1': 'closed'}
+
+
+def test_upload_download_and_delete_through_the_daemon(socket_path, tmp_path):
+    clients = {'S0': FakeClient('S0'), 'S1': FakeClient('S1', up=False)}
+    hints = HintQueue(':memory:')
+    tombstones = Tombstones(':memory:')
+    server = JobServer(clients, str(socket_path), hints=hints, tombstones=tombstones)
+    source = tmp_path / "a.csv"
+    source.write_bytes(b"a,b\n")
+
+    response = server.handle({'op': 'upload', 'file': str(source), 'object': 'reports/a.csv'})
+    assert response['ok'] is False
+    assert response['result']['servers'] == {'S0': True, 'S1': False}
+    assert hints.pending('reports/a.csv') == 1
+
+    response = server.handle({'op': 'download', 'object': 'reports/a.csv', 'file': str(tmp_path / "b.csv")})
+    assert response['ok'] and (tmp_path / "b.csv").read_bytes() == b"a,b\n"
+
+    response = server.handle({'op': 'delete', 'object': 'reports/a.csv'})
+    assert response['result']['servers'] == {'S0': True, 'S1': False}
+    assert clients['S0'].objects == {}
+    assert hints.pending('reports/a.csv') == 0
+    assert tombstones.depth() == {'S1': 1}
+
+    response = server.handle({'op': 'upload'})
+    assert response['ok'] is False and "needs a file" in response['error']
+    assert server.stats == {'jobs': 4, 'failed': 3}
+    server.pool.shutdown()
@@ -0,0 +1,70 @@
+import io
+
+import pytest
+
+pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from minio_compression import META_CODEC
+from minio_dataframe import read_dataframe
+
+
+class Stat:
+    def __init__(self, data, metadata):
+        self.size = len(data)
+        self.etag = '"etag-1"'
+        self.metadata = metadata
+
+
+class FakeSDK:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def stat_object(self, bucket_name, object_name):
+        return Stat(self.owner.data, self.owner.metadata)
+
+
+class FakeClient:
+    endpoint = "fake:9000"
+    bucket_name = "bucket"
+
+    def __init__(self, data, metadata=None, readable=True):
+        self.client = FakeSDK(self)
+        self.data = data
+        self.metadata = metadata or {}
+        self.readable = readable
+
+    def _call(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    def download_range(self, object_name, offset, length):
+        return self.data[offset:offset + length]
+
+    def download_data(self, object_name):
+        return self.data if self.readable else None
+
+
+def parquet_bytes(rows=1000):
+    table = pa.table({'id': list(range(rows)), 'name': [f"row-{i}" for i in range(rows)]})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=rows // 4)
+    return buffer.getvalue()
+
+
+def test_parquet_read_passes_pyarrow_options_through():
+    client = FakeClient(parquet_bytes())
+    df = read_dataframe(client, "t.parquet", columns=['name'], filters=[('id', '<', 3)], use_threads=False)
+    assert df['name'].tolist() == ['row-0', 'row-1', 'row-2']
+
+
+def test_chunked_parquet_read_applies_filters():
+    client = FakeClient(parquet_bytes())
+    chunks = read_dataframe(client, "t.parquet", columns=['name'], chunksize=100, filters=[('id', '>=', 995)])
+    names = [name for chunk in chunks for name in chunk['name']]
+    assert names == [f"row-{i}" for i in range(995, 1000)]
+
+
+def test_failed_download_of_compressed_parquet_returns_none():
+    client = FakeClient(b"", metadata={f"x-amz-meta-{META_CODEC}": "gzip"}, readable=False)
+    assert read_dataframe(client, "t.parquet") is None
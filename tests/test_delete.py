@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import urllib3
+
+from minio_retry import CircuitBreaker
+from minio_handoff import HintQueue, Tombstones, apply_tombstone
+from minio_multi_server import delete_from_all_servers
+
+
+class Entry:
+    def __init__(self, object_name, last_modified):
+        self.object_name = object_name
+        self.last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+
+
+class FakeClient:
+    endpoint = "fake:9000"
+
+    def __init__(self, name, keys=(), up=True, modified=100.0):
+        self.breaker = CircuitBreaker(name)
+        self.keys = set(keys)
+        self.up = up
+        self.modified = modified
+
+    def scan_objects(self, prefix="", workers=16, sort=False):
+        if not self.up:
+            raise urllib3.exceptions.MaxRetryError(None, "/", "connection refused")
+        return iter([Entry(key, self.modified) for key in sorted(self.keys) if key.startswith(prefix)])
+
+    def delete_objects(self, object_names):
+        names = [name for name in object_names if name in self.keys]
+        self.keys.difference_update(names)
+        return len(names), []
+
+
+def test_server_down_at_startup_gets_a_tombstone():
+    clients = {'S0': FakeClient('S0', ['a']), 'S1': FakeClient('S1', ['a'])}
+    # What initialize_clients(keep_unreachable=True) leaves for a server it could not reach
+    clients['S1'].breaker.trip()
+    hints = HintQueue(':memory:')
+    tombstones = Tombstones(':memory:')
+    hints.add('S1', 'a', None, ['S0'])
+
+    results = delete_from_all_servers(clients, 'a', tombstones=tombstones, hints=hints)
+
+    assert results == {'S0': 1, 'S1': None}
+    assert tombstones.depth() == {'S1': 1}
+    assert tombstones.deleted_at('a') is not None
+    assert hints.pending('a') == 0
+
+
+def test_prefix_tombstone_covers_keys_under_it():
+    tombstones = Tombstones(':memory:')
+    tombstones.add('S1', 'logs/', prefix=True, deleted=100.0)
+    assert tombstones.deleted_at('logs/2024/a.gz') == 100.0
+    assert tombstones.deleted_at('other/a.gz') is None
+
+
+def test_prefix_delete_lists_each_server():
+    keys = ['logs/a', 'logs/b', 'other/c']
+    clients = {'S0': FakeClient('S0', keys), 'S1': FakeClient('S1', keys, up=False)}
+    tombstones = Tombstones(':memory:')
+
+    results = delete_from_all_servers(clients, 'logs/', prefix=True, tombstones=tombstones)
+
+    assert results == {'S0': 2, 'S1': None}
+    assert clients['S0'].keys == {'other/c'}
+    assert tombstones.depth() == {'S1': 1}
+
+
+def test_prefix_tombstone_spares_newer_objects():
+    tombstone = {'key': 'logs/', 'prefix': True, 'deleted': 150.0}
+    old = FakeClient('S0', ['logs/a', 'other/c'], modified=100.0)
+    assert apply_tombstone(old, tombstone)
+    assert old.keys == {'other/c'}
+
+    new = FakeClient('S1', ['logs/a'], modified=200.0)
+    assert apply_tombstone(new, tombstone)
+    assert new.keys == {'logs/a'}
+    assert not apply_tombstone(FakeClient('S2', ['logs/a'], up=False), tombstone)
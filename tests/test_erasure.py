@@ -0,0 +1,73 @@
+import itertools
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from minio_erasure import (ReedSolomon, gf_inv, gf_mul, get_erasure_coded,  # noqa: E402
+                           put_erasure_coded, shard_name)
+
+SETTINGS = [(1, 0), (1, 2), (2, 1), (3, 2), (4, 2), (5, 3)]
+
+
+def payloads(k):
+    return [b"", b"x", os.urandom(k - 1), os.urandom(k), os.urandom(1000), os.urandom(4097)]
+
+
+def encode_all(codec, data):
+    data_shards = codec.split(data)
+    return dict(enumerate(np.concatenate([data_shards, codec.encode(data_shards)])))
+
+
+def test_gf_inverse():
+    for a in range(1, 256):
+        assert gf_mul(a, gf_inv(a)) == 1
+
+
+@pytest.mark.parametrize("k, m", SETTINGS)
+def test_decode_survives_losing_up_to_m_shards(k, m):
+    codec = ReedSolomon(k, m)
+    for data in payloads(k):
+        shards = encode_all(codec, data)
+        for lost in range(m + 1):
+            for dropped in itertools.combinations(shards, lost):
+                remaining = {i: s for i, s in shards.items() if i not in dropped}
+                assert codec.decode(remaining).tobytes()[:len(data)] == data, (k, m, len(data), dropped)
+
+
+@pytest.mark.parametrize("k, m", SETTINGS)
+def test_losing_more_than_m_shards_is_an_error(k, m):
+    codec = ReedSolomon(k, m)
+    shards = encode_all(codec, os.urandom(1000))
+    for dropped in itertools.combinations(shards, m + 1):
+        remaining = {i: s for i, s in shards.items() if i not in dropped}
+        with pytest.raises(ValueError):
+            codec.decode(remaining)
+
+
+class FakeClient:
+    def __init__(self):
+        self.objects = {}
+
+    def upload_data(self, data, object_name, content_type="application/octet-stream"):
+        self.objects[object_name] = data
+        return True
+
+    def download_data(self, object_name):
+        return self.objects.get(object_name)
+
+
+def test_object_is_rebuilt_from_parity_and_lost_beyond_m():
+    clients = {f"S{i}": FakeClient() for i in range(5)}
+    data = os.urandom(10000)
+    manifest = put_erasure_coded(clients, data, "obj", k=3, m=2)
+    assert manifest['ok']
+
+    by_index = {entry['index']: clients[entry['server']] for entry in manifest['shards']}
+    del by_index[0].objects[shard_name("obj", 0)]
+    by_index[4].objects[shard_name("obj", 4)] = b"corrupt"
+    assert get_erasure_coded(clients, "obj", manifest) == data
+
+    del by_index[1].objects[shard_name("obj", 1)]
+    assert get_erasure_coded(clients, "obj", manifest) is None
@@ -0,0 +1,88 @@
+import os
+
+from minio_retry import CircuitBreaker
+from minio_handoff import HintQueue, HintReplayer, Tombstones
+from minio_multi_server import initialize_clients, upload_to_all_servers
+
+
+class FakeClient:
+    def __init__(self, name, up=True):
+        self.breaker = CircuitBreaker(name)
+        self.up = up
+        self.objects = {}
+
+    def upload_file(self, file_path, object_name=None, compress=None):
+        if not self.up or not self.breaker.allow():
+            return False
+        with open(file_path, 'rb') as f:
+            self.objects[object_name] = f.read()
+        return True
+
+    def copy_to(self, target, object_name):
+        if not target.up or object_name not in self.objects:
+            return False
+        target.objects[object_name] = self.objects[object_name]
+        return True
+
+
+def test_unreachable_server_is_kept_with_an_open_circuit():
+    config = {'endpoint': '127.0.0.1:9', 'access_key': 'a', 'secret_key': 'b', 'secure': False,
+              'bucket_name': 'bucket', 'max_attempts': 1, 'connect_timeout': 0.5, 'read_timeout': 0.5}
+    assert initialize_clients({'down': dict(config)}) == {}
+
+    clients = initialize_clients({'down': dict(config)}, keep_unreachable=True)
+    assert clients['down'].breaker.state == CircuitBreaker.OPEN
+
+
+def test_failed_write_is_handed_off_and_replayed(tmp_path):
+    source = tmp_path / "a.csv"
+    source.write_bytes(b"a,b\n1,2\n")
+    clients = {'S0': FakeClient('S0'), 'S1': FakeClient('S1', up=False)}
+    hints = HintQueue(str(tmp_path / "hints.sqlite"))
+
+    results = upload_to_all_servers(clients, str(source), 'a.csv', hints=hints)
+    assert results == {'S0': True, 'S1': False}
+    assert hints.depth()['S1']['hints'] == 1
+
+    # The queue survives a restart
+    hints.close()
+    hints = HintQueue(str(tmp_path / "hints.sqlite"))
+    clients['S1'].up = True
+    replayer = HintReplayer(hints, clients)
+    assert replayer.replay_due() == 1
+    assert clients['S1'].objects['a.csv'] == b"a,b\n1,2\n"
+    assert hints.pending() == 0
+
+
+def test_replay_copies_from_a_replica_when_the_file_changed(tmp_path):
+    source = tmp_path / "a.csv"
+    source.write_bytes(b"old")
+    clients = {'S0': FakeClient('S0'), 'S1': FakeClient('S1', up=False)}
+    hints = HintQueue(':memory:')
+    upload_to_all_servers(clients, str(source), 'a.csv', hints=hints)
+
+    source.write_bytes(b"changed")
+    clients['S1'].up = True
+    HintReplayer(hints, clients).replay_due()
+    assert clients['S1'].objects['a.csv'] == b"old"
+
+
+def test_full_queue_refuses_new_hints():
+    hints = HintQueue(':memory:', max_hints=1)
+    assert hints.add('S1', 'a', None, ['S0'])
+    assert not hints.add('S1', 'b', None, ['S0'])
+    # Replacing an existing hint is always possible
+    assert hints.add('S1', 'a', None, ['S0'])
+
+
+def test_tombstones_and_hints_for_removed_servers_are_dropped():
+    clients = {'S0': FakeClient('S0')}
+    hints = HintQueue(':memory:')
+    tombstones = Tombstones(':memory:')
+    hints.add('gone', 'a', None, ['S0'])
+    tombstones.add('gone', 'b', deleted=100.0)
+
+    replayer = HintReplayer(hints, clients, tombstones=tombstones)
+    assert replayer.replay_due() == 2
+    assert replayer.stats['dropped'] == 2
+    assert hints.pending() == 0 and tombstones.depth() == {}
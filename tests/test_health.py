@@ -0,0 +1,19 @@
+from minio_health import HealthMonitor
+from minio_retry import RetryPolicy
+from minio_wrapper import MinioWrapper
+
+
+def test_failed_requests_count_against_server_health():
+    client = MinioWrapper("127.0.0.1:9", "a", "b", False, "bucket", retry_policy=RetryPolicy(max_attempts=1),
+                          connect_timeout=0.5, read_timeout=0.5, check_bucket=False)
+    monitor = HealthMonitor({'S0': client}, interval=3600, timeout=0.5, unhealthy_threshold=3).start()
+    try:
+        assert monitor.snapshot()['S0']['consecutive_failures'] == 1
+        assert monitor.is_healthy('S0')
+        client.list_objects()
+        client.list_objects()
+        assert monitor.snapshot()['S0']['consecutive_failures'] == 3
+        assert not monitor.is_healthy('S0')
+    finally:
+        monitor.stop()
+    assert client.health_observer is None
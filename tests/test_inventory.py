@@ -0,0 +1,105 @@
+import time
+
+from minio.helpers import ObjectWriteResult
+
+import minio_inventory
+from minio_inventory import Inventory
+from minio_retry import RetryPolicy
+from minio_wrapper import MinioWrapper
+from test_listing import FakeListingClient
+
+
+def wrapper(keys):
+    client = MinioWrapper("127.0.0.1:9", "a", "b", False, "bucket", retry_policy=RetryPolicy(max_attempts=1),
+                          check_bucket=False)
+    client.client = FakeListingClient(keys)
+    return client
+
+
+class FakeSDK:
+    def put_object(self, bucket_name, object_name, data, length, **kwargs):
+        return ObjectWriteResult(bucket_name, object_name, None, '"etag"', {})
+
+    def remove_object(self, bucket_name, object_name):
+        pass
+
+
+def keys_of(inventory):
+    return [entry['key'] for entry in inventory.find()]
+
+
+def test_own_uploads_do_not_hide_keys_added_by_others():
+    client = wrapper(["logs/a", "logs/b"])
+    inventory = Inventory(':memory:')
+    assert inventory.refresh(client) == 2
+
+    # Written through by this client: far above anything listed so far
+    inventory.record_put("zz/mine", 10)
+    client.client.keys = sorted(client.client.keys + ["logs/c", "zz/mine"])
+    assert inventory.refresh(client) == 2
+    assert keys_of(inventory) == ["logs/a", "logs/b", "logs/c", "zz/mine"]
+
+    client.client.requests = 0
+    assert inventory.refresh(client) == 0
+    assert client.client.requests == 1
+
+
+def test_full_refresh_drops_deleted_keys_but_keeps_new_writes():
+    client = wrapper([f"logs/{i}" for i in range(10)])
+    inventory = Inventory(':memory:')
+    assert inventory.refresh(client, workers=4) == 10
+
+    client.client.keys = [key for key in client.client.keys if key != "logs/3"]
+    inventory.record_put("logs/old", 5)
+    scan = client.scan_objects
+
+    def scan_while_writing(*args, **kwargs):
+        for count, obj in enumerate(scan(*args, **kwargs)):
+            if count == 1:
+                inventory.record_put("logs/new", 5)
+            yield obj
+
+    client.scan_objects = scan_while_writing
+    assert inventory.refresh(client, full=True, workers=4) == 9
+    assert "logs/3" not in inventory and "logs/old" not in inventory
+    # Written through while the scan ran, so the listing may simply have missed it
+    assert "logs/new" in inventory
+
+
+def test_max_age_forces_a_full_refresh(monkeypatch):
+    client = wrapper(["a", "b"])
+    inventory = Inventory(':memory:')
+    inventory.refresh(client)
+    client.client.keys = ["b"]
+    inventory.refresh(client)
+    assert "a" in inventory
+
+    clock = [time.time() + 3600]
+    monkeypatch.setattr(minio_inventory.time, "time", lambda: clock[0])
+    inventory.refresh(client, max_age=60)
+    assert keys_of(inventory) == ["b"]
+
+
+def test_write_through_from_the_wrapper(tmp_path):
+    inventory = Inventory(str(tmp_path / "inventory.sqlite"))
+    client = wrapper([])
+    client.inventory = inventory
+    client.client = FakeSDK()
+    assert client.upload_data(b"12345", "reports/a.csv")
+    assert inventory.get("reports/a.csv")['size'] == 5 and inventory.get("reports/a.csv")['etag'] == "etag"
+    assert client.delete_object("reports/a.csv")
+    assert "reports/a.csv" not in inventory
+
+
+def test_queries():
+    inventory = Inventory(':memory:')
+    for key, size in [("logs/2024/a.gz", 100), ("logs/2024/b.txt", 10), ("logs/2023/c.gz", 1000),
+                      ("logs0", 1), ("data/d.gz", 50)]:
+        inventory.record_put(key, size, mtime=1000.0)
+    assert [entry['key'] for entry in inventory.find("logs/")] == ["logs/2023/c.gz", "logs/2024/a.gz",
+                                                                    "logs/2024/b.txt"]
+    assert [entry['key'] for entry in inventory.find(pattern="*.gz", min_size=60)] == ["logs/2023/c.gz",
+                                                                                      "logs/2024/a.gz"]
+    assert [entry['key'] for entry in inventory.find(max_size=10, limit=1)] == ["logs/2024/b.txt"]
+    assert inventory.summary("logs/")['count'] == 3
+    assert inventory.summary("logs/")['total_bytes'] == 1110
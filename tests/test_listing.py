@@ -0,0 +1,97 @@
+from xml.sax.saxutils import escape
+
+from minio_listing import list_objects_parallel, list_pages, CommonPrefix
+
+NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeListingClient:
+    """Answers ListObjectsV2 requests from a fixed set of keys, like S3 does."""
+
+    def __init__(self, keys, max_keys=3):
+        self.keys = sorted(keys)
+        self.max_keys = max_keys
+        self.requests = 0
+
+    def _execute(self, method, bucket_name, query_params=None):
+        self.requests += 1
+        assert self.requests < 1000, "listing does not terminate"
+        query = query_params or {}
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter", "")
+        after = query.get("continuation-token") or query.get("start-after") or ""
+
+        contents, prefixes = [], []
+        entries = []
+        for key in self.keys:
+            if not key.startswith(prefix) or key <= after:
+                continue
+            rest = key[len(prefix):]
+            if delimiter and delimiter in rest:
+                common = prefix + rest[:rest.index(delimiter) + 1]
+                if common <= after or (entries and entries[-1] == common):
+                    continue
+                entries.append(common)
+                prefixes.append(common)
+            else:
+                entries.append(key)
+                contents.append(key)
+            if len(entries) == self.max_keys:
+                break
+        truncated = len(entries) == self.max_keys and entries[-1] != self._last(prefix, delimiter)
+
+        body = [f'<ListBucketResult xmlns="{NS}"><Name>{bucket_name}</Name>',
+                f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>"]
+        if truncated:
+            body.append(f"<NextContinuationToken>{escape(self._skip(entries[-1], prefixes))}</NextContinuationToken>")
+        for key in contents:
+            body.append(f"<Contents><Key>{escape(key)}</Key><LastModified>2024-01-01T00:00:00.000Z</LastModified>"
+                        f"<ETag>\"e\"</ETag><Size>1</Size></Contents>")
+        for common in prefixes:
+            body.append(f"<CommonPrefixes><Prefix>{escape(common)}</Prefix></CommonPrefixes>")
+        body.append("</ListBucketResult>")
+        return _Response("".join(body).encode())
+
+    @staticmethod
+    def _skip(last, prefixes):
+        # After a common prefix, continue behind every key under it
+        return last + "\U0010ffff" if last in prefixes else last
+
+    def _last(self, prefix, delimiter):
+        last = None
+        for key in self.keys:
+            if key.startswith(prefix):
+                rest = key[len(prefix):]
+                entry = prefix + rest[:rest.index(delimiter) + 1] if delimiter and delimiter in rest else key
+                last = entry if last is None or entry > last else last
+        return last
+
+
+KEYS = ["folder1/", "folder1/subfolder/", "folder1/subfolder/c.txt", "folder1/a.txt", "folder1/b.txt",
+        "folder2/", "root.txt", "zeta/deep/x/y.txt"]
+
+
+def test_list_pages_separates_prefixes_from_marker_objects():
+    client = FakeListingClient(KEYS, max_keys=1000)
+    page = next(list_pages(client, "bucket", "folder1/", delimiter="/"))
+    markers = [entry.object_name for entry in page if not isinstance(entry, CommonPrefix)]
+    prefixes = [entry.object_name for entry in page if isinstance(entry, CommonPrefix)]
+    assert markers == ["folder1/", "folder1/a.txt", "folder1/b.txt"]
+    assert prefixes == ["folder1/subfolder/"]
+
+
+def test_parallel_listing_yields_folder_markers_once():
+    client = FakeListingClient(KEYS)
+    names = [obj.object_name for obj in list_objects_parallel(client, "bucket", workers=4, splits=4, sort=True)]
+    assert names == sorted(KEYS)
+
+
+def test_parallel_listing_under_prefix():
+    client = FakeListingClient(KEYS)
+    names = [obj.object_name for obj in list_objects_parallel(client, "bucket", "folder1/", workers=2, sort=True)]
+    assert names == sorted(key for key in KEYS if key.startswith("folder1/"))
@@ -0,0 +1,72 @@
+import hashlib
+
+from minio_packs import PackWriter, PackReader
+
+
+class Stat:
+    def __init__(self, data):
+        self.etag = '"' + hashlib.md5(data).hexdigest() + '"'
+
+
+class FakeSDK:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def stat_object(self, bucket_name, object_name):
+        return Stat(self.objects[object_name])
+
+
+class FakeClient:
+    endpoint = "fake:9000"
+    bucket_name = "bucket"
+
+    def __init__(self):
+        self.objects = {}
+        self.client = FakeSDK(self.objects)
+        self.data_uploads = []
+
+    def _call(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    def upload_file(self, file_path, object_name=None, compress=None):
+        with open(file_path, 'rb') as f:
+            self.objects[object_name] = f.read()
+        return True
+
+    def upload_data(self, data, object_name, content_type="application/octet-stream", metadata=None,
+                    compress=None):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.data_uploads.append(object_name)
+        self.objects[object_name] = data
+        return True
+
+    def download_data(self, object_name):
+        return self.objects.get(object_name)
+
+    def download_range(self, object_name, offset, length):
+        return self.objects[object_name][offset:offset + length]
+
+
+def test_pack_is_uploaded_from_the_spool_file(tmp_path):
+    client = FakeClient()
+    with PackWriter(client, "p") as writer:
+        writer.add("a.txt", b"alpha")
+        writer.add("b.txt", b"beta")
+    assert client.objects["packs/p.pack"] == b"alphabeta"
+    assert client.data_uploads == ["packs/p.idx"]
+    assert PackReader(client, "p", cache_dir=str(tmp_path)).read("b.txt") == b"beta"
+
+
+def test_rewritten_pack_is_not_read_through_a_stale_cached_index(tmp_path):
+    client = FakeClient()
+    with PackWriter(client, "p") as writer:
+        writer.add("a.txt", b"alpha")
+    assert PackReader(client, "p", cache_dir=str(tmp_path)).read("a.txt") == b"alpha"
+
+    with PackWriter(client, "p") as writer:
+        writer.add("z.txt", b"zulu")
+        writer.add("a.txt", b"ALPHA!")
+    reader = PackReader(client, "p", cache_dir=str(tmp_path))
+    assert reader.names() == ["z.txt", "a.txt"]
+    assert reader.read("a.txt") == b"ALPHA!"
@@ -0,0 +1,95 @@
+import io
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from minio_parquet import ParquetObjectReader, _PrefetchedFile
+
+
+class Stat:
+    def __init__(self, data):
+        self.size = len(data)
+        self.etag = '"etag-1"'
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeSDK:
+    def __init__(self, data):
+        self.data = data
+
+    def stat_object(self, bucket_name, object_name):
+        return Stat(self.data)
+
+    def get_object(self, bucket_name, object_name, request_headers=None):
+        length = int(request_headers['Range'][len('bytes=-'):])
+        return Response(self.data[-length:])
+
+
+class FakeClient:
+    endpoint = "fake:9000"
+    bucket_name = "bucket"
+
+    def __init__(self, data):
+        self.client = FakeSDK(data)
+        self.data = data
+        self.ranges = []
+
+    def _call(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    def _stream(self, response):
+        return iter([response.data])
+
+    def download_range(self, object_name, offset, length):
+        self.ranges.append((offset, offset + length))
+        return self.data[offset:offset + length]
+
+
+def parquet_bytes(rows=20000):
+    table = pa.table({'id': list(range(rows)), 'name': [f"row-{i}" for i in range(rows)]})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=rows // 4)
+    return buffer.getvalue()
+
+
+def test_cached_tail_opens_without_ranged_gets(tmp_path):
+    data = parquet_bytes()
+    first = ParquetObjectReader(FakeClient(data), "t.parquet", cache_dir=str(tmp_path))
+    assert first.requests == 1
+
+    client = FakeClient(data)
+    second = ParquetObjectReader(client, "t.parquet", cache_dir=str(tmp_path))
+    assert second.requests == 0 and client.ranges == []
+    table = second.read(columns=['id'], filters=[('id', '>=', 15000)])
+    assert table.column('id').to_pylist() == list(range(15000, 20000))
+
+
+def test_partially_prefetched_reads_fetch_only_the_gaps():
+    data = bytes(range(256)) * 4
+    client = FakeClient(data)
+
+    class Reader:
+        size = len(data)
+        object_name = "blob"
+
+        def _fetch(self, start, end):
+            return client.download_range(self.object_name, start, end - start)
+
+    f = _PrefetchedFile(Reader())
+    f.add(100, data[100:200])
+    f.add(300, data[300:400])
+    f.seek(50)
+    assert f.read(400) == data[50:450]
+    assert client.ranges == [(50, 100), (200, 300), (400, 450)]
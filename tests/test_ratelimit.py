@@ -0,0 +1,169 @@
+import io
+import threading
+import time
+
+import pytest
+from minio import Minio
+from minio.helpers import ObjectWriteResult
+
+import minio_ratelimit
+from minio_ratelimit import RateLimiter, TokenBucket, parse_rate
+from minio_retry import RetryPolicy
+from minio_wrapper import MinioWrapper
+
+MiB = 1024 ** 2
+
+
+class Clock:
+    """Stand-in for the time module: monotonic() only moves on sleep() and advance()."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(minio_ratelimit, "time", clock)
+    return clock
+
+
+def test_burst_then_steady_rate(clock):
+    bucket = TokenBucket(10)
+    bucket.acquire(10)
+    assert clock.slept == 0
+    bucket.acquire(5)
+    assert clock.slept == pytest.approx(0.5)
+    for _ in range(20):
+        bucket.acquire(1)
+    assert clock.slept == pytest.approx(2.5)
+
+
+def test_idle_time_refills_only_up_to_the_burst(clock):
+    bucket = TokenBucket(10, burst=20)
+    bucket.acquire(20)
+    clock.advance(60)
+    bucket.acquire(20)
+    assert clock.slept == 0
+    bucket.acquire(20)
+    assert clock.slept == pytest.approx(2.0)
+
+
+def test_large_acquire_is_taken_in_pieces(clock, monkeypatch):
+    bucket = TokenBucket(10)
+    reserved = []
+    reserve = bucket._reserve
+    monkeypatch.setattr(bucket, "_reserve", lambda amount: reserved.append(amount) or reserve(amount))
+    bucket.acquire(25)
+    assert reserved == [10, 10, 5]
+    assert clock.slept == pytest.approx(1.5)
+
+
+def test_parent_is_charged_as_well(clock):
+    shared = RateLimiter(bytes_per_sec=100, requests_per_sec=2)
+    a = RateLimiter(bytes_per_sec=1000, parent=shared)
+    b = RateLimiter(parent=shared)
+    a.throttle_bytes(100)
+    b.throttle_bytes(100)
+    assert clock.slept == pytest.approx(1.0)
+    for _ in range(4):
+        b.throttle_request()
+    assert clock.slept == pytest.approx(2.0)
+
+
+def test_throttled_reader_charges_every_chunk(clock):
+    limiter = RateLimiter(bytes_per_sec=1000)
+    data = bytes(range(256)) * 20
+    reader = limiter.wrap_reader(io.BytesIO(data), chunk_size=100)
+    assert b"".join(iter(lambda: reader.read(300), b"")) == data
+    assert clock.slept == pytest.approx((len(data) - 1000) / 1000)
+
+
+class CountingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(requests_per_sec=1000)
+        self.charged = 0
+
+    def throttle_request(self):
+        self.charged += 1
+        super().throttle_request()
+
+
+class PartCountingMinio(Minio):
+    """The real SDK upload loop, with the HTTP requests replaced by counters."""
+
+    def __init__(self):
+        super().__init__("127.0.0.1:9", "a", "b", secure=False)
+        self.parts = []
+
+    def _put_object(self, bucket_name, object_name, data, headers, query_params=None):
+        self.parts.append(len(data))
+        return ObjectWriteResult(bucket_name, object_name, None, '"etag"', {})
+
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        return "upload"
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        self.parts.append(len(data))
+        return '"etag"'
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        return ObjectWriteResult(bucket_name, object_name, None, '"etag"', {})
+
+
+def test_throttled_reader_charges_a_request_per_part(clock):
+    limiter = CountingLimiter()
+    reader = limiter.wrap_reader(io.BytesIO(bytes(25)), chunk_size=4, part_size=10)
+    assert reader.read(10) == bytes(10) and limiter.charged == 0
+    assert reader.read(1) == bytes(1) and limiter.charged == 1
+    reader.read()
+    assert limiter.charged == 2
+
+
+@pytest.mark.parametrize("size", [0, 3 * MiB, 5 * MiB, 10 * MiB, 12 * MiB])
+@pytest.mark.parametrize("method", ["upload_data", "upload_stream"])
+def test_multipart_uploads_take_a_request_per_part(clock, size, method):
+    limiter = CountingLimiter()
+    client = MinioWrapper("127.0.0.1:9", "a", "b", False, "bucket", retry_policy=RetryPolicy(max_attempts=1),
+                          rate_limiter=limiter, check_bucket=False)
+    client.client = PartCountingMinio()
+    if method == "upload_data":
+        assert client.upload_data(bytes(size), "data.bin")
+    else:
+        assert client.upload_stream(io.BytesIO(bytes(size)), "data.bin", part_size=5 * MiB)
+    assert sum(client.client.parts) == size
+    assert limiter.charged == len(client.client.parts)
+
+
+def test_threads_share_one_bucket():
+    bucket = TokenBucket(1000, burst=100)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire(10) for _ in range(20)]) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 600 tokens with 100 available up front take at least half a second at 1000/s
+    assert time.monotonic() - started >= 0.45
+
+
+@pytest.mark.parametrize("value, rate", [("500", 500.0), ("64k", 65536.0), ("10MiB/s", 10 * 1024 ** 2),
+                                         ("1.5G", 1.5 * 1024 ** 3), ("0", None), (None, None), (0, None)])
+def test_parse_rate(value, rate):
+    assert parse_rate(value) == rate
+
+
+def test_parse_rate_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_rate("fast")
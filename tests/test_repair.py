@@ -0,0 +1,30 @@
+import threading
+
+from minio_repair import ReadRepairer
+
+
+class BrokenSDK:
+    def stat_object(self, bucket_name, object_name):
+        raise RuntimeError("unexpected failure")
+
+
+class FakeClient:
+    bucket_name = "bucket"
+
+    def __init__(self):
+        self.client = BrokenSDK()
+
+    def _call(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def test_unexpected_error_does_not_stop_the_workers(capsys):
+    repairer = ReadRepairer({'S0': FakeClient(), 'S1': FakeClient()}, workers=1)
+    for name in ("a", "b", "c"):
+        assert repairer.submit(name, suspect=['S1'])
+    closer = threading.Thread(target=repairer.close, daemon=True)
+    closer.start()
+    closer.join(timeout=10)
+    assert not closer.is_alive()
+    assert repairer.stats['failed'] == 3
+    assert "Read repair of c failed" in capsys.readouterr().out
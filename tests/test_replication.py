@@ -0,0 +1,74 @@
+from minio_handoff import HintQueue
+from minio_replication import AsyncReplicator
+from test_handoff import FakeClient
+
+
+def servers(*down):
+    return {name: FakeClient(name, up=name not in down) for name in ('S0', 'S1', 'S2')}
+
+
+def test_write_returns_after_the_primary_and_drains_in_the_background(tmp_path):
+    source = tmp_path / "a.csv"
+    source.write_bytes(b"a,b\n")
+    clients = servers()
+    hints = HintQueue(':memory:')
+    replicator = AsyncReplicator(clients, hints, primary='S1', interval=0.05)
+
+    assert replicator.upload_file(str(source), 'a.csv') == ('S1', ['S0', 'S2'])
+    assert clients['S1'].objects == {'a.csv': b"a,b\n"}
+    assert clients['S0'].objects == {} and hints.pending('a.csv') == 2
+
+    replicator.start()
+    try:
+        assert replicator.wait_for_replication('a.csv', timeout=10)
+    finally:
+        replicator.stop()
+    assert all(client.objects == {'a.csv': b"a,b\n"} for client in clients.values())
+    snapshot = replicator.snapshot()
+    assert snapshot['replayed'] == 2 and snapshot['failed'] == 0
+    assert snapshot['lag']['max'] >= snapshot['lag']['last'] >= 0
+
+
+def test_failed_primary_falls_through_to_the_next_server(tmp_path):
+    source = tmp_path / "a.csv"
+    source.write_bytes(b"a,b\n")
+    clients = servers('S0')
+    replicator = AsyncReplicator(clients, HintQueue(':memory:'), primary='S0')
+    assert replicator.upload_file(str(source), 'a.csv') == ('S1', ['S0', 'S2'])
+    assert AsyncReplicator(servers('S0', 'S1', 'S2'), HintQueue(':memory:')).upload_file(str(source)) == (None, [])
+
+
+def test_copies_owed_to_a_down_server_wait_for_it(tmp_path):
+    source = tmp_path / "a.csv"
+    source.write_bytes(b"a,b\n")
+    clients = servers('S2')
+    hints = HintQueue(':memory:')
+    replicator = AsyncReplicator(clients, hints, primary='S0', interval=0.05).start()
+    try:
+        replicator.upload_file(str(source), 'a.csv')
+        assert not replicator.wait_for_replication('a.csv', timeout=0.5)
+        assert clients['S1'].objects == {'a.csv': b"a,b\n"}
+        assert hints.pending('a.csv') == 1
+
+        clients['S2'].up = True
+        assert replicator.wait_for_replication('a.csv', timeout=10)
+    finally:
+        replicator.stop()
+    assert clients['S2'].objects == {'a.csv': b"a,b\n"}
+
+
+def test_queue_survives_a_restart(tmp_path):
+    source = tmp_path / "a.csv"
+    source.write_bytes(b"a,b\n")
+    clients = servers()
+    hints = HintQueue(str(tmp_path / "hints.sqlite"))
+    AsyncReplicator(clients, hints, primary='S0').upload_file(str(source), 'a.csv')
+    hints.close()
+
+    hints = HintQueue(str(tmp_path / "hints.sqlite"))
+    replicator = AsyncReplicator(clients, hints, interval=0.05).start()
+    try:
+        assert replicator.wait_for_replication('a.csv', timeout=10)
+    finally:
+        replicator.stop()
+    assert all(client.objects == {'a.csv': b"a,b\n"} for client in clients.values())
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from minio_report import BucketReport
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+class Obj:
+    def __init__(self, object_name, size, age_days=0.0):
+        self.object_name = object_name
+        self.size = size
+        self.last_modified = NOW - timedelta(days=age_days) if age_days is not None else None
+
+
+OBJECTS = [
+    Obj("logs/2024/a.gz", 100, 0.5),
+    Obj("logs/2024/b.gz", 2000, 3),
+    Obj("logs/2023/c.gz", 70000, 200),
+    Obj("data/x.parquet", 5 * 1024 ** 2, 40),
+    Obj("data/y.parquet", 20 * 1024 ** 2, None),
+    Obj("readme.txt", 10, 1000),
+]
+
+
+def report(depth=1, top=3):
+    return BucketReport(depth, top, now=NOW).consume(iter(OBJECTS))
+
+
+def by_key(rows, key):
+    return {row[key]: (row['objects'], row['bytes']) for row in rows}
+
+
+def test_totals_and_prefixes():
+    summary = report().to_dict()
+    assert summary['objects'] == 6
+    assert summary['total_bytes'] == sum(obj.size for obj in OBJECTS)
+    assert by_key(summary['prefixes'], 'prefix') == {
+        'logs/': (3, 72100), 'data/': (2, 25 * 1024 ** 2), '(root)': (1, 10)}
+    # Biggest prefix first
+    assert summary['prefixes'][0]['prefix'] == 'data/'
+
+
+@pytest.mark.parametrize("depth, expected", [
+    (0, {'': 6}),
+    (2, {'logs/2024/': 2, 'logs/2023/': 1, 'data/': 2, '(root)': 1}),
+])
+def test_prefix_depth(depth, expected):
+    prefixes = by_key(report(depth).to_dict()['prefixes'], 'prefix')
+    assert {prefix: count for prefix, (count, _) in prefixes.items()} == expected
+
+
+def test_histograms():
+    summary = report().to_dict()
+    sizes = by_key(summary['size_histogram'], 'bucket')
+    assert sizes['< 1 KB'] == (2, 110)
+    assert sizes['1-64 KB'] == (1, 2000)
+    assert sizes['64 KB-1 MB'] == (1, 70000)
+    assert sizes['1-16 MB'] == (1, 5 * 1024 ** 2)
+    assert sizes['16-256 MB'] == (1, 20 * 1024 ** 2)
+    ages = by_key(summary['age_histogram'], 'bucket')
+    assert ages['< 1 day'] == (1, 100)
+    assert ages['1-7 days'] == (1, 2000)
+    assert ages['30-90 days'] == (1, 5 * 1024 ** 2)
+    assert ages['90-365 days'] == (1, 70000)
+    assert ages['>= 1 year'] == (1, 10)
+    # Objects without a modification time are left out of the age histogram only
+    assert sum(count for count, _ in ages.values()) == 5
+
+
+def test_largest_objects_are_kept_in_a_bounded_heap():
+    summary = report(top=2)
+    assert summary.largest() == [("data/y.parquet", 20 * 1024 ** 2), ("data/x.parquet", 5 * 1024 ** 2)]
+    assert len(summary._largest) == 2
+    assert report(top=0).largest() == []
+
+
+def test_formats_agree():
+    summary = report()
+    assert json.loads(summary.render('json')) == summary.to_dict()
+    rows = list(csv.reader(io.StringIO(summary.render('csv'))))
+    assert rows[1] == ['total', '', '6', str(summary.total_bytes)]
+    assert ['largest', 'data/y.parquet', '1', str(20 * 1024 ** 2)] in rows
+    table = summary.render('table')
+    assert table.startswith("6 objects") and "data/y.parquet" in table
+    with pytest.raises(ValueError):
+        summary.render('xml')
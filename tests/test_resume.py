@@ -0,0 +1,177 @@
+import os
+import socket
+
+import pytest
+import urllib3
+
+moto_server = pytest.importorskip("moto.server")
+
+from minio_wrapper import MinioWrapper
+from minio_checksum import ChecksumPolicy, MIN_PART_SIZE
+from minio_compression import CompressionPolicy, codec_from_metadata
+from minio_resume import download_file_resumable, upload_file_resumable
+from minio_retry import RetryPolicy
+
+PART_SIZE = MIN_PART_SIZE
+
+
+@pytest.fixture(scope="module")
+def endpoint():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = moto_server.ThreadedMotoServer(port=port, verbose=False)
+    server.start()
+    yield f"127.0.0.1:{port}"
+    server.stop()
+
+
+def wrapper(endpoint, bucket, **kwargs):
+    client = MinioWrapper(endpoint, 'a', 'b', False, bucket, **kwargs)
+    client.ensure_bucket()
+    return client
+
+
+def write(path, size):
+    data = os.urandom(size)
+    path.write_bytes(data)
+    return data
+
+
+def test_checksummed_resumable_upload_is_verified_on_download(endpoint, tmp_path):
+    client = wrapper(endpoint, 'resume-checksum', checksum=ChecksumPolicy('md5'))
+    data = write(tmp_path / "big.bin", 2 * PART_SIZE + 1000)
+    state_dir = str(tmp_path / "state")
+
+    assert upload_file_resumable(client, str(tmp_path / "big.bin"), "big.bin", PART_SIZE, state_dir)
+    assert client.client.stat_object('resume-checksum', 'big.bin').etag.endswith('-3')
+    assert client._verifier('big.bin', client.client.stat_object('resume-checksum', 'big.bin').metadata)
+
+    target = tmp_path / "out.bin"
+    assert download_file_resumable(client, "big.bin", str(target), PART_SIZE, state_dir)
+    assert target.read_bytes() == data
+    assert client.download_data("big.bin") == data
+
+
+def test_corrupt_resumable_download_starts_over(endpoint, tmp_path):
+    client = wrapper(endpoint, 'resume-corrupt', checksum=ChecksumPolicy('md5'))
+    write(tmp_path / "big.bin", PART_SIZE + 1000)
+    client.client.fput_object('resume-corrupt', 'big.bin', str(tmp_path / "big.bin"),
+                              metadata={'Checksum': 'md5:' + '0' * 32})
+    state_dir = tmp_path / "state"
+
+    target = tmp_path / "out.bin"
+    assert download_file_resumable(client, "big.bin", str(target), PART_SIZE, str(state_dir)) is False
+    assert not target.exists()
+    assert not (tmp_path / "out.bin.part.minio").exists()
+    assert os.listdir(state_dir) == []
+
+
+def test_compressed_resumable_upload_is_sent_in_one_pass(endpoint, tmp_path, capsys):
+    client = wrapper(endpoint, 'resume-compressed', compression=CompressionPolicy('gzip'))
+    data = b"".join(f"{i},row-{i}\n".encode() for i in range(700000))
+    (tmp_path / "big.csv").write_bytes(data)
+    assert len(data) > PART_SIZE
+    state_dir = str(tmp_path / "state")
+
+    assert upload_file_resumable(client, str(tmp_path / "big.csv"), "big.csv", PART_SIZE, state_dir)
+    assert "cannot be resumed" in capsys.readouterr().out
+    assert codec_from_metadata(client.client.stat_object('resume-compressed', 'big.csv').metadata) == 'gzip'
+
+    target = tmp_path / "out.csv"
+    assert download_file_resumable(client, "big.csv", str(target), PART_SIZE, state_dir)
+    assert target.read_bytes() == data
+
+
+class Interrupt:
+    """Wraps an SDK method so the calls picked by `fail` raise a connection error."""
+
+    def __init__(self, fn, fail):
+        self.fn = fn
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.fail(*args, **kwargs):
+            raise urllib3.exceptions.ProtocolError("connection reset")
+        return self.fn(*args, **kwargs)
+
+
+def test_interrupted_upload_resumes_with_the_missing_parts(endpoint, tmp_path):
+    client = wrapper(endpoint, 'resume-upload', retry_policy=RetryPolicy(max_attempts=1))
+    data = write(tmp_path / "big.bin", 3 * PART_SIZE + 1000)
+    state_dir = tmp_path / "state"
+    sdk_upload_part = client.client._upload_part
+
+    first = client.client._upload_part = Interrupt(sdk_upload_part, lambda *args: args[5] == 3)
+    assert not upload_file_resumable(client, str(tmp_path / "big.bin"), "big.bin", PART_SIZE, str(state_dir),
+                                     workers=1)
+    assert len(os.listdir(state_dir)) == 1
+
+    second = client.client._upload_part = Interrupt(sdk_upload_part, lambda *args: False)
+    assert upload_file_resumable(client, str(tmp_path / "big.bin"), "big.bin", PART_SIZE, str(state_dir),
+                                 workers=1)
+    # Every part is sent successfully exactly once across both attempts
+    sent = [args[5] for args, _ in first.calls if args[5] != 3] + [args[5] for args, _ in second.calls]
+    assert sorted(sent) == [1, 2, 3, 4]
+    assert os.listdir(state_dir) == []
+    assert client.download_data("big.bin") == data
+
+
+def test_changed_file_starts_a_new_upload(endpoint, tmp_path):
+    client = wrapper(endpoint, 'resume-changed', retry_policy=RetryPolicy(max_attempts=1))
+    write(tmp_path / "big.bin", 2 * PART_SIZE + 1000)
+    state_dir = str(tmp_path / "state")
+    sdk_upload_part = client.client._upload_part
+
+    client.client._upload_part = Interrupt(sdk_upload_part, lambda *args: args[5] == 2)
+    assert not upload_file_resumable(client, str(tmp_path / "big.bin"), "big.bin", PART_SIZE, state_dir, workers=1)
+
+    data = write(tmp_path / "big.bin", 2 * PART_SIZE + 2000)
+    client.client._upload_part = Interrupt(sdk_upload_part, lambda *args: False)
+    assert upload_file_resumable(client, str(tmp_path / "big.bin"), "big.bin", PART_SIZE, state_dir, workers=1)
+    assert [args[5] for args, _ in client.client._upload_part.calls] == [1, 2, 3]
+    assert client.download_data("big.bin") == data
+
+
+def test_interrupted_download_fetches_only_the_missing_ranges(endpoint, tmp_path):
+    client = wrapper(endpoint, 'resume-download', retry_policy=RetryPolicy(max_attempts=1))
+    chunk = 1024 * 1024
+    data = os.urandom(4 * chunk + 10)
+    client.upload_data(data, "big.bin")
+    state_dir = str(tmp_path / "state")
+    target = tmp_path / "out.bin"
+    sdk_get_object = client.client.get_object
+
+    first = client.client.get_object = Interrupt(sdk_get_object,
+                                                 lambda *args, offset=0, **kwargs: offset == 2 * chunk)
+    assert not download_file_resumable(client, "big.bin", str(target), chunk, state_dir, workers=1)
+    assert not target.exists() and (tmp_path / "out.bin.part.minio").exists()
+
+    second = client.client.get_object = Interrupt(sdk_get_object, lambda *args, **kwargs: False)
+    assert download_file_resumable(client, "big.bin", str(target), chunk, state_dir, workers=1)
+    # Every range is fetched successfully exactly once across both attempts
+    fetched = [kwargs['offset'] for _, kwargs in first.calls if kwargs['offset'] != 2 * chunk]
+    fetched += [kwargs['offset'] for _, kwargs in second.calls]
+    assert sorted(fetched) == [i * chunk for i in range(5)]
+    assert target.read_bytes() == data
+    assert not (tmp_path / "out.bin.part.minio").exists()
+
+
+def test_download_starts_over_when_the_object_changed(endpoint, tmp_path):
+    client = wrapper(endpoint, 'resume-replaced', retry_policy=RetryPolicy(max_attempts=1))
+    chunk = 1024 * 1024
+    client.upload_data(os.urandom(3 * chunk), "big.bin")
+    state_dir = str(tmp_path / "state")
+    target = tmp_path / "out.bin"
+    sdk_get_object = client.client.get_object
+
+    client.client.get_object = Interrupt(sdk_get_object, lambda *args, offset=0, **kwargs: offset == chunk)
+    assert not download_file_resumable(client, "big.bin", str(target), chunk, state_dir, workers=1)
+
+    data = os.urandom(3 * chunk + 5)
+    client.upload_data(data, "big.bin")
+    client.client.get_object = sdk_get_object
+    assert download_file_resumable(client, "big.bin", str(target), chunk, state_dir, workers=1)
+    assert target.read_bytes() == data
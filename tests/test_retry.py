@@ -0,0 +1,151 @@
+import pytest
+from minio.error import S3Error, ServerError
+
+import minio_retry
+from minio_retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+class Clock:
+    """Stand-in for the time module: monotonic() is moved by sleep() and advance()."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(minio_retry, "time", clock)
+    return clock
+
+
+def s3_error(code):
+    return S3Error(code, code, "/bucket/key", "request", "host", None)
+
+
+class Flaky:
+    """Raises the given errors in turn, then returns 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_delay_is_jittered_within_the_exponential_ceiling(monkeypatch):
+    policy = RetryPolicy(base_delay=0.5, max_delay=3.0, throttle_multiplier=4.0)
+    monkeypatch.setattr(minio_retry.random, "uniform", lambda low, high: high)
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    assert policy.delay(1, s3_error('SlowDown')) == 2.0
+    assert policy.delay(1, ServerError("unavailable", 503)) == 2.0
+    assert policy.delay(1, s3_error('InternalError')) == 0.5
+
+    monkeypatch.undo()
+    for attempt in range(1, 6):
+        ceiling = min(3.0, 0.5 * 2 ** (attempt - 1))
+        assert all(0 <= policy.delay(attempt) <= ceiling for _ in range(200))
+
+
+def test_retryable_errors_are_retried_until_success(clock):
+    fn = Flaky(s3_error('SlowDown'), ConnectionError("reset"))
+    assert RetryPolicy(max_attempts=3).call(fn) == "ok"
+    assert fn.calls == 3 and len(clock.sleeps) == 2
+
+
+def test_retries_stop_after_max_attempts(clock):
+    fn = Flaky(*[ServerError("bad gateway", 502)] * 5)
+    with pytest.raises(ServerError):
+        RetryPolicy(max_attempts=3).call(fn)
+    assert fn.calls == 3 and len(clock.sleeps) == 2
+
+
+@pytest.mark.parametrize("error", [s3_error('NoSuchKey'), s3_error('AccessDenied'), ValueError("bug"),
+                                   CircuitOpenError("S0", 1.0)])
+def test_non_retryable_errors_fail_immediately(clock, error):
+    fn = Flaky(error)
+    with pytest.raises(type(error)):
+        RetryPolicy(max_attempts=5).call(fn)
+    assert fn.calls == 1 and clock.sleeps == []
+
+
+def test_client_errors_do_not_count_against_the_breaker(clock):
+    breaker = CircuitBreaker("S0", failure_threshold=1)
+    with pytest.raises(S3Error):
+        RetryPolicy(max_attempts=1).call(Flaky(s3_error('NoSuchKey')), breaker=breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_probes_and_closes(clock):
+    breaker = CircuitBreaker("S0", failure_threshold=3, reset_timeout=30.0)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.advance(29.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.advance(1.0)
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.allow()
+
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker("S0", failure_threshold=3, reset_timeout=30.0)
+    breaker.trip()
+    clock.advance(30.0)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_only_one_probe_is_let_through_while_half_open(clock):
+    breaker = CircuitBreaker("S0", reset_timeout=30.0)
+    breaker.trip()
+    clock.advance(30.0)
+    breaker.check()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.check()
+
+    breaker.record_success()
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_policy_fails_fast_on_an_open_circuit(clock):
+    breaker = CircuitBreaker("S0", failure_threshold=2, reset_timeout=30.0)
+    fn = Flaky(*[ConnectionError("refused")] * 5)
+    with pytest.raises(ConnectionError):
+        RetryPolicy(max_attempts=2).call(fn, breaker=breaker)
+    with pytest.raises(CircuitOpenError):
+        RetryPolicy(max_attempts=2).call(fn, breaker=breaker)
+    assert fn.calls == 2
@@ -0,0 +1,60 @@
+import pytest
+import urllib3
+
+from minio_retry import CircuitBreaker
+from minio_sharding import HashRing, rebalance
+
+
+class Entry:
+    def __init__(self, object_name):
+        self.object_name = object_name
+
+
+class FakeClient:
+    def __init__(self, name, keys=(), up=True):
+        self.breaker = CircuitBreaker(name)
+        self.objects = set(keys)
+        self.up = up
+
+    def scan_objects(self, prefix="", workers=16, sort=False):
+        if not self.up:
+            raise urllib3.exceptions.MaxRetryError(None, "/", "connection refused")
+        return iter([Entry(name) for name in sorted(self.objects)])
+
+    def copy_to(self, target, object_name):
+        target.objects.add(object_name)
+        return True
+
+    def delete_object(self, object_name):
+        self.objects.discard(object_name)
+        return True
+
+
+def test_rebalance_drains_servers_off_the_ring():
+    keys = [f"key-{i}" for i in range(50)]
+    clients = {'S0': FakeClient('S0', keys), 'S1': FakeClient('S1')}
+    stats = rebalance(clients, HashRing({'S1': 1.0}))
+    assert stats['moved'] == 50 and stats['failed'] == 0
+    assert clients['S0'].objects == set() and clients['S1'].objects == set(keys)
+
+
+def test_rebalance_stops_when_a_server_cannot_be_listed():
+    keys = [f"key-{i}" for i in range(50)]
+    clients = {'S0': FakeClient('S0', keys), 'S1': FakeClient('S1', keys, up=False)}
+    with pytest.raises(urllib3.exceptions.MaxRetryError):
+        rebalance(clients, HashRing({'S0': 1.0, 'S1': 1.0}))
+    assert clients['S0'].objects == set(keys)
+
+    clients['S1'].up = True
+    clients['S1'].breaker.trip()
+    with pytest.raises(Exception, match="Circuit open"):
+        rebalance(clients, HashRing({'S0': 1.0, 'S1': 1.0}))
+
+
+def test_rebalance_leaves_a_half_open_breaker_probing():
+    clients = {'S0': FakeClient('S0', ['key'])}
+    clients['S0'].breaker.reset_timeout = 0.0
+    clients['S0'].breaker.trip()
+    rebalance(clients, HashRing({'S0': 1.0}))
+    assert clients['S0'].breaker.state == CircuitBreaker.HALF_OPEN
+    clients['S0'].breaker.before_call()
@@ -0,0 +1,33 @@
+import io
+import threading
+
+import pytest
+
+from minio_multi_server import upload_stream_to_all_servers
+
+
+class FakeClient:
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.received = b""
+
+    def upload_stream(self, source, object_name, content_type="application/octet-stream"):
+        for count, chunk in enumerate(source):
+            if self.fail_after is not None and count >= self.fail_after:
+                raise RuntimeError("unexpected failure")
+            self.received += chunk
+        return True
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_unexpected_error_in_one_server_does_not_block_the_others():
+    data = bytes(range(256)) * 64
+    clients = {'S0': FakeClient(), 'S1': FakeClient(fail_after=2)}
+    results = {}
+    worker = threading.Thread(target=lambda: results.update(
+        upload_stream_to_all_servers(clients, io.BytesIO(data), "obj", chunk_size=256, buffer_chunks=1)), daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive()
+    assert results == {'S0': True, 'S1': False}
+    assert clients['S0'].received == data
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import minio_table
+from minio_retry import RetryPolicy
+from minio_table import objects_table
+from minio_wrapper import MinioWrapper
+from test_listing import FakeListingClient
+
+START = datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+class Obj:
+    def __init__(self, index):
+        self.object_name = f"key-{index:02d}"
+        self.size = index * 10
+        self.etag = f'"etag-{index}"'
+        self.last_modified = START + timedelta(hours=index) if index % 3 else None
+
+
+OBJECTS = [Obj(i) for i in range(7)]
+
+
+def check(df):
+    assert list(df.columns) == ['key', 'size', 'etag', 'last_modified']
+    assert list(df['key']) == [obj.object_name for obj in OBJECTS]
+    assert df['size'].dtype == 'int64' and list(df['size']) == [obj.size for obj in OBJECTS]
+    assert list(df['etag']) == [f"etag-{i}" for i in range(7)]
+    for obj, mtime in zip(OBJECTS, df['last_modified']):
+        assert (pd.isna(mtime) and obj.last_modified is None) or mtime == pd.Timestamp(obj.last_modified)
+    # Vectorized filtering works on the columns directly
+    assert list(df[df['size'] >= 40]['key']) == ["key-04", "key-05", "key-06"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 100])
+def test_pandas_table_across_chunk_boundaries(chunk_size):
+    check(objects_table(iter(OBJECTS), chunk_size=chunk_size))
+
+
+def test_pandas_table_without_pyarrow(monkeypatch):
+    monkeypatch.setattr(minio_table, "pa", None)
+    check(objects_table(iter(OBJECTS), chunk_size=3))
+    with pytest.raises(ImportError):
+        objects_table(iter(OBJECTS), backend='arrow')
+
+
+def test_arrow_table():
+    pytest.importorskip("pyarrow")
+    table = objects_table(iter(OBJECTS), backend='arrow', chunk_size=3)
+    assert table.num_rows == 7
+    assert table.column('last_modified').null_count == 3
+    check(table.to_pandas())
+
+
+@pytest.mark.parametrize("pyarrow", [True, False])
+def test_empty_listing(monkeypatch, pyarrow):
+    if not pyarrow:
+        monkeypatch.setattr(minio_table, "pa", None)
+    df = objects_table(iter([]))
+    assert len(df) == 0 and list(df.columns) == ['key', 'size', 'etag', 'last_modified']
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        objects_table(iter(OBJECTS), backend='polars')
+
+
+def test_wrapper_lists_into_a_table():
+    client = MinioWrapper("127.0.0.1:9", "a", "b", False, "bucket", retry_policy=RetryPolicy(max_attempts=1),
+                          check_bucket=False)
+    client.client = FakeListingClient([f"logs/{i:03d}" for i in range(50)] + ["other/x"])
+    df = client.list_objects_table("logs/", workers=4, chunk_size=7)
+    assert sorted(df['key']) == [f"logs/{i:03d}" for i in range(50)]
+    assert df['size'].sum() == 50
@@ -0,0 +1,46 @@
+import urllib3
+
+from minio_retry import CircuitBreaker
+from minio_verify import verify_replicas
+from test_listing import FakeListingClient
+
+
+class DownClient:
+    def _execute(self, method, bucket_name, query_params=None):
+        raise urllib3.exceptions.MaxRetryError(None, "/", "connection refused")
+
+
+class FakeWrapper:
+    bucket_name = "bucket"
+    rate_limiter = None
+
+    def __init__(self, name, keys=None):
+        self.breaker = CircuitBreaker(name)
+        self.client = FakeListingClient(keys) if keys is not None else DownClient()
+
+
+KEYS = [f"key-{i:02d}" for i in range(10)]
+
+
+def test_unlistable_server_is_reported_as_check_failed():
+    clients = {'S0': FakeWrapper('S0', KEYS), 'S1': FakeWrapper('S1', KEYS), 'S2': FakeWrapper('S2')}
+    report = verify_replicas(clients, sample=0, attempts=1)
+    assert report.keys == 10
+    assert report.counts['check_failed'] == 1 and report.counts['missing'] == 0
+    assert report.examples[0]['server'] == 'S2'
+    assert not report.consistent
+
+
+def test_server_with_an_open_circuit_is_not_skipped():
+    clients = {'S0': FakeWrapper('S0', KEYS), 'S1': FakeWrapper('S1', KEYS)}
+    clients['S1'].breaker.trip()
+    report = verify_replicas(clients, sample=0, attempts=1)
+    assert report.counts['check_failed'] == 1
+    assert not report.consistent
+
+
+def test_failed_reference_ends_the_comparison():
+    clients = {'S0': FakeWrapper('S0'), 'S1': FakeWrapper('S1', KEYS)}
+    report = verify_replicas(clients, sample=0, attempts=1)
+    assert report.keys == 0 and report.counts['extra'] == 0
+    assert report.counts['check_failed'] == 1